@@ -1,3 +1,4 @@
+import logging
 import os
 from typing import List
 from pydantic_settings import BaseSettings
@@ -8,6 +9,9 @@ from .constants import (
     VALID_USER_TAGS,
     VALID_USER_PLANS
 )
+from .logs import configurar_logs
+
+logger = logging.getLogger(__name__)
 
 # --- Detectar e carregar ambiente ---
 def detect_environment() -> str:
@@ -22,13 +26,8 @@ def detect_environment() -> str:
 
 def setup_environment():
     env = detect_environment()
-    if env == "development":
-        if load_dotenv():
-            print("🔧 Ambiente: DESENVOLVIMENTO — .env carregado com sucesso!")
-        else:
-            print("⚠️  Ambiente: DESENVOLVIMENTO — arquivo .env não encontrado!")
-    else:
-        print(f"🚀 Ambiente: PRODUÇÃO ({env.upper()})")
+    if env == "development" and not load_dotenv():
+        logger.warning("Ambiente de desenvolvimento sem arquivo .env")
     return env
 
 environment = setup_environment()
@@ -40,10 +39,8 @@ def verify_env_vars(required_vars: List[str]):
         value = os.getenv(var)
         if value is None:
             missing_vars.append(var)
-            print(f"⚠️  Variável obrigatória '{var}' não encontrada no .env!")
     if missing_vars:
         raise ValueError(f"❌ Variáveis obrigatórias ausentes: {', '.join(missing_vars)}")
-    print("✅ Todas as variáveis obrigatórias estão presentes no .env!")
 
 required_env_vars = [
     "DATABASE_URL",
@@ -72,21 +69,93 @@ class Settings(BaseSettings):
     debug: bool = os.environ.get("DEBUG", "false").lower() == "true"
     api_version: str = os.environ.get("API_VERSION", "1.0.0")
     api_title: str = os.environ.get("API_TITLE", "Eden Map")
+    # Serializador das respostas: "orjson" (rápido, se instalado) ou "json" (stdlib)
+    json_response_class: str = os.environ.get("JSON_RESPONSE_CLASS", "orjson").lower()
 
     rate_limit_login: str = os.environ.get("RATE_LIMIT_LOGIN", DEFAULT_RATE_LIMITS['LOGIN'])
     rate_limit_cadastro: str = os.environ.get("RATE_LIMIT_CADASTRO", DEFAULT_RATE_LIMITS['CADASTRO'])
     rate_limit_tempkey: str = os.environ.get("RATE_LIMIT_TEMKEY", DEFAULT_RATE_LIMITS['TEMPKEY'])
-
+    rate_limit_login_conta: str = os.environ.get("RATE_LIMIT_LOGIN_CONTA", DEFAULT_RATE_LIMITS['LOGIN_CONTA'])
+    rate_limit_tempkey_conta: str = os.environ.get("RATE_LIMIT_TEMPKEY_CONTA", DEFAULT_RATE_LIMITS['TEMPKEY_CONTA'])
+    rate_limit_storage_uri: str = os.environ.get("RATE_LIMIT_STORAGE_URI", "sqlite:///./ratelimit.db")
+
+    tempkey_dedup_seconds: int = int(os.environ.get("TEMPKEY_DEDUP_SECONDS", "60"))
+    tempkey_dedup_max_entries: int = int(os.environ.get("TEMPKEY_DEDUP_MAX_ENTRIES", "10000"))
+
+    # Header Server-Timing com o tempo por fase (db, bcrypt, jwt, email)
+    server_timing_enabled: bool = os.environ.get(
+        "SERVER_TIMING_ENABLED", "false" if environment == "production" else "true"
+    ).lower() == "true"
+
+    # Tracing: spans por requisição (queries, bcrypt, JWT, HTTP) gravados em
+    # arquivo local no formato Zipkin v2
+    tracing_enabled: bool = os.environ.get(
+        "TRACING_ENABLED", "false" if environment == "production" else "true"
+    ).lower() == "true"
+    trace_sample_rate: float = float(os.environ.get("TRACE_SAMPLE_RATE", "0.1"))
+    trace_slow_ms: float = float(os.environ.get("TRACE_SLOW_MS", "500"))
+    trace_tail_sample_rate: float = float(os.environ.get("TRACE_TAIL_SAMPLE_RATE", "0.25"))
+    # Hosts internos que recebem o header traceparent nas chamadas HTTP
+    trace_propagate_hosts: str = os.environ.get("TRACE_PROPAGATE_HOSTS", "")
+    trace_file: str = os.environ.get("TRACE_FILE", "./traces/traces.jsonl")
+    trace_max_bytes: int = int(os.environ.get("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+    trace_backup_count: int = int(os.environ.get("TRACE_BACKUP_COUNT", "5"))
+
+    # Log de consultas lentas (com plano de execução); 0 desliga
+    slow_query_ms: float = float(os.environ.get("SLOW_QUERY_MS", "100"))
+    slow_query_explain: bool = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    slow_query_max_fingerprints: int = int(os.environ.get("SLOW_QUERY_MAX_FINGERPRINTS", "200"))
+
+    # /metrics: token opcional e diretório compartilhado entre workers
+    metrics_token: str = os.environ.get("METRICS_TOKEN", "")
+    metrics_multiproc_dir: str = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+
+    # Perfis (cProfile): header X-Profile com token de admin ou amostragem aleatória
+    profile_sample_rate: float = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+    profile_dir: str = os.environ.get("PROFILE_DIR", "./profiles")
+    profile_max_files: int = int(os.environ.get("PROFILE_MAX_FILES", "50"))
+
+    compression_minimum_size: int = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", "1024"))
+    compression_gzip_level: int = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # Logs em JSON (uma linha por registro) no stdout e, se LOG_FILE, também no arquivo
     log_level: str = os.environ.get("LOG_LEVEL", "INFO")
     log_file: str = os.environ.get("LOG_FILE", "app.log")
+    # Registros repetidos do mesmo ponto do código: no máximo N por janela
+    log_rate_limit: int = int(os.environ.get("LOG_RATE_LIMIT", "20"))
+    log_rate_limit_window_seconds: float = float(os.environ.get("LOG_RATE_LIMIT_WINDOW_SECONDS", "60"))
 
     port: int = int(os.environ.get("PORT", "8000"))
     host: str = os.environ.get("HOST", "0.0.0.0")
 
+    # /health/ready: intervalo das verificações em segundo plano
+    readiness_interval_seconds: float = float(os.environ.get("READINESS_INTERVAL_SECONDS", "5"))
+
+    # Servidor (run.py). 0 = automático / sem limite
+    web_concurrency: int = int(os.environ.get("WEB_CONCURRENCY", "0"))
+    server_keepalive_seconds: int = int(os.environ.get("SERVER_KEEPALIVE_SECONDS", "5"))
+    server_limit_concurrency: int = int(os.environ.get("SERVER_LIMIT_CONCURRENCY", "0"))
+    server_max_requests: int = int(os.environ.get("SERVER_MAX_REQUESTS", "10000"))
+    server_max_requests_jitter: int = int(os.environ.get("SERVER_MAX_REQUESTS_JITTER", "1000"))
+    server_graceful_timeout: int = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30"))
+    server_preload: bool = os.environ.get("SERVER_PRELOAD", "true").lower() == "true"
+
     brevo_api_key: str = os.environ["BREVO_API_KEY"]
     brevo_sender_email: str = os.environ["BREVO_SENDER_EMAIL"]
     brevo_sender_name: str = os.environ["BREVO_SENDER_NAME"]
     email_enabled: bool = os.environ["EMAIL_ENABLED"].lower() == "true"
+    brevo_base_url: str = os.environ.get("BREVO_BASE_URL", "https://api.brevo.com/v3")
+    email_batch_size: int = int(os.environ.get("EMAIL_BATCH_SIZE", "100"))
+    email_batch_rate_per_second: float = float(os.environ.get("EMAIL_BATCH_RATE_PER_SECOND", "5"))
+    brevo_timeout_seconds: float = float(os.environ.get("BREVO_TIMEOUT_SECONDS", "10"))
+
+    email_circuit_failure_rate: float = float(os.environ.get("EMAIL_CIRCUIT_FAILURE_RATE", "0.5"))
+    email_circuit_min_calls: int = int(os.environ.get("EMAIL_CIRCUIT_MIN_CALLS", "5"))
+    email_circuit_window: int = int(os.environ.get("EMAIL_CIRCUIT_WINDOW", "20"))
+    email_circuit_slow_call_seconds: float = float(os.environ.get("EMAIL_CIRCUIT_SLOW_CALL_SECONDS", "5"))
+    email_circuit_open_seconds: float = float(os.environ.get("EMAIL_CIRCUIT_OPEN_SECONDS", "30"))
+    email_circuit_half_open_probes: int = int(os.environ.get("EMAIL_CIRCUIT_HALF_OPEN_PROBES", "1"))
 
     @property
     def cors_origins_safe(self) -> List[str]:
@@ -147,3 +216,19 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+
+def iniciar_logs():
+    """
+    Configura o logging com LOG_LEVEL, LOG_FILE e LOG_RATE_LIMIT*
+
+    Chamada explícita (run.py e startup da aplicação), não na importação:
+    importar as configurações não inicia a thread de escrita dos logs.
+    Chamadas repetidas não fazem nada.
+    """
+    configurar_logs(
+        settings.log_level,
+        settings.log_file,
+        settings.log_rate_limit,
+        settings.log_rate_limit_window_seconds,
+    )
+    logger.info("Configurações carregadas", extra={"ambiente": environment})
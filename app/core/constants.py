@@ -45,6 +45,16 @@ PLANS_TIME = {
     "anual": 365,
 }
 
+# Nomes de exibição dos planos (emails)
+PLANS_NAMES = {
+    "trial": "Teste Grátis (15 dias)",
+    "mensal": "Mensal",
+    "trimestral": "Trimestral",
+    "semestral": "Semestral",
+    "anual": "Anual",
+    "admin": "Administrador"
+}
+
 VALID_USER_PLANS = list(USER_PLANS.values())
 
 # Planos especiais para administradores
@@ -68,5 +78,64 @@ MIN_PASSWORD_LENGTH = 8
 DEFAULT_RATE_LIMITS = {
     'LOGIN': '10/minute',
     'CADASTRO': '5/minute',
-    'TEMPKEY': '10/hour'
+    'TEMPKEY': '10/hour',
+    # Por IP + conta (email_ou_login)
+    'LOGIN_CONTA': '5/minute',
+    'TEMPKEY_CONTA': '5/hour'
+}
+
+# Limites por usuário nas rotas autenticadas, conforme o plano do token
+# (admins e testers usam o limite "admin")
+USER_RATE_LIMITS = {
+    'trial': '60/minute',
+    'mensal': '120/minute',
+    'trimestral': '120/minute',
+    'semestral': '120/minute',
+    'anual': '120/minute',
+    'admin': '600/minute'
+}
+DEFAULT_USER_RATE_LIMIT = '60/minute'
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+# Máximo de operações em uma chamada de /batch
+BATCH_MAX_OPERACOES = 10
+
+# ============================================================================
+# ORÇAMENTO DE CONSULTAS
+# ============================================================================
+
+# Máximo de statements SQL por requisição, por rota ("MÉTODO /template").
+# Verificado por `python -m benchmarks.orcamento_consultas` (CI) e, em
+# execução, registrado no log quando excedido. Toda rota da API precisa
+# estar aqui; ao mudar uma endpoint, ajuste o valor conscientemente.
+ORCAMENTO_CONSULTAS = {
+    'GET /': 0,
+    'GET /health': 0,
+    'GET /health/live': 0,
+    'GET /health/ready': 0,  # estado calculado em segundo plano
+    'GET /metrics': 0,
+    # email e login verificados no endpoint e em criar_usuario + INSERT + refresh
+    'POST /cadastro': 6,
+    'POST /login': 2,
+    'GET /me': 1,
+    'PUT /me/starting': 4,
+    'GET /me/progresso': 1,
+    'PUT /me/progresso': 4,
+    'POST /me/progresso/avancar': 4,
+    # cenário com 3 operações: uma leitura do usuário e um UPDATE no final
+    'POST /batch': 2,
+    'GET /usuarios': 1,
+    # destinatários lidos em streaming com um único SELECT
+    'POST /admin/emails/lote': 1,
+    'GET /admin/emails/lote/{job_id}': 0,
+    'GET /admin/email/circuito': 0,
+    'GET /admin/consultas-lentas': 0,
+    'DELETE /admin/consultas-lentas': 0,
+    'GET /admin/perfis': 0,
+    'GET /admin/perfis/{nome}': 0,
+    # pior estágio (alteração de senha)
+    'POST /tempkey': 5,
 }
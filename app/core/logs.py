@@ -0,0 +1,187 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+# ID da requisição atual (definido pelo RequestIdMiddleware)
+request_id_atual: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos padrão do LogRecord (e o color_message do uvicorn): o resto
+# (passado em extra=) vira campo do JSON
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "color_message"}
+
+# Loggers com um registro por requisição (acesso e tempos por fase): o volume
+# acompanha o tráfego e é esperado, então não passam pelo FiltroTaxa
+LOGGERS_SEM_LIMITE = ("uvicorn.access", "app.tempos")
+
+_handler: Optional["HandlerFila"] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro, com request_id e os campos de extra="""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            dados["request_id"] = request_id
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_PADRAO and chave not in dados and chave != "request_id":
+                dados[chave] = valor
+        if record.exc_info:
+            dados["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            dados["exc"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """
+    QueueHandler que adia a formatação para a thread de escrita
+
+    O QueueHandler padrão já formata a mensagem (e o traceback) na thread
+    que gerou o log; aqui só os argumentos são resolvidos, para o registro
+    não mudar se forem objetos mutáveis.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class FiltroRequestId(logging.Filter):
+    """Anota o registro com o request_id (roda na thread que gerou o log)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_atual.get()
+        return True
+
+
+class FiltroTaxa(logging.Filter):
+    """
+    Limita registros repetidos do mesmo ponto do código
+
+    No máximo `limite` registros por (logger, arquivo, linha) a cada
+    `janela` segundos; os excedentes são descartados e a quantidade
+    suprimida vai no campo "suprimidos" do próximo registro liberado.
+    Registros dos loggers em `isentos` (e dos filhos deles) sempre passam.
+    """
+
+    def __init__(self, limite: int = 20, janela: float = 60.0, isentos: Iterable[str] = LOGGERS_SEM_LIMITE):
+        super().__init__()
+        self.limite = limite
+        self.janela = janela
+        self.isentos = tuple(isentos)
+        self._contadores: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def _isento(self, nome: str) -> bool:
+        return any(nome == isento or nome.startswith(isento + ".") for isento in self.isentos)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._isento(record.name):
+            return True
+        chave = (record.name, record.pathname, record.lineno)
+        agora = time.monotonic()
+        with self._lock:
+            contador = self._contadores.get(chave)
+            if contador is None or agora - contador[0] >= self.janela:
+                suprimidos = contador[2] if contador else 0
+                self._contadores[chave] = [agora, 1, 0]
+                if len(self._contadores) > 10_000:
+                    self._contadores.clear()
+            elif contador[1] < self.limite:
+                contador[1] += 1
+                suprimidos = 0
+            else:
+                contador[2] += 1
+                return False
+        if suprimidos:
+            record.suprimidos = suprimidos
+        return True
+
+
+def _iniciar_listener(fila: queue.Queue, destinos) -> logging.handlers.QueueListener:
+    listener = logging.handlers.QueueListener(fila, *destinos, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _reiniciar_apos_fork():
+    """
+    A thread de escrita não sobrevive ao fork (gunicorn com preload): o
+    processo filho recebe uma fila nova e a própria thread
+    """
+    global _listener
+    if _listener is None or _handler is None:
+        return
+    fila: queue.Queue = queue.Queue(-1)
+    _handler.queue = fila
+    _listener = _iniciar_listener(fila, _listener.handlers)
+
+
+def configurar_logs(nivel: str = "INFO", arquivo: str = "", limite_por_janela: int = 20, janela: float = 60.0):
+    """
+    Configura o logging da aplicação
+
+    As threads das requisições só colocam o registro em uma fila
+    (QueueHandler); uma thread separada (QueueListener) formata em JSON e
+    escreve no stdout e, se `arquivo` for informado, no arquivo. Assim I/O
+    lento de log não bloqueia requisições.
+
+    Args:
+        nivel: Nível mínimo (DEBUG, INFO, WARNING...)
+        arquivo: Caminho do arquivo de log ("" = só stdout)
+        limite_por_janela: Registros permitidos por ponto do código na janela
+        janela: Janela do limite, em segundos
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    formatador = FormatadorJSON()
+    destinos = [logging.StreamHandler(sys.stdout)]
+    if arquivo:
+        # WatchedFileHandler: seguro com vários workers e com logrotate externo
+        destinos.append(logging.handlers.WatchedFileHandler(arquivo, encoding="utf-8"))
+    for destino in destinos:
+        destino.setFormatter(formatador)
+
+    fila: queue.Queue = queue.Queue(-1)
+    _handler = HandlerFila(fila)
+    _handler.addFilter(FiltroRequestId())
+    _handler.addFilter(FiltroTaxa(limite_por_janela, janela))
+
+    raiz = logging.getLogger()
+    raiz.handlers = [_handler]
+    raiz.setLevel(nivel.upper())
+
+    _listener = _iniciar_listener(fila, destinos)
+    atexit.register(encerrar_logs)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_reiniciar_apos_fork)
+
+
+def encerrar_logs():
+    """Esvazia a fila e para a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
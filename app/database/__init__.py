@@ -1,11 +1,22 @@
+import logging
+import os
+
 from .connection import Base, engine, DATABASE_URL
 from .session import SessionLocal, get_db
+from .migrations import adicionar_colunas_ausentes
+
+logger = logging.getLogger(__name__)
+
+# Definida pelo run.py no processo mestre depois de inicializar o banco
+# (gunicorn com preload); os workers herdam o ambiente no fork
+VARIAVEL_BANCO_INICIALIZADO = "BACKBASE_BANCO_INICIALIZADO"
 
 def criar_tabelas():
     """
     Função que cria as tabelas no banco
     """
     Base.metadata.create_all(bind=engine)
+    adicionar_colunas_ausentes()
 
 def criar_usuarios_iniciais():
     """
@@ -42,12 +53,12 @@ def criar_usuarios_iniciais():
                 db.commit()
                 db.refresh(usuario)
                 
-                print(f"✅ Usuário inicial criado: {u['login']} ({u['email']})")
+                logger.info("Usuário inicial criado", extra={"login": u["login"]})
                 
                 enviar_email_boas_vindas_inicial(usuario, "admin")
                 
-    except Exception as e:
-        print(f"❌ Erro ao criar usuários iniciais: {str(e)}")
+    except Exception:
+        logger.exception("Erro ao criar usuários iniciais")
         db.rollback()
     finally:
         db.close()
@@ -65,7 +76,7 @@ def enviar_email_boas_vindas_inicial(usuario, plan: str):
         
         email_service = get_email_service()
         if not email_service:
-            print(f"⚠️  Email service não configurado. Saltando email para {usuario.email}")
+            logger.warning("Email service não configurado; email de boas-vindas ignorado", extra={"usuario_id": usuario.id})
             return False
         
         sucesso = email_service.enviar_boas_vindas(
@@ -75,14 +86,14 @@ def enviar_email_boas_vindas_inicial(usuario, plan: str):
         )
         
         if sucesso:
-            print(f"✅ Email de boas-vindas enviado para {usuario.email}")
+            logger.info("Email de boas-vindas enviado", extra={"usuario_id": usuario.id})
         else:
-            print(f"❌ Falha ao enviar email para {usuario.email}")
+            logger.warning("Falha ao enviar email de boas-vindas", extra={"usuario_id": usuario.id})
         
         return sucesso
         
-    except Exception as e:
-        print(f"❌ Erro ao enviar email: {str(e)}")
+    except Exception:
+        logger.exception("Erro ao enviar email de boas-vindas")
         return False
 
 def inicializar_banco():
@@ -94,6 +105,10 @@ def inicializar_banco():
     criar_tabelas()
     criar_usuarios_iniciais()
 
+def banco_inicializado_no_mestre() -> bool:
+    """True quando o processo mestre já rodou inicializar_banco antes do fork"""
+    return os.environ.get(VARIAVEL_BANCO_INICIALIZADO) == "1"
+
 __all__ = [
     'Base',
     'engine', 
@@ -102,5 +117,7 @@ __all__ = [
     'get_db',
     'criar_tabelas',
     'criar_usuarios_iniciais',
-    'inicializar_banco'
+    'inicializar_banco',
+    'banco_inicializado_no_mestre',
+    'VARIAVEL_BANCO_INICIALIZADO'
 ]
\ No newline at end of file
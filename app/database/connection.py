@@ -1,6 +1,14 @@
+import logging
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from ..core.config import settings
+from ..utils.tempos import instrumentar_engine
+from ..utils.metricas import instrumentar_pool
+from ..utils.tracing import rastrear_engine
+from ..utils.consultas_lentas import RegistroConsultasLentas
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = settings.database_url
 
@@ -20,7 +28,18 @@ else:
     
     engine = create_engine(DATABASE_URL, **engine_config)
 
-Base = declarative_base()
+instrumentar_engine(engine)
+instrumentar_pool(engine)
+rastrear_engine(engine)
 
+consultas_lentas = RegistroConsultasLentas(
+    limite_ms=settings.slow_query_ms,
+    capturar_plano=settings.slow_query_explain,
+    max_fingerprints=settings.slow_query_max_fingerprints,
+)
+if settings.slow_query_ms > 0:
+    consultas_lentas.instrumentar(engine)
+
+Base = declarative_base()
 
-print(f"✅ Banco configurado: {DATABASE_URL[:30]}...")
\ No newline at end of file
+logger.info("Banco configurado", extra={"database": engine.url.render_as_string(hide_password=True)})
@@ -1,20 +1,73 @@
+import logging
 import os
+from sqlalchemy import inspect, text
 from .connection import Base, engine
 from ..core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Colunas adicionadas depois da criação da tabela: create_all não altera
+# tabelas existentes, então são adicionadas aqui se estiverem ausentes
+COLUNAS_ADICIONADAS = {
+    "usuarios": {
+        "versao": "INTEGER NOT NULL DEFAULT 1",
+        "atualizado_em": "TIMESTAMP",
+    },
+}
+
+
+def adicionar_colunas_ausentes(banco=engine):
+    """
+    Adiciona em tabelas já existentes as colunas de COLUNAS_ADICIONADAS
+    e os índices do modelo sobre elas
+
+    Args:
+        banco: Engine do banco (padrão: o da aplicação)
+    """
+    inspetor = inspect(banco)
+    for tabela, colunas in COLUNAS_ADICIONADAS.items():
+        if not inspetor.has_table(tabela):
+            continue
+        existentes = {coluna["name"] for coluna in inspetor.get_columns(tabela)}
+        for nome, definicao in colunas.items():
+            if nome in existentes:
+                continue
+            with banco.begin() as conexao:
+                conexao.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {nome} {definicao}"))
+                for indice in Base.metadata.tables[tabela].indexes:
+                    if nome in indice.columns:
+                        indice.create(conexao, checkfirst=True)
+            logger.info("Coluna adicionada", extra={"tabela": tabela, "coluna": nome})
+
+def colunas_ausentes(conexao) -> list:
+    """
+    Colunas dos modelos que não existem no banco ("tabela.coluna").
+    Lista vazia = schema do banco compatível com o código.
+    """
+    inspetor = inspect(conexao)
+    ausentes = []
+    for tabela in Base.metadata.sorted_tables:
+        if not inspetor.has_table(tabela.name):
+            ausentes.append(f"{tabela.name}.*")
+            continue
+        existentes = {coluna["name"] for coluna in inspetor.get_columns(tabela.name)}
+        ausentes.extend(f"{tabela.name}.{coluna.name}" for coluna in tabela.columns if coluna.name not in existentes)
+    return ausentes
+
 def criar_tabelas():
     """
     Verifica se o banco existe e cria as tabelas necessárias
     """
-    if "sqlite" in settings.database_url:
-        if not os.path.exists("banco.db"):
-            print("Banco de dados não encontrado. Criando novo banco...")
-        else:
-            print("Banco de dados encontrado.")
+    if "sqlite" in settings.database_url and not os.path.exists("banco.db"):
+        logger.info("Banco de dados não encontrado. Criando novo banco")
     
     Base.metadata.create_all(bind=engine)
-    print("Tabelas criadas/verificadas com sucesso!")
-    print(f"🔧 Configurações carregadas do .env:")
-    print(f"   - Database: {settings.database_url}")
-    print(f"   - Debug Mode: {settings.debug}")
-    print(f"   - API Version: {settings.api_version}")
\ No newline at end of file
+    adicionar_colunas_ausentes()
+    logger.info(
+        "Tabelas criadas/verificadas",
+        extra={
+            "database": engine.url.render_as_string(hide_password=True),
+            "debug": settings.debug,
+            "api_version": settings.api_version,
+        },
+    )
@@ -1,23 +1,26 @@
 # app/main.py
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Depends, Header, Query, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from sqlalchemy.orm import Session
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from limits.storage import storage_from_string
 from .schemas.schemas import ProgressoUpdate
+from pydantic import ValidationError
 
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+import math
+import uuid
+import logging
 import random
-import traceback
-from typing import Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any
 
 # Import local modules - adapte caminhos se necessário
-from .database import get_db, inicializar_banco
+from .database import SessionLocal, banco_inicializado_no_mestre, get_db, inicializar_banco
 from .schemas.schemas import (
     UsuarioCreate,
     UsuarioResponse,
@@ -25,10 +28,45 @@ from .schemas.schemas import (
     TokenResponse,
     TempKeyResponse,
     StartingDataUpdate,
+    EmailLoteRequest,
+    EmailLoteJobResponse,
+    CadastroResponse,
+    MeResponse,
+    ProgressoEnvelopeResponse,
+    ProgressoAtualizadoResponse,
+    ProgressoResponse,
+    StartingResponse,
+    StartingAtualizadoResponse,
+    RecuperacaoSenhaResponse,
+    BatchRequest,
+    BatchResponse,
 )
-from .core.config import settings
-from .services.email_service import get_email_service
-
+from .core.config import iniciar_logs, settings
+from .core.constants import USER_RATE_LIMITS, DEFAULT_USER_RATE_LIMIT
+from .services.email_service import get_email_service, brevo_circuit
+from .services.prontidao import VerificadorProntidao
+from .database.connection import consultas_lentas, engine
+
+from .middleware import (
+    CompressaoMiddleware,
+    MetricasMiddleware,
+    OrcamentoConsultasMiddleware,
+    PerfilMiddleware,
+    RequestIdMiddleware,
+    ServerTimingMiddleware,
+    TracingMiddleware,
+)
+from .utils import perfil
+from .utils.perfil import RotaPerfilavel, configurar_armazem
+from .utils.tracing import configurar_rastreador, rastrear_requests
+from .utils.metricas import gerar_metricas, rate_limit_rejeicoes_total
+from .utils.ttl_cache import TTLCache
+from .utils.etag import gerar_etag, etag_corresponde
+from .utils.campos import interpretar_campos, colunas_para_campos, serializar_parcial
+from .utils.plans import calcular_dias_restantes, obter_duracao_plano
+from .utils.token_bucket import LimiteExcedido
+from .utils.limite_compartilhado import LimiteCompartilhado
+from .utils import rate_limit_storage  # noqa: F401 - registra o esquema sqlite:// no limits
 from .utils.jwt_auth import (
     create_access_token,
     get_user_from_token,
@@ -40,7 +78,10 @@ from .utils.jwt_auth import (
 from .services import (
     criar_usuario,
     listar_usuarios,
+    iterar_destinatarios,
     buscar_usuario_por_id,
+    buscar_campos_usuario,
+    listar_campos_usuarios,
     buscar_usuario_por_email,
     buscar_usuario_por_login,
     atualizar_usuario,
@@ -49,7 +90,38 @@ from .services import (
 # -----------------------------
 # Configurações e constantes
 # -----------------------------
-limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
+
+# Storage compartilhado entre workers (ver app/utils/rate_limit_storage.py);
+# qualquer URI suportada pelo limits (memory://, redis://...) também funciona
+limiter = Limiter(key_func=get_remote_address, storage_uri=settings.rate_limit_storage_uri)
+
+# Limites por IP + conta e por usuário no mesmo storage dos limites por IP:
+# um contador por chave para todos os workers (ver LimiteCompartilhado)
+armazenamento_limites = storage_from_string(settings.rate_limit_storage_uri)
+
+# Limites por IP + conta
+limite_login_conta = LimiteCompartilhado(settings.rate_limit_login_conta, armazenamento_limites, "login_conta")
+limite_tempkey_conta = LimiteCompartilhado(settings.rate_limit_tempkey_conta, armazenamento_limites, "tempkey_conta")
+
+# Limites por usuário nas rotas autenticadas: um limiter por plano
+limites_por_plano = {
+    plano: LimiteCompartilhado(limite, armazenamento_limites, f"usuario_{plano}")
+    for plano, limite in USER_RATE_LIMITS.items()
+}
+limite_usuario_padrao = LimiteCompartilhado(DEFAULT_USER_RATE_LIMIT, armazenamento_limites, "usuario")
+
+def _classe_resposta_padrao():
+    """Serializador JSON padrão das respostas (settings.json_response_class)"""
+    if settings.json_response_class == "orjson":
+        try:
+            import orjson  # noqa: F401
+            return ORJSONResponse
+        except ImportError:
+            logger.warning("orjson não instalado; usando JSONResponse (json da stdlib)")
+    return JSONResponse
+
+ClasseRespostaPadrao = _classe_resposta_padrao()
 
 app = FastAPI(
     title="BackBase API",
@@ -57,12 +129,16 @@ app = FastAPI(
     description="API para gerenciamento de usuários com JWT Authentication e Rate Limiting",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ClasseRespostaPadrao,
 )
+# Rotas declaradas abaixo podem ser executadas sob cProfile (PerfilMiddleware)
+app.router.route_class = RotaPerfilavel
+configurar_armazem(settings.profile_dir, settings.profile_max_files)
 
-# rate limiter e middleware
+# rate limiter: só as rotas com @limiter.limit fazem verificação (sem
+# SlowAPIMiddleware, que rodava em todas as requisições)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
 
 # CORS
 app.add_middleware(
@@ -72,17 +148,48 @@ app.add_middleware(
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressaoMiddleware,
+    minimo_bytes=settings.compression_minimum_size,
+    nivel_gzip=settings.compression_gzip_level,
+    qualidade_brotli=settings.compression_brotli_quality,
+)
+# Dentro do ServerTimingMiddleware: usa a contagem de queries da requisição
+app.add_middleware(OrcamentoConsultasMiddleware)
+app.add_middleware(ServerTimingMiddleware, emitir_header=settings.server_timing_enabled)
+app.add_middleware(MetricasMiddleware)
+app.add_middleware(PerfilMiddleware, taxa_amostragem=settings.profile_sample_rate)
+if settings.tracing_enabled:
+    configurar_rastreador(
+        settings.trace_file,
+        taxa=settings.trace_sample_rate,
+        lento_ms=settings.trace_slow_ms,
+        max_bytes=settings.trace_max_bytes,
+        backups=settings.trace_backup_count,
+        taxa_cauda=settings.trace_tail_sample_rate,
+    )
+    rastrear_requests(settings.trace_propagate_hosts.split(","))
+app.add_middleware(TracingMiddleware)
+# Por último = mais externo: o request_id vale para os logs de todos os outros
+app.add_middleware(RequestIdMiddleware)
 
 security = HTTPBearer()
 
-PLANOS = {
-    "trial": 15,
-    "mensal": 30,
-    "trimestral": 90,
-    "semestral": 180,
-    "anual": 365,
-    "admin": 36500,
-}
+TEMPKEY_EXPIRE_MINUTES = 15
+
+# Códigos de recuperação emitidos recentemente (por usuário) e respostas por
+# Idempotency-Key. Os dois caches são por worker: um reenvio atendido por
+# outro worker não encontra a entrada e emite um código novo (como sem o
+# cache), então a deduplicação é de no máximo um código por worker na
+# janela. Uma entrada nunca devolve um código já substituído: o hash
+# guardado é comparado com usuario.temp_senha, que vem do banco.
+tempkeys_pendentes = TTLCache(maxsize=settings.tempkey_dedup_max_entries, ttl=settings.tempkey_dedup_seconds)
+respostas_idempotentes = TTLCache(maxsize=settings.tempkey_dedup_max_entries, ttl=TEMPKEY_EXPIRE_MINUTES * 60)
+
+# Envios em lote em segundo plano, consultados por GET /admin/emails/lote/{job_id}.
+# Também por worker: o job só é encontrado no worker que recebeu o envio
+EMAIL_LOTE_JOBS_TTL_SECONDS = 24 * 60 * 60
+jobs_email_lote = TTLCache(maxsize=100, ttl=EMAIL_LOTE_JOBS_TTL_SECONDS)
 
 # -----------------------------
 # Helpers / Utils
@@ -90,33 +197,6 @@ PLANOS = {
 def _safe_now() -> datetime:
     return datetime.utcnow()
 
-def _get_plan_name(usuario) -> str:
-    return (usuario.plan or "trial").lower()
-
-def calcular_dias_restantes(usuario) -> int:
-    """
-    Calcula dias restantes do plano do usuário.
-    Retorna 0 em caso de erro, plano desconhecido ou plan_date ausente.
-    """
-    try:
-        plan = _get_plan_name(usuario)
-        plan_date = usuario.plan_date
-        if not plan_date or plan not in PLANOS:
-            return 0
-        fim = plan_date + timedelta(days=PLANOS[plan])
-        dias = (fim - _safe_now()).days
-        return max(dias, 0)
-    except Exception:
-        return 0
-
-def obter_duracao_plano(usuario) -> int:
-    """Retorna a duração total do plano em dias. Default: 30."""
-    try:
-        plan = _get_plan_name(usuario)
-        return PLANOS.get(plan, 30)
-    except Exception:
-        return 30
-
 def gerar_token_para_usuario(usuario) -> str:
     """Cria e retorna um access token JWT para o usuário."""
     token_data = create_user_token_data(
@@ -124,6 +204,7 @@ def gerar_token_para_usuario(usuario) -> str:
         email=usuario.email,
         login=usuario.login,
         tag=usuario.tag,
+        plan=usuario.plan,
     )
     return create_access_token(data=token_data)
 
@@ -141,10 +222,63 @@ def montar_resposta_token(usuario, token: str) -> dict:
 def get_usuario_by_email_or_login(db: Session, value: str):
     return buscar_usuario_por_email(db, value) or buscar_usuario_por_login(db, value)
 
+def chave_ip_conta(request: Request, email_ou_login: Optional[str]) -> str:
+    """Chave composta IP + conta para os limites por conta"""
+    return f"{get_remote_address(request)}|{(email_ou_login or '').strip().lower()}"
+
 def validar_usuario_existente(usuario):
     if not usuario:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
 
+# Helpers das rotas /me*: montam os campos a alterar sem gravar, para serem
+# usados tanto pelas rotas (via atualizar_usuario) quanto pelo /batch
+CAMPOS_STARTING = [
+    "desejo_nome",
+    "desejo_descricao",
+    "sentimentos_selecionados",
+    "caminho_selecionado",
+    "teste_resultados",
+]
+
+def campos_starting(dados: StartingDataUpdate) -> Dict[str, Any]:
+    """Campos do Starting que vieram preenchidos"""
+    return {campo: getattr(dados, campo) for campo in CAMPOS_STARTING if getattr(dados, campo, None) is not None}
+
+def campos_progresso(dados: ProgressoUpdate) -> Dict[str, Any]:
+    """Campos de progresso fornecidos + timestamp da alteração"""
+    campos: Dict[str, Any] = {}
+    if dados.semana_atual is not None:
+        campos["semana_atual"] = dados.semana_atual
+    if dados.dia_atual is not None:
+        campos["dia_atual"] = dados.dia_atual
+    campos["progresso_atualizado_em"] = datetime.utcnow()
+    return campos
+
+def proximo_progresso(usuario) -> Optional[Dict[str, Any]]:
+    """
+    Campos para avançar um dia (Semana 1-12, Dia 1-7).
+    Retorna None se a jornada já estiver completa.
+    """
+    semana = usuario.semana_atual or 1
+    dia = usuario.dia_atual or 1
+    if dia < 7:
+        dia += 1
+    elif semana < 12:
+        semana += 1
+        dia = 1
+    else:
+        return None
+    return {"semana_atual": semana, "dia_atual": dia, "progresso_atualizado_em": datetime.utcnow()}
+
+def aplicar_campos(usuario, campos: Dict[str, Any]):
+    """Altera o objeto ORM sem commit (grava no commit da sessão)"""
+    for campo, valor in campos.items():
+        setattr(usuario, campo, valor)
+
+def exigir_admin(current_user: dict):
+    if current_user.get("tag") != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado: apenas admins")
+
 def validar_senha(usuario, senha: str):
     if not verify_password(senha, usuario.senha):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Senha incorreta")
@@ -156,6 +290,59 @@ def gerar_tempkey() -> (str, str):
     hash_key = hash_password(tempkey)
     return tempkey, hash_key
 
+def emitir_codigo_recuperacao(db: Session, usuario) -> dict:
+    """
+    Gera um novo tempkey, grava o hash no usuário e envia por email.
+    Registra o código como pendente para deduplicar reenvios.
+    """
+    tempkey, hashKey = gerar_tempkey()
+    expires = _safe_now() + timedelta(minutes=TEMPKEY_EXPIRE_MINUTES)
+
+    atualizar_usuario(db, usuario.id, {"temp_senha": hashKey, "temp_senha_expira": expires})
+
+    email_service = get_email_service()
+    # Se não houver serviço de email configurado ou desabilitado, retornamos o tempkey como fallback
+    if not email_service or not settings.email_enabled:
+        resposta = {
+            "tempkey": tempkey,
+            "message": "Serviço de email não disponível. Código mostrado como fallback.",
+            "email_sent": False,
+            "stage": 1,
+        }
+    else:
+        try:
+            email_enviado = email_service.enviar_tempkey(email=usuario.email, login=usuario.login, tempkey=tempkey)
+            if email_enviado:
+                resposta = {"tempkey": None, "message": f"Código de recuperação enviado para {usuario.email}", "email_sent": True, "expires_in": f"{TEMPKEY_EXPIRE_MINUTES} minutos", "stage": 1}
+            else:
+                resposta = {"tempkey": tempkey, "message": "Falha ao enviar email. Código exibido como fallback.", "email_sent": False, "stage": 1}
+        except Exception:
+            logger.exception("Erro ao enviar código de recuperação")
+            resposta = {"tempkey": tempkey, "message": "Erro ao enviar email. Código exibido como fallback.", "email_sent": False, "stage": 1}
+
+    tempkeys_pendentes.set(usuario.id, {"hash": hashKey, "resposta": resposta})
+    return resposta
+
+def codigo_ainda_pendente(usuario, hash_codigo: Optional[str]) -> bool:
+    """True se o código com esse hash é o atual do usuário e ainda não expirou"""
+    return bool(
+        hash_codigo
+        and hash_codigo == usuario.temp_senha
+        and usuario.temp_senha_expira
+        and _safe_now() < usuario.temp_senha_expira
+    )
+
+def montar_resposta_codigo_pendente(usuario, resposta_original: dict) -> dict:
+    """Resposta para um reenvio deduplicado: status do código que ainda está válido."""
+    restante = usuario.temp_senha_expira - _safe_now()
+    minutos = max(1, int(restante.total_seconds() // 60))
+    return {
+        **resposta_original,
+        "message": "Um código de recuperação já foi enviado e ainda está válido. Aguarde antes de solicitar outro.",
+        "expires_in": f"{minutos} minutos",
+        "deduplicated": True,
+    }
+
 def validar_tempkey_completa(usuario, tempkey: str):
     """Valida existência, expiração e correspondência do tempkey. Levanta HTTPException quando inválido."""
     if not usuario.temp_senha:
@@ -171,8 +358,14 @@ def validar_tempkey_completa(usuario, tempkey: str):
 # -----------------------------
 # Tratamento de exceções
 # -----------------------------
+def rota_da_requisicao(request: Request) -> str:
+    """Template da rota (ex.: "/me/progresso"), para labels de métricas"""
+    rota = request.scope.get("route")
+    return rota.path if rota is not None else request.url.path
+
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+    rate_limit_rejeicoes_total.labels(rota_da_requisicao(request), "ip").inc()
     limit_value = str(exc.detail).split(" ")[0] if hasattr(exc, "detail") else "N/A"
     return JSONResponse(
         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -185,13 +378,39 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
         headers={"Retry-After": "60"},
     )
 
+@app.exception_handler(LimiteExcedido)
+async def limite_excedido_handler(request: Request, exc: LimiteExcedido):
+    rate_limit_rejeicoes_total.labels(rota_da_requisicao(request), "conta_usuario").inc()
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "error": "Rate limit exceeded",
+            "message": "Muitas tentativas. Tente novamente mais tarde.",
+            "limit": exc.limite,
+            "endpoint": str(request.url.path),
+        },
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
 # -----------------------------
 # Startup
 # -----------------------------
+# Readiness: verificações em segundo plano, a probe só lê o resultado
+prontidao = VerificadorProntidao(engine, brevo_circuit, intervalo=settings.readiness_interval_seconds)
+
 @app.on_event("startup")
 def startup_event():
     """Executa na inicialização da aplicação"""
-    inicializar_banco()
+    # Sem efeito se run.py já configurou os logs
+    iniciar_logs()
+    # Com preload o mestre do gunicorn já inicializou o banco antes do fork
+    if not banco_inicializado_no_mestre():
+        inicializar_banco()
+    prontidao.iniciar()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    prontidao.parar()
 
 # -----------------------------
 # Dependências
@@ -205,6 +424,72 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     user_data = get_user_from_token(token)
     return user_data
 
+def limitador_do_usuario(current_user: dict) -> LimiteCompartilhado:
+    """Limiter do plano do usuário (admins e testers usam o de admin)"""
+    if current_user.get("tag") in ["admin", "tester"]:
+        return limites_por_plano["admin"]
+    return limites_por_plano.get((current_user.get("plan") or "trial").lower(), limite_usuario_padrao)
+
+def _custo_unitario() -> int:
+    return 1
+
+def usuario_limitado(custo: Callable[..., int] = _custo_unitario):
+    """
+    Dependência get_current_user + limite por usuário conforme o plano.
+    Usa o user_id já decodificado (o token não é decodificado de novo).
+
+    Args:
+        custo: Dependência que diz quantas requisições a chamada consome
+            (padrão 1; ex.: custo_batch, uma por operação do /batch)
+    """
+    def dependencia(current_user: dict = Depends(get_current_user), unidades: int = Depends(custo)):
+        limitador_do_usuario(current_user).verificar(current_user["user_id"], custo=unidades)
+        return current_user
+    return dependencia
+
+get_current_user_limitado = usuario_limitado()
+
+def custo_batch(dados: BatchRequest) -> int:
+    """Cada operação do /batch conta como uma requisição no limite por usuário"""
+    return len(dados.operacoes)
+
+def etag_me(usuario_id: int, meta, campos: Optional[List[str]] = None) -> str:
+    """
+    ETag de /me: versão da linha + dias restantes (muda com o tempo, sem UPDATE).
+    Com fields=, inclui os campos pedidos e só considera expires se ele foi pedido.
+    """
+    if campos is None:
+        return gerar_etag("u", usuario_id, meta.versao, calcular_dias_restantes(meta))
+    dias = calcular_dias_restantes(meta) if "expires" in campos else "-"
+    return gerar_etag("u", usuario_id, meta.versao, dias, "+".join(campos))
+
+def campos_pedidos(fields: Optional[str], modelo) -> Optional[List[str]]:
+    """fields= validado contra o modelo de resposta (400 se houver campo inválido)"""
+    try:
+        return interpretar_campos(fields, modelo)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+# Parâmetro fields= das rotas de usuário
+FIELDS_QUERY = Query(
+    None,
+    description="Campos a retornar separados por vírgula (ex.: login,plan,expires). Sem ele, todos.",
+)
+
+# Colunas lidas por /me (resposta completa) e /me/progresso: nunca senha,
+# temp_senha etc.; os campos calculados de MeResponse usam plan e plan_date
+COLUNAS_ME = colunas_para_campos(MeResponse.model_fields, MeResponse)
+COLUNAS_PROGRESSO = list(ProgressoResponse.model_fields)
+
+def etag_progresso(usuario_id: int, meta) -> str:
+    """ETag de /me/progresso: instante da última alteração do progresso"""
+    atualizado_em = meta.progresso_atualizado_em
+    return gerar_etag("p", usuario_id, int(atualizado_em.timestamp() * 1_000_000) if atualizado_em else 0)
+
+def resposta_nao_modificada(etag: str) -> Response:
+    """304 sem corpo, repetindo o ETag"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
 # -----------------------------
 # Endpoints públicos
 # -----------------------------
@@ -226,10 +511,36 @@ def health_check():
     """Health check da API"""
     return {"status": "healthy", "message": "API está funcionando corretamente", "rate_limiting": "ativo"}
 
+@app.get("/health/live")
+def liveness():
+    """Liveness: o processo está respondendo (não consulta dependências)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness():
+    """
+    Readiness: resultado em cache das verificações de banco, schema e
+    circuito de email. 503 se alguma dependência obrigatória falhou.
+    """
+    estado = prontidao.estado()
+    codigo = status.HTTP_200_OK if estado["pronto"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=codigo, content=estado)
+
+@app.get("/metrics", include_in_schema=False)
+def metricas(authorization: Optional[str] = Header(None)):
+    """
+    Métricas no formato texto do Prometheus (somadas entre os workers).
+    Se METRICS_TOKEN estiver definido, exige "Authorization: Bearer <token>".
+    """
+    if settings.metrics_token and authorization != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+    conteudo, content_type = gerar_metricas()
+    return Response(conteudo, headers={"Content-Type": content_type})
+
 # -----------------------------
 # Cadastro
 # -----------------------------
-@app.post("/cadastro", response_model=dict)
+@app.post("/cadastro", response_model=CadastroResponse)
 @limiter.limit(settings.rate_limit_cadastro)
 def cadastrar_usuario(request: Request, usuario: UsuarioCreate, db: Session = Depends(get_db)):
     """Cadastra um novo usuário (Rate Limit configurado em settings)"""
@@ -253,8 +564,8 @@ def cadastrar_usuario(request: Request, usuario: UsuarioCreate, db: Session = De
                     plan=novo_usuario.plan or "trial",
                 )
         except Exception:
-            # manter comportamento "soft-fail" do envio de email (log local)
-            traceback.print_exc()
+            # manter comportamento "soft-fail" do envio de email (só registra no log)
+            logger.exception("Erro ao enviar email de boas-vindas")
 
         token = gerar_token_para_usuario(novo_usuario)
         resposta = montar_resposta_token(novo_usuario, token)
@@ -264,7 +575,7 @@ def cadastrar_usuario(request: Request, usuario: UsuarioCreate, db: Session = De
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao cadastrar usuário")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro interno: {str(e)}")
 
 # -----------------------------
@@ -278,6 +589,9 @@ def fazer_login(request: Request, dados_login: LoginRequest, db: Session = Depen
      - token (renovação) -> dados_login.token
      - credenciais (email/login + senha)
     """
+    if not dados_login.token:
+        limite_login_conta.verificar(chave_ip_conta(request, dados_login.email_ou_login))
+
     try:
         usuario = None
 
@@ -303,16 +617,16 @@ def fazer_login(request: Request, dados_login: LoginRequest, db: Session = Depen
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao fazer login")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao fazer login: {str(e)}")
 
 # -----------------------------
 # /me/starting - atualiza dados do "Starting"
 # -----------------------------
-@app.put("/me/starting", response_model=dict)
+@app.put("/me/starting", response_model=StartingAtualizadoResponse)
 def atualizar_dados_starting(
     dados: StartingDataUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_limitado),
     db: Session = Depends(get_db),
 ):
     """
@@ -323,127 +637,124 @@ def atualizar_dados_starting(
         usuario = buscar_usuario_por_id(db, current_user["user_id"])
         validar_usuario_existente(usuario)
 
-        fields = [
-            "desejo_nome",
-            "desejo_descricao",
-            "sentimentos_selecionados",
-            "caminho_selecionado",
-            "teste_resultados",
-        ]
-
-        dados_atualizacao: Dict[str, Any] = {}
-        for field in fields:
-            if hasattr(dados, field):
-                valor = getattr(dados, field)
-                if valor is not None:
-                    dados_atualizacao[field] = valor
+        dados_atualizacao = campos_starting(dados)
 
         if dados_atualizacao:
             usuario_atualizado = atualizar_usuario(db, usuario.id, dados_atualizacao)
         else:
             usuario_atualizado = usuario  # nada a atualizar
 
-        # Construindo resposta consistente
-        resposta_dados = {
-            "desejo_nome": usuario_atualizado.desejo_nome,
-            "desejo_descricao": usuario_atualizado.desejo_descricao,
-            "sentimentos_selecionados": usuario_atualizado.sentimentos_selecionados,
-            "caminho_selecionado": usuario_atualizado.caminho_selecionado,
-            "teste_resultados": usuario_atualizado.teste_resultados,
-        }
-
-        return {
-            "sucesso": True,
-            "message": "Dados da jornada atualizados com sucesso",
-            "dados_atualizados": resposta_dados,
-            "updated_at": _safe_now().isoformat(),
-        }
+        return StartingAtualizadoResponse(
+            sucesso=True,
+            message="Dados da jornada atualizados com sucesso",
+            dados_atualizados=StartingResponse.model_validate(usuario_atualizado),
+            updated_at=_safe_now(),
+        )
 
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao atualizar dados de starting")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao atualizar dados: {str(e)}")
 
 # -----------------------------
 # /me - informações do usuário autenticado
 # -----------------------------
-@app.get("/me", response_model=dict)
+@app.get("/me", response_model=MeResponse)
 def get_current_user_info(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: dict = Depends(get_current_user_limitado),
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    fields: Optional[str] = FIELDS_QUERY,
 ):
-    """Retorna informações completas do usuário autenticado"""
+    """
+    Retorna informações completas do usuário autenticado.
+    Com If-None-Match, responde 304 se o ETag não mudou; a linha lida para
+    comparar (só as colunas da resposta + versao) é a mesma usada na
+    resposta, então é sempre uma consulta só.
+    Com fields=, busca e serializa só os campos pedidos.
+    """
+    campos = campos_pedidos(fields, MeResponse)
     try:
-        usuario = buscar_usuario_por_id(db, current_user["user_id"])
-        validar_usuario_existente(usuario)
-
-        return {
-            "id": usuario.id,
-            "login": usuario.login,
-            "email": usuario.email,
-            "tag": usuario.tag,
-            "plan": usuario.plan,
-            "plan_date": usuario.plan_date,
-            "token_duration": obter_duracao_plano(usuario),
-            "expires": calcular_dias_restantes(usuario),
-            "created_at": usuario.created_at,
-            # Starting
-            "desejo_nome": usuario.desejo_nome,
-            "desejo_descricao": usuario.desejo_descricao,
-            "sentimentos_selecionados": usuario.sentimentos_selecionados,
-            "caminho_selecionado": usuario.caminho_selecionado,
-            "teste_resultados": usuario.teste_resultados,
-            # ✨ PROGRESSO (CAMPOS SEPARADOS)
-            "semana_atual": usuario.semana_atual or 1,
-            "dia_atual": usuario.dia_atual or 1,
-            "progresso_atualizado_em": usuario.progresso_atualizado_em,
-        }
+        usuario_id = current_user["user_id"]
+        if campos is None:
+            linha = buscar_campos_usuario(db, usuario_id, ["versao", *COLUNAS_ME])
+            validar_usuario_existente(linha)
+            etag = etag_me(usuario_id, linha)
+            if if_none_match and etag_corresponde(if_none_match, etag):
+                return resposta_nao_modificada(etag)
+
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "private, no-cache"
+            return MeResponse.model_validate(linha)
+
+        # Com fields=, a consulta traz só as colunas pedidas + versao, com ou
+        # sem If-None-Match (o cliente que faz polling sempre manda o header)
+        linha = buscar_campos_usuario(db, usuario_id, ["versao", *colunas_para_campos(campos, MeResponse)])
+        validar_usuario_existente(linha)
+        etag = etag_me(usuario_id, linha, campos)
+        if if_none_match and etag_corresponde(if_none_match, etag):
+            return resposta_nao_modificada(etag)
+
+        valores = linha._asdict()
+        valores.pop("versao")
+        return ClasseRespostaPadrao(
+            serializar_parcial(MeResponse, valores, campos),
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+        )
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao obter dados do usuário")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao buscar usuário: {str(e)}"
         )
 
-@app.get("/me/progresso", response_model=dict)
+@app.get("/me/progresso", response_model=ProgressoEnvelopeResponse)
 def obter_progresso(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: dict = Depends(get_current_user_limitado),
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
 ):
     """
     Retorna o progresso atual do usuário na jornada.
     Usa campos separados: semana_atual, dia_atual, progresso_atualizado_em
+    Com If-None-Match, responde 304 se progresso_atualizado_em não mudou
+    (mesma consulta, só das colunas de progresso, usada na resposta completa).
     """
     try:
-        usuario = buscar_usuario_por_id(db, current_user["user_id"])
-        validar_usuario_existente(usuario)
-        
-        return {
-            "sucesso": True,
-            "progresso": {
-                "semana_atual": usuario.semana_atual or 1,
-                "dia_atual": usuario.dia_atual or 1,
-                "progresso_atualizado_em": usuario.progresso_atualizado_em.isoformat() if usuario.progresso_atualizado_em else None,
-            }
-        }
+        usuario_id = current_user["user_id"]
+        linha = buscar_campos_usuario(db, usuario_id, COLUNAS_PROGRESSO)
+        validar_usuario_existente(linha)
+
+        etag = etag_progresso(usuario_id, linha)
+        if if_none_match and etag_corresponde(if_none_match, etag):
+            return resposta_nao_modificada(etag)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+        return ProgressoEnvelopeResponse(
+            sucesso=True,
+            progresso=ProgressoResponse.model_validate(linha),
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao obter progresso")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao obter progresso: {str(e)}"
         )
 
 
-@app.put("/me/progresso", response_model=dict)
+@app.put("/me/progresso", response_model=ProgressoAtualizadoResponse)
 def atualizar_progresso(
     dados: ProgressoUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_limitado),
     db: Session = Depends(get_db)
 ):
     """
@@ -454,45 +765,32 @@ def atualizar_progresso(
         usuario = buscar_usuario_por_id(db, current_user["user_id"])
         validar_usuario_existente(usuario)
         
-        # Atualiza campos fornecidos
-        campos_atualizados = {}
-        
-        if dados.semana_atual is not None:
-            campos_atualizados["semana_atual"] = dados.semana_atual
-        
-        if dados.dia_atual is not None:
-            campos_atualizados["dia_atual"] = dados.dia_atual
-        
-        # Sempre atualiza timestamp
-        campos_atualizados["progresso_atualizado_em"] = datetime.utcnow()
+        # Campos fornecidos + timestamp
+        campos_atualizados = campos_progresso(dados)
         
         # Atualiza no banco
         usuario_atualizado = atualizar_usuario(db, usuario.id, campos_atualizados)
         
-        return {
-            "sucesso": True,
-            "message": "Progresso atualizado com sucesso",
-            "progresso": {
-                "semana_atual": usuario_atualizado.semana_atual,
-                "dia_atual": usuario_atualizado.dia_atual,
-                "progresso_atualizado_em": usuario_atualizado.progresso_atualizado_em.isoformat() if usuario_atualizado.progresso_atualizado_em else None,
-            }
-        }
+        return ProgressoAtualizadoResponse(
+            sucesso=True,
+            message="Progresso atualizado com sucesso",
+            progresso=ProgressoResponse.model_validate(usuario_atualizado),
+        )
         
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Erro ao atualizar progresso")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao atualizar progresso: {str(e)}"
         )
 
 
-@app.post("/me/progresso/avancar", response_model=dict)
+@app.post("/me/progresso/avancar", response_model=ProgressoAtualizadoResponse)
 def avancar_dia(
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_limitado),
     db: Session = Depends(get_db)
 ):
     """
@@ -503,117 +801,369 @@ def avancar_dia(
         usuario = buscar_usuario_por_id(db, current_user["user_id"])
         validar_usuario_existente(usuario)
         
-        semana = usuario.semana_atual or 1
-        dia = usuario.dia_atual or 1
-        
-        # Lógica de avanço
-        if dia < 7:
-            dia += 1
-        elif semana < 12:
-            semana += 1
-            dia = 1
-        else:
+        campos_atualizados = proximo_progresso(usuario)
+        if campos_atualizados is None:
             # Jornada completa
-            return {
-                "sucesso": False,
-                "message": "Jornada completa! Parabéns por concluir todas as 12 semanas!",
-                "progresso": {
-                    "semana_atual": semana,
-                    "dia_atual": dia,
-                    "progresso_atualizado_em": usuario.progresso_atualizado_em.isoformat() if usuario.progresso_atualizado_em else None,
-                }
-            }
-        
-        # Atualiza no banco
-        campos_atualizados = {
-            "semana_atual": semana,
-            "dia_atual": dia,
-            "progresso_atualizado_em": datetime.utcnow()
-        }
+            return ProgressoAtualizadoResponse(
+                sucesso=False,
+                message="Jornada completa! Parabéns por concluir todas as 12 semanas!",
+                progresso=ProgressoResponse.model_validate(usuario),
+            )
         
         usuario_atualizado = atualizar_usuario(db, usuario.id, campos_atualizados)
         
-        return {
-            "sucesso": True,
-            "message": f"Avançado para Semana {semana}, Dia {dia}",
-            "progresso": {
-                "semana_atual": usuario_atualizado.semana_atual,
-                "dia_atual": usuario_atualizado.dia_atual,
-                "progresso_atualizado_em": usuario_atualizado.progresso_atualizado_em.isoformat() if usuario_atualizado.progresso_atualizado_em else None,
-            }
-        }
+        return ProgressoAtualizadoResponse(
+            sucesso=True,
+            message=f"Avançado para Semana {usuario_atualizado.semana_atual}, Dia {usuario_atualizado.dia_atual}",
+            progresso=ProgressoResponse.model_validate(usuario_atualizado),
+        )
         
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Erro ao avançar dia")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao avançar progresso: {str(e)}"
         )
 
 
+# -----------------------------
+# /batch - várias operações /me* em uma chamada
+# -----------------------------
+def _batch_me(usuario, corpo):
+    return MeResponse.model_validate(usuario)
+
+def _batch_obter_progresso(usuario, corpo):
+    return ProgressoEnvelopeResponse(sucesso=True, progresso=ProgressoResponse.model_validate(usuario))
+
+def _batch_atualizar_progresso(usuario, corpo):
+    aplicar_campos(usuario, campos_progresso(ProgressoUpdate(**(corpo or {}))))
+    return ProgressoAtualizadoResponse(
+        sucesso=True,
+        message="Progresso atualizado com sucesso",
+        progresso=ProgressoResponse.model_validate(usuario),
+    )
+
+def _batch_avancar(usuario, corpo):
+    campos = proximo_progresso(usuario)
+    if campos is None:
+        return ProgressoAtualizadoResponse(
+            sucesso=False,
+            message="Jornada completa! Parabéns por concluir todas as 12 semanas!",
+            progresso=ProgressoResponse.model_validate(usuario),
+        )
+    aplicar_campos(usuario, campos)
+    return ProgressoAtualizadoResponse(
+        sucesso=True,
+        message=f"Avançado para Semana {usuario.semana_atual}, Dia {usuario.dia_atual}",
+        progresso=ProgressoResponse.model_validate(usuario),
+    )
+
+def _batch_atualizar_starting(usuario, corpo):
+    aplicar_campos(usuario, campos_starting(StartingDataUpdate(**(corpo or {}))))
+    return StartingAtualizadoResponse(
+        sucesso=True,
+        message="Dados da jornada atualizados com sucesso",
+        dados_atualizados=StartingResponse.model_validate(usuario),
+        updated_at=_safe_now(),
+    )
+
+# (método, caminho) -> função(usuario, corpo) que retorna o mesmo modelo da rota
+OPERACOES_BATCH = {
+    ("GET", "/me"): _batch_me,
+    ("GET", "/me/progresso"): _batch_obter_progresso,
+    ("PUT", "/me/progresso"): _batch_atualizar_progresso,
+    ("POST", "/me/progresso/avancar"): _batch_avancar,
+    ("PUT", "/me/starting"): _batch_atualizar_starting,
+}
+
+@app.post("/batch", response_model=BatchResponse)
+def executar_batch(
+    dados: BatchRequest,
+    current_user: dict = Depends(usuario_limitado(custo_batch)),
+    db: Session = Depends(get_db),
+):
+    """
+    Executa várias operações /me* com uma verificação de token, uma sessão
+    e uma transação. As operações rodam em ordem e veem as alterações das
+    anteriores. Se alguma falhar nada é gravado: sucesso=false, a operação
+    que falhou traz o erro e as seguintes vêm com status 424.
+    Cada operação conta no limite por usuário como uma requisição (custo_batch).
+    """
+    try:
+        usuario = buscar_usuario_por_id(db, current_user["user_id"])
+        validar_usuario_existente(usuario)
+
+        resultados = []
+        falhou = False
+        for operacao in dados.operacoes:
+            if falhou:
+                resultados.append({"status": status.HTTP_424_FAILED_DEPENDENCY, "corpo": {"detail": "Não executada: operação anterior falhou"}})
+                continue
+
+            executar = OPERACOES_BATCH.get((operacao.metodo, operacao.caminho))
+            if executar is None:
+                falhou = True
+                resultados.append({
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "corpo": {"detail": f"Operação não suportada no batch: {operacao.metodo} {operacao.caminho}"},
+                })
+                continue
+
+            try:
+                resposta = executar(usuario, operacao.corpo)
+                resultados.append({"status": status.HTTP_200_OK, "corpo": resposta.model_dump(mode="json")})
+            except ValidationError as e:
+                falhou = True
+                erros = [{"loc": list(erro["loc"]), "msg": erro["msg"], "type": erro["type"]} for erro in e.errors()]
+                resultados.append({"status": status.HTTP_422_UNPROCESSABLE_ENTITY, "corpo": {"detail": erros}})
+            except HTTPException as e:
+                falhou = True
+                resultados.append({"status": e.status_code, "corpo": {"detail": e.detail}})
+
+        if falhou:
+            db.rollback()
+        else:
+            db.commit()
+
+        return {"sucesso": not falhou, "resultados": resultados}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.exception("Erro ao executar batch")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao executar batch: {str(e)}")
+
+
 # -----------------------------
 # Listar usuários (apenas admins/testers)
 # -----------------------------
 @app.get("/usuarios", response_model=List[UsuarioResponse])
-def listar_usuarios_endpoint(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    """Lista todos os usuários (requer autenticação e tag admin/tester)"""
+def listar_usuarios_endpoint(
+    current_user: dict = Depends(get_current_user_limitado),
+    db: Session = Depends(get_db),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    """
+    Lista todos os usuários (requer autenticação e tag admin/tester).
+    Com fields=, busca e serializa só os campos pedidos. Os campos aceitos são
+    os de UsuarioResponse: os calculados de /me (expires, token_duration) não
+    fazem parte desta resposta, e pedi-los em fields= dá 400.
+    """
+    campos = campos_pedidos(fields, UsuarioResponse)
     try:
         if current_user.get("tag") not in ["admin", "tester"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado: apenas admins podem listar usuários")
 
+        if campos is not None:
+            colunas = colunas_para_campos(campos, UsuarioResponse)
+            return ClasseRespostaPadrao([
+                serializar_parcial(UsuarioResponse, linha._asdict(), campos)
+                for linha in listar_campos_usuarios(db, colunas)
+            ])
+
         usuarios = listar_usuarios(db)
         return usuarios
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao listar usuários")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao listar usuários: {str(e)}")
 
+# -----------------------------
+# Envio de emails em lote (apenas admins)
+# -----------------------------
+def executar_envio_lote(job: dict, dados: EmailLoteRequest, email_service):
+    """
+    Envia os emails de um job de /admin/emails/lote e grava o resumo no job
+
+    Roda depois da resposta (BackgroundTasks), com sessão própria: a da
+    requisição já foi fechada.
+    """
+    db = SessionLocal()
+    try:
+        expira_em_dias = dados.expira_em_dias
+        if dados.tipo == "lembrete_plano" and expira_em_dias is None:
+            expira_em_dias = 7
+
+        usuarios = iterar_destinatarios(
+            db,
+            tag=dados.tag,
+            plan=dados.plan,
+            expira_em_dias=expira_em_dias,
+            tamanho_lote=dados.tamanho_lote or settings.email_batch_size,
+        )
+
+        if dados.tipo == "lembrete_plano":
+            resultados = email_service.enviar_lembretes_plano(
+                (
+                    {
+                        "email": u.email,
+                        "login": u.login,
+                        "plan": u.plan,
+                        "dias_restantes": calcular_dias_restantes(u),
+                    }
+                    for u in usuarios
+                ),
+                tamanho_lote=dados.tamanho_lote,
+            )
+        else:
+            resultados = email_service.enviar_em_lote(
+                ({"email": u.email, "nome": u.login, "params": {"login": u.login}} for u in usuarios),
+                assunto=dados.assunto,
+                corpo_html=dados.mensagem_html,
+                tamanho_lote=dados.tamanho_lote,
+            )
+
+        falhas = [r for r in resultados if not r["sucesso"]]
+        job.update(
+            status="concluido",
+            total=len(resultados),
+            enviados=len(resultados) - len(falhas),
+            falhas=len(falhas),
+            resultados_com_falha=falhas,
+        )
+        logger.info(
+            "Envio em lote concluído",
+            extra={"job_id": job["job_id"], "total": job["total"], "falhas": job["falhas"]},
+        )
+    except Exception as e:
+        logger.exception("Erro ao enviar emails em lote", extra={"job_id": job["job_id"]})
+        job.update(status="erro", erro=str(e))
+    finally:
+        job["concluido_em"] = _safe_now()
+        db.close()
+
+@app.post("/admin/emails/lote", response_model=EmailLoteJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def enviar_emails_lote_endpoint(
+    dados: EmailLoteRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Envia uma campanha ou lembretes de expiração de plano para vários usuários.
+
+    O envio roda em segundo plano: a resposta (202) traz o job_id, e o
+    resumo fica em GET /admin/emails/lote/{job_id} quando o envio terminar.
+    Os destinatários são lidos do banco em streaming e enviados em lotes ao Brevo.
+    """
+    exigir_admin(current_user)
+
+    if dados.tipo == "campanha" and (not dados.assunto or not dados.mensagem_html):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Campanha exige assunto e mensagem_html")
+
+    email_service = get_email_service()
+    if not email_service or not settings.email_enabled:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Serviço de email não disponível")
+
+    job = {"job_id": uuid.uuid4().hex, "status": "em_andamento", "criado_em": _safe_now()}
+    jobs_email_lote.set(job["job_id"], job)
+    background_tasks.add_task(executar_envio_lote, job, dados, email_service)
+    return job
+
+@app.get("/admin/emails/lote/{job_id}", response_model=EmailLoteJobResponse)
+def consultar_envio_lote(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Estado de um envio em lote (em memória do worker que recebeu o envio, por 24h)"""
+    exigir_admin(current_user)
+    job = jobs_email_lote.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Envio em lote não encontrado")
+    return job
+
+@app.get("/admin/email/circuito", response_model=dict)
+def estado_circuito_email(current_user: dict = Depends(get_current_user)):
+    """Estado do circuit breaker do Brevo: estado atual, contadores e transições recentes"""
+    exigir_admin(current_user)
+    return brevo_circuit.estado_atual()
+
+@app.get("/admin/consultas-lentas", response_model=List[dict])
+def listar_consultas_lentas(
+    limite: int = Query(20, ge=1, le=200),
+    ordenar_por: str = Query("total_ms", pattern="^(total_ms|max_ms|media_ms|execucoes)$"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Consultas mais lentas que SLOW_QUERY_MS agrupadas por fingerprint (SQL
+    normalizado), com o último plano de execução capturado. Os valores são
+    do worker que atendeu a requisição.
+    """
+    exigir_admin(current_user)
+    return consultas_lentas.mais_lentas(limite, ordenar_por)
+
+@app.delete("/admin/consultas-lentas", status_code=status.HTTP_204_NO_CONTENT)
+def limpar_consultas_lentas(current_user: dict = Depends(get_current_user)):
+    """Zera as estatísticas de consultas lentas deste worker"""
+    exigir_admin(current_user)
+    consultas_lentas.limpar()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@app.get("/admin/perfis", response_model=List[dict])
+def listar_perfis(current_user: dict = Depends(get_current_user)):
+    """Perfis de requisição gravados (mais recentes primeiro)"""
+    exigir_admin(current_user)
+    return perfil.armazem_perfis.listar()
+
+@app.get("/admin/perfis/{nome}")
+def baixar_perfil(nome: str, current_user: dict = Depends(get_current_user)):
+    """
+    Download de um perfil .prof. Abrir com:
+        python -m pstats arquivo.prof   ou   snakeviz arquivo.prof
+    """
+    exigir_admin(current_user)
+    caminho = perfil.armazem_perfis.caminho(nome)
+    if caminho is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil não encontrado")
+    return FileResponse(caminho, media_type="application/octet-stream", filename=nome)
+
 # -----------------------------
 # Recuperação de senha (tempkey) - 3 estágios
 # -----------------------------
-@app.post("/tempkey", response_model=dict)
+@app.post("/tempkey", response_model=RecuperacaoSenhaResponse, response_model_exclude_unset=True)
 @limiter.limit(settings.rate_limit_tempkey)
-def recuperar_senha_endpoint(request: Request, dados_login: LoginRequest, db: Session = Depends(get_db)):
+def recuperar_senha_endpoint(
+    request: Request,
+    dados_login: LoginRequest,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
     """
     Recuperação de senha em 3 estágios:
      1) Enviar email com código (email_ou_login)
+        - pedidos repetidos dentro de TEMPKEY_DEDUP_SECONDS reaproveitam o código pendente
+        - header opcional Idempotency-Key devolve a mesma resposta para o mesmo pedido
      2) Validar código (email_ou_login + tempKey)
      3) Alterar senha (email_ou_login + tempKey + new_password)
     """
+    limite_tempkey_conta.verificar(chave_ip_conta(request, dados_login.email_ou_login))
+
     try:
         usuario = get_usuario_by_email_or_login(db, dados_login.email_ou_login)
         validar_usuario_existente(usuario)
 
         # ---------- ESTÁGIO 1: ENVIAR CÓDIGO ----------
         if not getattr(dados_login, "tempKey", None) and not getattr(dados_login, "new_password", None):
-            tempkey, hashKey = gerar_tempkey()
-            expires = _safe_now() + timedelta(minutes=15)
-
-            atualizar_usuario(db, usuario.id, {"temp_senha": hashKey, "temp_senha_expira": expires})
-
-            email_service = get_email_service()
-            # Se não houver serviço de email configurado ou desabilitado, retornamos o tempkey como fallback
-            if not email_service or not settings.email_enabled:
-                return {
-                    "tempkey": tempkey,
-                    "message": "Serviço de email não disponível. Código mostrado como fallback.",
-                    "email_sent": False,
-                    "stage": 1,
-                }
-
-            try:
-                email_enviado = email_service.enviar_tempkey(email=usuario.email, login=usuario.login, tempkey=tempkey)
-                if email_enviado:
-                    return {"tempkey": None, "message": f"Código de recuperação enviado para {usuario.email}", "email_sent": True, "expires_in": "15 minutos", "stage": 1}
-                else:
-                    return {"tempkey": tempkey, "message": "Falha ao enviar email. Código exibido como fallback.", "email_sent": False, "stage": 1}
-            except Exception:
-                traceback.print_exc()
-                return {"tempkey": tempkey, "message": "Erro ao enviar email. Código exibido como fallback.", "email_sent": False, "stage": 1}
+            if idempotency_key:
+                # Só repete a resposta se o código dela ainda é o pendente:
+                # depois de usado (estágio 3), expirado ou substituído, a
+                # mesma chave gera um código novo
+                anterior = respostas_idempotentes.get((usuario.id, idempotency_key))
+                if anterior is not None and codigo_ainda_pendente(usuario, anterior["hash"]):
+                    return anterior["resposta"]
+
+            pendente = tempkeys_pendentes.get(usuario.id)
+            if pendente and codigo_ainda_pendente(usuario, pendente["hash"]):
+                # Reenvio dentro da janela: devolve o status do código pendente
+                # sem gerar hash, gravar no banco ou chamar o Brevo de novo
+                resposta = montar_resposta_codigo_pendente(usuario, pendente["resposta"])
+            else:
+                resposta = emitir_codigo_recuperacao(db, usuario)
+
+            if idempotency_key:
+                respostas_idempotentes.set((usuario.id, idempotency_key), {"hash": usuario.temp_senha, "resposta": resposta})
+            return resposta
 
         # ---------- ESTÁGIO 2: VALIDAR CÓDIGO ----------
         if getattr(dados_login, "tempKey", None) and not getattr(dados_login, "new_password", None):
@@ -626,6 +1176,7 @@ def recuperar_senha_endpoint(request: Request, dados_login: LoginRequest, db: Se
                 usuario.temp_senha = None
                 usuario.temp_senha_expira = None
                 db.commit()
+                tempkeys_pendentes.pop(usuario.id)
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Código expirado")
             if not verify_password(str(dados_login.tempKey), usuario.temp_senha):
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Código inválido")
@@ -642,6 +1193,7 @@ def recuperar_senha_endpoint(request: Request, dados_login: LoginRequest, db: Se
                 usuario.temp_senha = None
                 usuario.temp_senha_expira = None
                 db.commit()
+                tempkeys_pendentes.pop(usuario.id)
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Código expirado. Solicite um novo.")
 
             if not verify_password(str(dados_login.tempKey), usuario.temp_senha):
@@ -654,6 +1206,7 @@ def recuperar_senha_endpoint(request: Request, dados_login: LoginRequest, db: Se
                 usuario.temp_senha_expira = None
                 db.commit()
                 db.refresh(usuario)
+                tempkeys_pendentes.pop(usuario.id)
 
                 return {
                     "sucesso": True,
@@ -665,7 +1218,7 @@ def recuperar_senha_endpoint(request: Request, dados_login: LoginRequest, db: Se
                 }
             except Exception as e:
                 db.rollback()
-                traceback.print_exc()
+                logger.exception("Erro ao alterar senha")
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao alterar senha: {str(e)}")
 
         # Se nenhum caso foi atendido
@@ -674,15 +1227,14 @@ def recuperar_senha_endpoint(request: Request, dados_login: LoginRequest, db: Se
     except HTTPException:
         raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erro ao processar recuperação de senha")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro ao processar recuperação de senha: {str(e)}")
 
 # -----------------------------
 # Main util (para execução local / debug)
 # -----------------------------
 def main():
-    print("FastAPI app configurado com sucesso!")
-    print("✅ Rate Limiting ativo!")
+    logger.info("FastAPI app configurado com sucesso")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,17 @@
+from .compressao import CompressaoMiddleware
+from .metricas import MetricasMiddleware
+from .orcamento_consultas import OrcamentoConsultasMiddleware
+from .perfil import PerfilMiddleware
+from .request_id import RequestIdMiddleware
+from .server_timing import ServerTimingMiddleware
+from .tracing import TracingMiddleware
+
+__all__ = [
+    'CompressaoMiddleware',
+    'MetricasMiddleware',
+    'OrcamentoConsultasMiddleware',
+    'PerfilMiddleware',
+    'RequestIdMiddleware',
+    'ServerTimingMiddleware',
+    'TracingMiddleware',
+]
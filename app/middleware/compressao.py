@@ -0,0 +1,207 @@
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só gzip é oferecido
+    brotli = None
+
+
+def _tipo_json(content_type: str) -> bool:
+    tipo = content_type.split(";", 1)[0].strip().lower()
+    return tipo == "application/json" or tipo.endswith("+json")
+
+
+def escolher_codificacao(accept_encoding: str) -> Optional[str]:
+    """
+    Escolhe "br" ou "gzip" conforme o header Accept-Encoding (respeitando q=0)
+
+    Returns:
+        Codificação escolhida ou None se o cliente não aceitar nenhuma
+    """
+    aceitas = {}
+    for item in accept_encoding.lower().split(","):
+        partes = item.strip().split(";")
+        nome = partes[0].strip()
+        if not nome:
+            continue
+        peso = 1.0
+        for parametro in partes[1:]:
+            chave, _, valor = parametro.strip().partition("=")
+            if chave == "q":
+                try:
+                    peso = float(valor)
+                except ValueError:
+                    peso = 0.0
+        aceitas[nome] = peso
+
+    def aceita(nome: str) -> bool:
+        return aceitas.get(nome, aceitas.get("*", 0.0)) > 0
+
+    if brotli is not None and aceita("br"):
+        return "br"
+    if aceita("gzip"):
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Compressão incremental: cada chunk é liberado ao cliente assim que comprimido"""
+
+    def __init__(self, codificacao: str, nivel_gzip: int, qualidade_brotli: int):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=qualidade_brotli)
+        else:
+            # wbits=31: formato gzip (cabeçalho + CRC)
+            self._gzip = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.flush()
+        return self._gzip.compress(dados) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self, dados: bytes = b"") -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.finish()
+        return self._gzip.compress(dados) + self._gzip.flush()
+
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI que comprime respostas JSON com gzip ou brotli
+
+    Só comprime quando o cliente aceita a codificação, o content-type é JSON e
+    o corpo tem pelo menos `minimo_bytes`. Respostas em streaming (várias
+    mensagens de corpo) são acumuladas até atingir o mínimo e, a partir daí,
+    comprimidas chunk a chunk sem esperar o fim.
+    """
+
+    def __init__(self, app, minimo_bytes: int = 1024, nivel_gzip: int = 6, qualidade_brotli: int = 4):
+        """
+        Args:
+            app: Aplicação ASGI
+            minimo_bytes: Tamanho mínimo do corpo para comprimir
+            nivel_gzip: Nível do gzip (1 = mais rápido, 9 = menor)
+            qualidade_brotli: Qualidade do brotli (0 = mais rápido, 11 = menor)
+        """
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for nome, valor in scope.get("headers", []):
+            if nome == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+        codificacao = escolher_codificacao(accept_encoding) if accept_encoding else None
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _RespostaComprimida(self, codificacao, send).executar(scope, receive)
+
+
+class _RespostaComprimida:
+    """Estado de uma resposta: decide se comprime e reescreve as mensagens enviadas"""
+
+    def __init__(self, middleware: CompressaoMiddleware, codificacao: str, send):
+        self.middleware = middleware
+        self.codificacao = codificacao
+        self.send = send
+        self.inicio: Optional[dict] = None
+        self.pendente: List[bytes] = []
+        self.tamanho_pendente = 0
+        self.compressor: Optional[_Compressor] = None
+        self.repassar = False
+
+    async def executar(self, scope, receive):
+        await self.middleware.app(scope, receive, self.enviar)
+
+    async def enviar(self, mensagem: dict):
+        if self.repassar:
+            await self.send(mensagem)
+            return
+
+        if mensagem["type"] == "http.response.start":
+            self.inicio = mensagem
+            if not self._elegivel(mensagem):
+                self.repassar = True
+                await self.send(mensagem)
+            return
+
+        if mensagem["type"] != "http.response.body":
+            await self.send(mensagem)
+            return
+
+        corpo = mensagem.get("body", b"")
+        mais = mensagem.get("more_body", False)
+
+        if self.compressor is not None:
+            dados = self.compressor.comprimir(corpo) if mais else self.compressor.finalizar(corpo)
+            if dados or not mais:
+                await self.send({"type": "http.response.body", "body": dados, "more_body": mais})
+            return
+
+        self.pendente.append(corpo)
+        self.tamanho_pendente += len(corpo)
+
+        if self.tamanho_pendente < self.middleware.minimo_bytes:
+            if mais:
+                return
+            # Terminou abaixo do mínimo: envia sem comprimir
+            await self.send(self.inicio)
+            await self.send({"type": "http.response.body", "body": b"".join(self.pendente), "more_body": False})
+            return
+
+        self.compressor = _Compressor(self.codificacao, self.middleware.nivel_gzip, self.middleware.qualidade_brotli)
+        acumulado = b"".join(self.pendente)
+        self.pendente = []
+        if mais:
+            dados = self.compressor.comprimir(acumulado)
+            await self.send(self._inicio_comprimido(None))
+        else:
+            dados = self.compressor.finalizar(acumulado)
+            await self.send(self._inicio_comprimido(len(dados)))
+        await self.send({"type": "http.response.body", "body": dados, "more_body": mais})
+
+    def _elegivel(self, inicio: dict) -> bool:
+        if inicio["status"] < 200 or inicio["status"] in (204, 304):
+            return False
+        content_type = ""
+        for nome, valor in inicio.get("headers", []):
+            nome = nome.lower()
+            if nome == b"content-encoding":
+                return False
+            if nome == b"content-type":
+                content_type = valor.decode("latin-1")
+        return _tipo_json(content_type)
+
+    def _inicio_comprimido(self, tamanho: Optional[int]) -> dict:
+        headers: List[Tuple[bytes, bytes]] = []
+        vary = None
+        for nome, valor in self.inicio.get("headers", []):
+            nome_min = nome.lower()
+            if nome_min == b"content-length":
+                continue
+            if nome_min == b"vary":
+                vary = valor
+                continue
+            headers.append((nome, valor))
+
+        headers.append((b"content-encoding", self.codificacao.encode()))
+        if tamanho is not None:
+            headers.append((b"content-length", str(tamanho).encode()))
+        if vary is None:
+            headers.append((b"vary", b"Accept-Encoding"))
+        elif b"accept-encoding" not in vary.lower():
+            headers.append((b"vary", vary + b", Accept-Encoding"))
+        else:
+            headers.append((b"vary", vary))
+        return {**self.inicio, "headers": headers}
@@ -0,0 +1,53 @@
+import time
+
+from anyio.to_thread import current_default_thread_limiter
+
+from ..utils.metricas import (
+    latencia_requisicao,
+    requisicoes_em_andamento,
+    requisicoes_total,
+    threadpool_capacidade,
+    threadpool_em_uso,
+)
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que registra quantidade e latência das requisições
+
+    A rota é o template do FastAPI (ex.: "/me/progresso"), não o caminho
+    bruto, para a cardinalidade dos labels ficar limitada. A ocupação da
+    threadpool das endpoints síncronas é amostrada a cada requisição.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        limitador = current_default_thread_limiter()
+        threadpool_capacidade.set(limitador.total_tokens)
+        threadpool_em_uso.set(limitador.borrowed_tokens)
+        requisicoes_em_andamento.inc()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            requisicoes_em_andamento.dec()
+            threadpool_em_uso.set(limitador.borrowed_tokens)
+
+            rota = scope.get("route")
+            rotulos = (scope["method"], rota.path if rota is not None else "nao_encontrada", str(status))
+            requisicoes_total.labels(*rotulos).inc()
+            latencia_requisicao.labels(*rotulos).observe(time.perf_counter() - inicio)
@@ -0,0 +1,36 @@
+import logging
+
+from ..utils.orcamento_consultas import consultas_da_requisicao, orcamento_da_rota
+
+logger = logging.getLogger('app.orcamento_consultas')
+
+
+class OrcamentoConsultasMiddleware:
+    """
+    Middleware ASGI que registra no log as requisições que executaram mais
+    statements SQL que o orçamento da rota (ORCAMENTO_CONSULTAS)
+
+    Usa a contagem da fase "db" de app.utils.tempos, então precisa ficar
+    dentro do ServerTimingMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rota = scope.get("route")
+            if rota is not None:
+                limite = orcamento_da_rota(scope["method"], rota.path)
+                consultas = consultas_da_requisicao()
+                if limite is not None and consultas > limite:
+                    logger.warning(
+                        "Orçamento de consultas excedido",
+                        extra={"metodo": scope["method"], "rota": rota.path, "consultas": consultas, "orcamento": limite},
+                    )
@@ -0,0 +1,55 @@
+import random
+
+from ..utils.jwt_auth import verify_token
+from ..utils.perfil import perfil_solicitado
+
+HEADER_PERFIL = b"x-profile"
+
+
+class PerfilMiddleware:
+    """
+    Middleware ASGI que decide se a requisição será perfilada
+
+    A requisição é perfilada quando traz o header X-Profile com um token de
+    admin, ou quando a amostragem aleatória (`taxa_amostragem`) sorteia. A
+    execução sob cProfile fica a cargo de RotaPerfilavel; o nome do arquivo
+    gerado volta no header X-Profile-Id.
+    """
+
+    def __init__(self, app, taxa_amostragem: float = 0.0):
+        self.app = app
+        self.taxa_amostragem = taxa_amostragem
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._perfilar(scope):
+            await self.app(scope, receive, send)
+            return
+
+        pedido = {"metodo": scope["method"], "arquivo": None}
+        token = perfil_solicitado.set(pedido)
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start" and pedido["arquivo"]:
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"x-profile-id", pedido["arquivo"].encode())]}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            perfil_solicitado.reset(token)
+
+    def _perfilar(self, scope) -> bool:
+        headers = dict(scope.get("headers", []))
+        if HEADER_PERFIL in headers:
+            return self._eh_admin(headers.get(b"authorization", b""))
+        return self.taxa_amostragem > 0 and random.random() < self.taxa_amostragem
+
+    @staticmethod
+    def _eh_admin(authorization: bytes) -> bool:
+        esquema, _, token = authorization.decode("latin-1").partition(" ")
+        if esquema.lower() != "bearer" or not token:
+            return False
+        try:
+            return verify_token(token).get("tag") == "admin"
+        except Exception:
+            return False
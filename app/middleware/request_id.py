@@ -0,0 +1,46 @@
+import re
+import uuid
+
+from ..core.logs import request_id_atual
+
+# IDs recebidos de proxies/clientes: aceitos só se forem curtos e seguros para log
+_ID_VALIDO = re.compile(r"^[\w.:-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI que identifica cada requisição
+
+    Usa o header X-Request-ID recebido (ex.: do proxy) ou gera um novo,
+    disponibiliza o valor para os logs (app.core.logs) e devolve no header
+    X-Request-ID da resposta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for nome, valor in scope.get("headers", []):
+            if nome == b"x-request-id":
+                valor = valor.decode("latin-1")
+                if _ID_VALIDO.match(valor):
+                    request_id = valor
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(mensagem)
+
+        token = request_id_atual.set(request_id)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            request_id_atual.reset(token)
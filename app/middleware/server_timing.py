@@ -0,0 +1,55 @@
+import logging
+import time
+
+from ..utils.tempos import encerrar_medicao, formatar_server_timing, iniciar_medicao, tempos_atuais
+
+logger = logging.getLogger('app.tempos')
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que mede o tempo por fase de cada requisição
+
+    As fases (db, bcrypt, jwt, email...) são acumuladas por app.utils.tempos.
+    O resultado vai para o log como campos estruturados e, se `emitir_header`,
+    também para o header Server-Timing da resposta.
+    """
+
+    def __init__(self, app, emitir_header: bool = True):
+        self.app = app
+        self.emitir_header = emitir_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        token = iniciar_medicao()
+        status = None
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                if self.emitir_header:
+                    total_ms = (time.perf_counter() - inicio) * 1000
+                    valor = formatar_server_timing(tempos_atuais(), total_ms)
+                    mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"server-timing", valor.encode())]}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "tempos da requisição",
+                    extra={
+                        "metodo": scope["method"],
+                        "rota": scope["path"],
+                        "status": status,
+                        "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2),
+                        "fases": tempos_atuais(),
+                    },
+                )
+            encerrar_medicao(token)
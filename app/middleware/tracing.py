@@ -0,0 +1,48 @@
+from ..utils import tracing
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre o span raiz de cada requisição
+
+    Continua o trace do header traceparent (W3C) quando recebido. Os spans
+    filhos (queries, bcrypt, JWT, chamadas HTTP) são criados por
+    app.utils.tracing a partir do span ativo no contexto. O nome do span usa
+    o template da rota (ex.: "GET /me/progresso").
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        rastreador = tracing.rastreador
+        if scope["type"] != "http" or rastreador is None:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for nome, valor in scope.get("headers", []):
+            if nome == b"traceparent":
+                traceparent = valor.decode("latin-1")
+                break
+
+        raiz = rastreador.iniciar_requisicao(f"{scope['method']} {scope['path']}", traceparent)
+        raiz.tag("http.method", scope["method"])
+        raiz.tag("http.path", scope["path"])
+        status = None
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        token = tracing.ativar_span(raiz)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            tracing.desativar_span(token)
+            rota = scope.get("route")
+            if rota is not None:
+                raiz.nome = f"{scope['method']} {rota.path}"
+            rastreador.finalizar_requisicao(raiz, status)
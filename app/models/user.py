@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, literal_column
 from datetime import datetime
 from ..database.connection import Base
 
@@ -26,4 +26,9 @@ class Usuario(Base):
     # ✨ NOVOS CAMPOS DE PROGRESSO
     semana_atual = Column(Integer, default=1, nullable=False)
     dia_atual = Column(Integer, default=1, nullable=False)
-    progresso_atualizado_em = Column(DateTime, nullable=True)
\ No newline at end of file
+    progresso_atualizado_em = Column(DateTime, nullable=True)
+    
+    # Versão da linha: incrementada pelo banco a cada UPDATE (usada nos ETags)
+    versao = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("versao + 1"))
+    # Momento do último INSERT/UPDATE feito pelo SQLAlchemy (marca da sincronização com o Postgres)
+    atualizado_em = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
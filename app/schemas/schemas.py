@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, computed_field, validator
 from datetime import datetime
-from typing import Optional, List, Dict
-from ..core.constants import VALID_USER_TAGS, VALID_USER_PLANS, MIN_PASSWORD_LENGTH
+from typing import Any, ClassVar, Optional, List, Dict, Tuple
+from ..core.constants import VALID_USER_TAGS, VALID_USER_PLANS, MIN_PASSWORD_LENGTH, BATCH_MAX_OPERACOES
+from ..utils.plans import calcular_dias_restantes, obter_duracao_plano
 
 class UsuarioCreate(BaseModel):
     login: str
@@ -258,7 +259,180 @@ class UsuarioResponse(BaseModel):
     dia_atual: int = 1
     progresso_atualizado_em: Optional[datetime] = None
 
+    @validator('semana_atual', 'dia_atual', pre=True)
+    def validate_progresso_default(cls, v):
+        return v or 1
+
+    class Config:
+        from_attributes = True
+
+
+class MeResponse(UsuarioResponse):
+    """Resposta de /me, construída direto da linha do banco"""
+
+    # Colunas lidas por cada campo calculado (para fields= selecionar só o necessário)
+    dependencias_calculadas: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        "token_duration": ("plan",),
+        "expires": ("plan", "plan_date"),
+    }
+
+    @computed_field
+    @property
+    def token_duration(self) -> int:
+        return obter_duracao_plano(self)
+
+    @computed_field
+    @property
+    def expires(self) -> int:
+        return calcular_dias_restantes(self)
+
+
+class ProgressoResponse(BaseModel):
+    semana_atual: int = 1
+    dia_atual: int = 1
+    progresso_atualizado_em: Optional[datetime] = None
+
+    @validator('semana_atual', 'dia_atual', pre=True)
+    def validate_progresso_default(cls, v):
+        return v or 1
+
     class Config:
         from_attributes = True
 
 
+class ProgressoEnvelopeResponse(BaseModel):
+    sucesso: bool
+    progresso: ProgressoResponse
+
+
+class ProgressoAtualizadoResponse(BaseModel):
+    sucesso: bool
+    message: str
+    progresso: ProgressoResponse
+
+
+class StartingResponse(BaseModel):
+    desejo_nome: Optional[str] = None
+    desejo_descricao: Optional[str] = None
+    sentimentos_selecionados: Optional[List[int]] = None
+    caminho_selecionado: Optional[str] = None
+    teste_resultados: Optional[Dict[str, float]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StartingAtualizadoResponse(BaseModel):
+    sucesso: bool
+    message: str
+    dados_atualizados: StartingResponse
+    updated_at: datetime
+
+
+class CadastroResponse(TokenResponse):
+    sucesso: bool
+    message: str
+    created_at: datetime
+
+
+class RecuperacaoSenhaResponse(BaseModel):
+    """Resposta dos 3 estágios de /tempkey (apenas os campos de cada estágio são enviados)"""
+    stage: int
+    message: str
+    tempkey: Optional[str] = None
+    email_sent: Optional[bool] = None
+    expires_in: Optional[str] = None
+    deduplicated: Optional[bool] = None
+    next_action: Optional[str] = None
+    sucesso: Optional[bool] = None
+    email: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class EmailLoteRequest(BaseModel):
+    """Schema para envio de emails em lote (admin)"""
+    tipo: str = "campanha"
+    assunto: Optional[str] = None
+    mensagem_html: Optional[str] = None
+    
+    # Filtros de destinatários
+    tag: Optional[str] = None
+    plan: Optional[str] = None
+    expira_em_dias: Optional[int] = None
+    
+    tamanho_lote: Optional[int] = None
+    
+    @validator('tipo')
+    def validate_tipo(cls, v):
+        tipos_validos = ['campanha', 'lembrete_plano']
+        if v not in tipos_validos:
+            raise ValueError(f'Tipo deve ser um de: {", ".join(tipos_validos)}')
+        return v
+    
+    @validator('expira_em_dias')
+    def validate_expira_em_dias(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('expira_em_dias não pode ser negativo')
+        return v
+    
+    @validator('tamanho_lote')
+    def validate_tamanho_lote(cls, v):
+        if v is not None and not 1 <= v <= 1000:
+            raise ValueError('Tamanho do lote deve estar entre 1 e 1000')
+        return v
+
+
+class ResultadoEnvioEmail(BaseModel):
+    email: str
+    sucesso: bool
+    message_id: Optional[str] = None
+    erro: Optional[str] = None
+
+
+class EmailLoteJobResponse(BaseModel):
+    """Envio em lote executado em segundo plano (status: em_andamento, concluido ou erro)"""
+    job_id: str
+    status: str
+    criado_em: datetime
+    concluido_em: Optional[datetime] = None
+    total: int = 0
+    enviados: int = 0
+    falhas: int = 0
+    erro: Optional[str] = None
+    # Só os destinatários com falha: a lista completa pode ter a tabela inteira
+    resultados_com_falha: List[ResultadoEnvioEmail] = []
+
+
+class OperacaoBatch(BaseModel):
+    """Uma sub-operação de /batch, ex: {"metodo": "PUT", "caminho": "/me/progresso", "corpo": {...}}"""
+    metodo: str
+    caminho: str
+    corpo: Optional[Dict[str, Any]] = None
+    
+    @validator('metodo')
+    def validate_metodo(cls, v):
+        return v.upper().strip()
+    
+    @validator('caminho')
+    def validate_caminho(cls, v):
+        return v.strip().rstrip('/') or '/'
+
+
+class BatchRequest(BaseModel):
+    operacoes: List[OperacaoBatch]
+    
+    @validator('operacoes')
+    def validate_operacoes(cls, v):
+        if not 1 <= len(v) <= BATCH_MAX_OPERACOES:
+            raise ValueError(f'O batch deve ter entre 1 e {BATCH_MAX_OPERACOES} operações')
+        return v
+
+
+class ResultadoOperacaoBatch(BaseModel):
+    status: int
+    corpo: Any
+
+
+class BatchResponse(BaseModel):
+    sucesso: bool
+    resultados: List[ResultadoOperacaoBatch]
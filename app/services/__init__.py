@@ -2,7 +2,10 @@
 from .user_service import (
     criar_usuario,
     listar_usuarios,
+    listar_campos_usuarios,
+    iterar_destinatarios,
     buscar_usuario_por_id,
+    buscar_campos_usuario,
     buscar_usuario_por_email,
     buscar_usuario_por_login,
     atualizar_usuario,
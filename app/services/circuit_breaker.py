@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger('app.services.circuit_breaker')
+
+
+class CircuitoAbertoError(Exception):
+    """Levantada quando o circuito está aberto e a chamada é recusada sem tentar"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para chamadas a um serviço externo
+
+    - fechado: chamadas passam; o resultado das últimas `janela` chamadas é
+      registrado. Se a taxa de falhas (erros ou chamadas mais lentas que
+      `latencia_lenta`) atingir `taxa_falha`, o circuito abre.
+    - aberto: chamadas são recusadas imediatamente durante `tempo_aberto`.
+    - semi_aberto: até `sondas` chamadas de teste passam. Se todas derem
+      certo o circuito fecha; qualquer falha volta para aberto.
+
+    Cada mudança de estado abre uma nova geração. permitir() devolve a
+    geração em que a chamada começou e registrar() ignora, para o estado, o
+    resultado de uma geração anterior: uma chamada lenta que começou com o
+    circuito fechado e termina no semi_aberto não conta como sonda.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    SEMI_ABERTO = "semi_aberto"
+
+    def __init__(
+        self,
+        nome: str,
+        taxa_falha: float = 0.5,
+        min_chamadas: int = 5,
+        janela: int = 20,
+        latencia_lenta: float = 5.0,
+        tempo_aberto: float = 30.0,
+        sondas: int = 1
+    ):
+        """
+        Args:
+            nome: Nome do serviço protegido (para logs)
+            taxa_falha: Fração de falhas (0-1) na janela que abre o circuito
+            min_chamadas: Mínimo de chamadas na janela antes de avaliar a taxa
+            janela: Quantidade de chamadas recentes consideradas
+            latencia_lenta: Segundos a partir dos quais uma chamada conta como falha
+            tempo_aberto: Segundos em aberto antes de liberar sondas
+            sondas: Chamadas de teste no estado semi_aberto
+        """
+        self.nome = nome
+        self.taxa_falha = taxa_falha
+        self.min_chamadas = min_chamadas
+        self.latencia_lenta = latencia_lenta
+        self.tempo_aberto = tempo_aberto
+        self.sondas = max(1, sondas)
+
+        self._lock = threading.Lock()
+        self._estado = self.FECHADO
+        self._janela: deque = deque(maxlen=janela)
+        self._aberto_em = 0.0
+        self._sondas_em_andamento = 0
+        self._sondas_ok = 0
+        self._geracao = 0
+
+        self._contadores = {
+            "chamadas": 0,
+            "sucessos": 0,
+            "falhas": 0,
+            "lentas": 0,
+            "recusadas": 0,
+        }
+        self._transicoes: deque = deque(maxlen=20)
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            self._atualizar_estado()
+            return self._estado
+
+    def permitir(self) -> Optional[int]:
+        """
+        Reserva uma chamada
+
+        Returns:
+            Geração do circuito (passar para registrar()), ou None (conta
+            como recusada) se o circuito estiver aberto ou sem vagas para sondas
+        """
+        with self._lock:
+            self._atualizar_estado()
+
+            if self._estado == self.FECHADO:
+                return self._geracao
+
+            if self._estado == self.SEMI_ABERTO and self._sondas_em_andamento < self.sondas - self._sondas_ok:
+                self._sondas_em_andamento += 1
+                return self._geracao
+
+            self._contadores["recusadas"] += 1
+            return None
+
+    def registrar(self, sucesso: bool, duracao: float, geracao: int):
+        """
+        Registra o resultado de uma chamada liberada por permitir()
+
+        Args:
+            sucesso: Se o serviço respondeu corretamente
+            duracao: Tempo da chamada em segundos
+            geracao: Valor devolvido por permitir() para esta chamada
+        """
+        lenta = duracao >= self.latencia_lenta
+        falhou = not sucesso or lenta
+
+        with self._lock:
+            self._contadores["chamadas"] += 1
+            self._contadores["falhas" if not sucesso else "sucessos"] += 1
+            if lenta:
+                self._contadores["lentas"] += 1
+
+            # Começou em outro estado: o resultado não diz nada sobre o atual
+            if geracao != self._geracao:
+                return
+
+            if self._estado == self.SEMI_ABERTO:
+                self._sondas_em_andamento = max(0, self._sondas_em_andamento - 1)
+                if falhou:
+                    self._mudar_estado(self.ABERTO)
+                else:
+                    self._sondas_ok += 1
+                    if self._sondas_ok >= self.sondas:
+                        self._mudar_estado(self.FECHADO)
+                return
+
+            if self._estado != self.FECHADO:
+                return
+
+            self._janela.append(falhou)
+            if len(self._janela) >= self.min_chamadas:
+                taxa = sum(self._janela) / len(self._janela)
+                if taxa >= self.taxa_falha:
+                    self._mudar_estado(self.ABERTO)
+
+    def estado_atual(self) -> Dict[str, Any]:
+        """Estado, contadores e transições recentes (para o endpoint de admin)"""
+        with self._lock:
+            self._atualizar_estado()
+            taxa = sum(self._janela) / len(self._janela) if self._janela else 0.0
+            aberto_ate = None
+            if self._estado == self.ABERTO:
+                aberto_ate = round(max(0.0, self._aberto_em + self.tempo_aberto - time.monotonic()), 1)
+            return {
+                "servico": self.nome,
+                "estado": self._estado,
+                "taxa_falha_janela": round(taxa, 3),
+                "chamadas_na_janela": len(self._janela),
+                "segundos_para_sonda": aberto_ate,
+                "contadores": dict(self._contadores),
+                "transicoes": list(self._transicoes),
+                "configuracao": {
+                    "taxa_falha": self.taxa_falha,
+                    "min_chamadas": self.min_chamadas,
+                    "janela": self._janela.maxlen,
+                    "latencia_lenta": self.latencia_lenta,
+                    "tempo_aberto": self.tempo_aberto,
+                    "sondas": self.sondas,
+                },
+            }
+
+    def _atualizar_estado(self):
+        """Passa de aberto para semi_aberto quando o tempo de espera acaba (com lock)"""
+        if self._estado == self.ABERTO and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+            self._mudar_estado(self.SEMI_ABERTO)
+
+    def _mudar_estado(self, novo: str):
+        """Troca de estado registrando a transição (com lock)"""
+        anterior = self._estado
+        self._estado = novo
+        self._geracao += 1
+        self._janela.clear()
+        self._sondas_em_andamento = 0
+        self._sondas_ok = 0
+        if novo == self.ABERTO:
+            self._aberto_em = time.monotonic()
+
+        self._transicoes.append({"de": anterior, "para": novo, "em": datetime.utcnow().isoformat()})
+        logger.warning(f"⚡ Circuito {self.nome}: {anterior} -> {novo}")
@@ -1,29 +1,110 @@
 import requests
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
 from ..core.config import settings
+from ..core.constants import PLANS_NAMES
+from .circuit_breaker import CircuitBreaker, CircuitoAbertoError
+from .email_templates import carregar_template
+from ..utils.tempos import medir_fase
+from ..utils.metricas import emails_total
 
 logger = logging.getLogger('app.services.email_service')
 
+# Limite do Brevo para messageVersions em uma única requisição
+MAX_VERSOES_POR_REQUISICAO = 1000
+
+
+class _LimitadorEnvio:
+    """Espaça as requisições ao Brevo para não ultrapassar N por segundo"""
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1.0 / por_segundo if por_segundo > 0 else 0.0
+        self._proximo = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        if not self.intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+# Compartilhado entre instâncias: o limite vale para todos os lotes do processo
+_limitador_lote = _LimitadorEnvio(settings.email_batch_rate_per_second)
+
+# Circuit breaker único do processo: com o Brevo fora do ar as chamadas falham
+# na hora em vez de segurar uma thread até o timeout
+brevo_circuit = CircuitBreaker(
+    "brevo",
+    taxa_falha=settings.email_circuit_failure_rate,
+    min_chamadas=settings.email_circuit_min_calls,
+    janela=settings.email_circuit_window,
+    latencia_lenta=settings.email_circuit_slow_call_seconds,
+    tempo_aberto=settings.email_circuit_open_seconds,
+    sondas=settings.email_circuit_half_open_probes,
+)
+
+
 class BrevoEmailService:
     """Serviço para enviar emails através da API do Brevo"""
     
     BASE_URL = "https://api.brevo.com/v3"
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
         """
         Inicializa o serviço Brevo
         
         Args:
             api_key: Chave de API do Brevo
+            base_url: URL base da API (default: BASE_URL)
         """
         self.api_key = api_key
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
         self.headers = {
             "accept": "application/json",
             "content-type": "application/json",
             "api-key": api_key
         }
     
+    def _post(self, caminho: str, payload: Dict[str, Any], timeout: float) -> requests.Response:
+        """
+        POST na API do Brevo passando pelo circuit breaker
+        
+        Erros de conexão, respostas 5xx/429 e chamadas lentas contam como
+        falha do provedor; erros 4xx não abrem o circuito.
+        
+        Raises:
+            CircuitoAbertoError: Se o circuito estiver aberto
+            requests.exceptions.RequestException: Em erro de conexão
+        """
+        geracao = brevo_circuit.permitir()
+        if geracao is None:
+            emails_total.labels("circuito_aberto").inc()
+            raise CircuitoAbertoError("Circuito do Brevo aberto")
+        
+        inicio = time.monotonic()
+        try:
+            with medir_fase("email"):
+                response = requests.post(f"{self.base_url}{caminho}", json=payload, headers=self.headers, timeout=timeout)
+        except Exception:
+            brevo_circuit.registrar(False, time.monotonic() - inicio, geracao)
+            emails_total.labels("erro_conexao").inc()
+            raise
+        
+        falha_provedor = response.status_code >= 500 or response.status_code == 429
+        brevo_circuit.registrar(not falha_provedor, time.monotonic() - inicio, geracao)
+        if response.status_code < 300:
+            emails_total.labels("sucesso").inc()
+        else:
+            emails_total.labels("falha_provedor" if falha_provedor else "rejeitado").inc()
+        return response
+    
     def enviar_email_simples(
         self,
         destinatario: str,
@@ -46,8 +127,6 @@ class BrevoEmailService:
             True se enviado com sucesso, False caso contrário
         """
         try:
-            url = f"{self.BASE_URL}/smtp/email"
-            
             payload = {
                 "sender": {
                     "name": remetente_nome,
@@ -63,7 +142,7 @@ class BrevoEmailService:
                 "htmlContent": corpo_html
             }
             
-            response = requests.post(url, json=payload, headers=self.headers, timeout=10)
+            response = self._post("/smtp/email", payload, timeout=settings.brevo_timeout_seconds)
 
             if response.status_code in [200, 201]:
                 logger.info(f"✅ Email enviado com sucesso para {destinatario}")
@@ -73,6 +152,9 @@ class BrevoEmailService:
                 logger.error(f"❌ Erro ao enviar email: {response.status_code} - {response.text}")
                 return False
                 
+        except CircuitoAbertoError:
+            logger.warning(f"⚡ Brevo indisponível (circuito aberto). Email para {destinatario} não enviado")
+            return False
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Erro de conexão com Brevo: {str(e)}")
             return False
@@ -80,6 +162,114 @@ class BrevoEmailService:
             logger.error(f"❌ Erro ao enviar email: {str(e)}")
             return False
     
+    def enviar_em_lote(
+        self,
+        destinatarios: Iterable[Dict[str, Any]],
+        assunto: str,
+        corpo_html: str,
+        tamanho_lote: Optional[int] = None,
+        remetente_email: str = "duo.estudio.tech@gmail.com",
+        remetente_nome: str = "Eden Map"
+    ) -> List[Dict[str, Any]]:
+        """
+        Envia o mesmo email para vários destinatários em poucas requisições
+        
+        Os destinatários são agrupados em messageVersions do Brevo, uma
+        requisição por lote. O assunto e o corpo podem usar {{ params.campo }}
+        para valores por destinatário.
+        
+        Args:
+            destinatarios: Iterável de dicts com "email" e, opcionalmente,
+                "nome" e "params"
+            assunto: Assunto do email
+            corpo_html: Corpo do email em HTML
+            tamanho_lote: Destinatários por requisição (default: settings.email_batch_size)
+            remetente_email: Email de origem
+            remetente_nome: Nome de quem envia
+            
+        Returns:
+            Lista com um resultado por destinatário:
+            {"email", "sucesso", "message_id", "erro"}
+        """
+        tamanho_lote = max(1, min(tamanho_lote or settings.email_batch_size, MAX_VERSOES_POR_REQUISICAO))
+        remetente = {"name": remetente_nome, "email": remetente_email}
+        
+        resultados: List[Dict[str, Any]] = []
+        lote: List[Dict[str, Any]] = []
+        for destinatario in destinatarios:
+            lote.append(destinatario)
+            if len(lote) >= tamanho_lote:
+                resultados.extend(self._enviar_lote(lote, assunto, corpo_html, remetente))
+                lote = []
+        if lote:
+            resultados.extend(self._enviar_lote(lote, assunto, corpo_html, remetente))
+        
+        enviados = sum(1 for r in resultados if r["sucesso"])
+        logger.info(f"📨 Envio em lote concluído: {enviados}/{len(resultados)} enviados")
+        return resultados
+    
+    def _enviar_lote(
+        self,
+        lote: List[Dict[str, Any]],
+        assunto: str,
+        corpo_html: str,
+        remetente: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """Envia um único lote (uma requisição) e retorna o resultado de cada destinatário"""
+        versoes = []
+        for destinatario in lote:
+            versao: Dict[str, Any] = {
+                "to": [
+                    {
+                        "email": destinatario["email"],
+                        "name": destinatario.get("nome") or destinatario["email"].split("@")[0]
+                    }
+                ]
+            }
+            if destinatario.get("params"):
+                versao["params"] = destinatario["params"]
+            versoes.append(versao)
+        
+        payload = {
+            "sender": remetente,
+            "subject": assunto,
+            "htmlContent": corpo_html,
+            "messageVersions": versoes
+        }
+        
+        erro = None
+        message_ids: List[str] = []
+        try:
+            _limitador_lote.aguardar()
+            response = self._post("/smtp/email", payload, timeout=settings.brevo_timeout_seconds * 3)
+            
+            if response.status_code in [200, 201]:
+                corpo = response.json() if response.content else {}
+                message_ids = corpo.get("messageIds") or []
+            else:
+                erro = f"{response.status_code} - {response.text}"
+                logger.error(f"❌ Erro ao enviar lote de {len(lote)} emails: {erro}")
+                
+        except CircuitoAbertoError:
+            erro = "Brevo indisponível (circuito aberto)"
+            logger.warning(f"⚡ {erro}. Lote de {len(lote)} emails não enviado")
+        except requests.exceptions.RequestException as e:
+            erro = f"Erro de conexão com Brevo: {str(e)}"
+            logger.error(f"❌ {erro}")
+        except Exception as e:
+            erro = str(e)
+            logger.error(f"❌ Erro ao enviar lote: {erro}")
+        
+        return [
+            {
+                "email": destinatario["email"],
+                "sucesso": erro is None,
+                "message_id": message_ids[indice] if indice < len(message_ids) else None,
+                "erro": erro
+            }
+            for indice, destinatario in enumerate(lote)
+        ]
+    
     def enviar_boas_vindas(
         self,
         email: str,
@@ -97,193 +287,15 @@ class BrevoEmailService:
         Returns:
             True se enviado com sucesso
         """
-        planos_nomes = {
-            "trial": "Teste Grátis (15 dias)",
-            "mensal": "Mensal",
-            "trimestral": "Trimestral", 
-            "semestral": "Semestral",
-            "anual": "Anual",
-            "admin": "Administrador"
-        }
-        
-        plano_nome = planos_nomes.get(plan.lower(), plan)
+        plano_nome = PLANS_NAMES.get(plan.lower(), plan)
         
         assunto = f"Bem-vindo ao Eden Map, {login}! 🌿"
         
-        corpo_html = f"""
-<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Bem-vindo ao Eden Map</title>
-</head>
-<body style="margin: 0; padding: 0; font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif; background: linear-gradient(135deg, #1a1d29 0%, #2d3748 100%); min-height: 100vh;">
-    
-    <!-- Container Principal -->
-    <table width="100%" cellpadding="0" cellspacing="0" style="background: linear-gradient(135deg, #1a1d29 0%, #2d3748 100%); padding: 40px 20px;">
-        <tr>
-            <td align="center">
-                
-                <!-- Card do Email -->
-                <table width="600" cellpadding="0" cellspacing="0" style="background: rgba(42, 46, 66, 0.95); border-radius: 20px; box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5); overflow: hidden; max-width: 100%;">
-                    
-                    <!-- Header com Logo -->
-                    <tr>
-                        <td align="center" style="background: linear-gradient(135deg, #0a84ff 0%, #8a4aed 100%); padding: 50px 40px;">
-                            <!-- LOGO PLACEHOLDER - Substituir pela imagem real quando disponível -->
-                            <div style="width: 200px; height: 60px; background: rgba(255,255,255,0.1); border-radius: 12px; display: flex; align-items: center; justify-content: center; margin: 0 auto 20px;">
-                                <span style="color: #ffffff; font-size: 28px; font-weight: bold; letter-spacing: 2px;">EDEN MAP</span>
-                            </div>
-                            
-                            <h1 style="margin: 20px 0 0 0; color: #ffffff; font-size: 32px; font-weight: 700; letter-spacing: -0.5px;">
-                                Bem-vindo! 🌿
-                            </h1>
-                        </td>
-                    </tr>
-                    
-                    <!-- Conteúdo -->
-                    <tr>
-                        <td style="padding: 50px 40px;">
-                            
-                            <!-- Mensagem de Boas-vindas -->
-                            <p style="color: #e2e8f0; font-size: 18px; line-height: 1.8; margin: 0 0 30px 0; text-align: center;">
-                                Olá <strong style="color: #ffffff; font-size: 20px;">{login}</strong>,
-                            </p>
-                            
-                            <p style="color: #cbd5e0; font-size: 16px; line-height: 1.8; margin: 0 0 30px 0; text-align: center;">
-                                É com grande satisfação que damos as boas-vindas ao <strong style="color: #8a4aed;">Eden Map</strong>! 
-                                Sua conta foi criada com sucesso e você já pode começar a explorar todas as funcionalidades da nossa plataforma.
-                            </p>
-                            
-                            <!-- Card de Confirmação -->
-                            <table width="100%" cellpadding="0" cellspacing="0" style="background: linear-gradient(135deg, rgba(10, 132, 255, 0.15) 0%, rgba(138, 74, 237, 0.15) 100%); border-radius: 16px; border: 2px solid rgba(138, 74, 237, 0.3); margin: 30px 0;">
-                                <tr>
-                                    <td style="padding: 30px; text-align: center;">
-                                        <div style="font-size: 48px; margin-bottom: 15px;">✓</div>
-                                        <h2 style="color: #ffffff; font-size: 22px; margin: 0 0 15px 0; font-weight: 600;">
-                                            Cadastro Confirmado
-                                        </h2>
-                                        <p style="color: #cbd5e0; font-size: 15px; margin: 0 0 15px 0;">
-                                            Você está no plano:
-                                        </p>
-                                        <div style="display: inline-block; background: linear-gradient(135deg, #0a84ff 0%, #8a4aed 100%); color: #ffffff; padding: 12px 30px; border-radius: 25px; font-weight: 600; font-size: 16px;">
-                                            {plano_nome}
-                                        </div>
-                                    </td>
-                                </tr>
-                            </table>
-                            
-                            <!-- Informações da Conta -->
-                            <table width="100%" cellpadding="0" cellspacing="0" style="background: rgba(26, 29, 41, 0.5); border-radius: 12px; margin: 30px 0; border: 1px solid rgba(138, 74, 237, 0.2);">
-                                <tr>
-                                    <td style="padding: 25px;">
-                                        <h3 style="color: #ffffff; font-size: 18px; margin: 0 0 20px 0; font-weight: 600;">
-                                            📋 Informações da Conta
-                                        </h3>
-                                        <table width="100%" cellpadding="8" cellspacing="0">
-                                            <tr>
-                                                <td style="color: #94a3b8; font-size: 14px; padding: 8px 0;">Login:</td>
-                                                <td style="color: #ffffff; font-size: 14px; font-weight: 600; text-align: right; padding: 8px 0;">{login}</td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #94a3b8; font-size: 14px; padding: 8px 0;">Email:</td>
-                                                <td style="color: #ffffff; font-size: 14px; font-weight: 600; text-align: right; padding: 8px 0;">{email}</td>
-                                            </tr>
-                                            <tr>
-                                                <td style="color: #94a3b8; font-size: 14px; padding: 8px 0;">Plano:</td>
-                                                <td style="color: #8a4aed; font-size: 14px; font-weight: 600; text-align: right; padding: 8px 0;">{plano_nome}</td>
-                                            </tr>
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
-                            
-                            <!-- Recursos -->
-                            <div style="margin: 30px 0;">
-                                <h3 style="color: #ffffff; font-size: 18px; margin: 0 0 20px 0; font-weight: 600; text-align: center;">
-                                    🚀 O que você pode fazer agora
-                                </h3>
-                                
-                                <table width="100%" cellpadding="10" cellspacing="0">
-                                    <tr>
-                                        <td style="padding: 10px 0;">
-                                            <div style="display: flex; align-items: center;">
-                                                <span style="color: #0a84ff; font-size: 20px; margin-right: 12px;">✓</span>
-                                                <span style="color: #cbd5e0; font-size: 15px;">Acessar sua conta com seu login e senha</span>
-                                            </div>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 10px 0;">
-                                            <div style="display: flex; align-items: center;">
-                                                <span style="color: #0a84ff; font-size: 20px; margin-right: 12px;">✓</span>
-                                                <span style="color: #cbd5e0; font-size: 15px;">Explorar todas as funcionalidades da API</span>
-                                            </div>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 10px 0;">
-                                            <div style="display: flex; align-items: center;">
-                                                <span style="color: #0a84ff; font-size: 20px; margin-right: 12px;">✓</span>
-                                                <span style="color: #cbd5e0; font-size: 15px;">Gerenciar seu perfil e configurações</span>
-                                            </div>
-                                        </td>
-                                    </tr>
-                                    <tr>
-                                        <td style="padding: 10px 0;">
-                                            <div style="display: flex; align-items: center;">
-                                                <span style="color: #0a84ff; font-size: 20px; margin-right: 12px;">✓</span>
-                                                <span style="color: #cbd5e0; font-size: 15px;">Acessar a documentação completa em /docs</span>
-                                            </div>
-                                        </td>
-                                    </tr>
-                                </table>
-                            </div>
-                            
-                            <!-- Aviso de Segurança -->
-                            <div style="background: rgba(255, 170, 46, 0.1); border-left: 4px solid #ffaa2e; padding: 20px; border-radius: 8px; margin: 30px 0;">
-                                <p style="color: #ffaa2e; font-size: 15px; margin: 0; line-height: 1.6;">
-                                    <strong>💡 Dica de Segurança:</strong><br>
-                                    Mantenha suas credenciais seguras e nunca compartilhe com terceiros. Seu token de acesso é pessoal e intransferível.
-                                </p>
-                            </div>
-                            
-                        </td>
-                    </tr>
-                    
-                    <!-- Footer -->
-                    <tr>
-                        <td style="background: rgba(26, 29, 41, 0.8); padding: 30px 40px; text-align: center; border-top: 1px solid rgba(138, 74, 237, 0.2);">
-                            <p style="color: #94a3b8; font-size: 14px; margin: 0 0 10px 0;">
-                                <strong style="color: #ffffff;">Eden Map</strong>
-                            </p>
-                            <p style="color: #64748b; font-size: 13px; margin: 0 0 15px 0;">
-                                © 2025 Eden Map. Todos os direitos reservados.
-                            </p>
-                            <p style="color: #64748b; font-size: 12px; margin: 0; line-height: 1.6;">
-                                Este é um email automático, não responda.<br>
-                                Se você não criou esta conta, ignore este email.
-                            </p>
-                            <div style="margin-top: 20px;">
-                                <a href="#" style="color: #8a4aed; text-decoration: none; font-size: 13px; margin: 0 10px;">Documentação</a>
-                                <span style="color: #475569;">•</span>
-                                <a href="#" style="color: #8a4aed; text-decoration: none; font-size: 13px; margin: 0 10px;">Suporte</a>
-                                <span style="color: #475569;">•</span>
-                                <a href="#" style="color: #8a4aed; text-decoration: none; font-size: 13px; margin: 0 10px;">Privacidade</a>
-                            </div>
-                        </td>
-                    </tr>
-                    
-                </table>
-                
-            </td>
-        </tr>
-    </table>
-    
-</body>
-</html>
-        """
+        corpo_html = carregar_template("boas_vindas").render(
+            login=login,
+            email=email,
+            plano_nome=plano_nome
+        )
         
         return self.enviar_email_simples(
             destinatario=email,
@@ -313,260 +325,59 @@ class BrevoEmailService:
         # Separar os 4 dígitos para exibir em boxes individuais
         digito1, digito2, digito3, digito4 = list(tempkey)
         
-        corpo_html = f"""
-            <!DOCTYPE html>
-            <html lang="pt-BR">
-            <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Eden Map - Recuperação de Senha</title>
-            <style>
-                * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-                }}
-
-                body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-                background: linear-gradient(135deg, #212224 0%, #2a1833 50%, #212224 100%);
-                color: #fff;
-                padding: 40px 20px;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                min-height: 100vh;
-                }}
-
-                .email-recovery {{
-                width: 100%;
-                max-width: 600px;
-                background: rgba(42, 46, 66, 0.95);
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
-                overflow: hidden;
-                }}
-                .header {{
-                background: linear-gradient(135deg, #1a1d29 0%, #2d3748 100%);
-                padding: 50px 40px;
-                text-align: center;
-                }}
-
-                .logo-box {{
-                width: 200px;
-                height: 60px;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                margin: 0 16px 20px 200px;
-                }}
-
-                .logo-box p {{
-                font-size: 28px;
-                font-weight: 700;
-                margin-right: 50px;
-                }}
-
-                .header h1 {{
-                font-size: 28px;
-                font-weight: 700;
-                letter-spacing: -0.5px;
-                }}
-
-                .content {{
-                padding: 50px 40px;
-                }}
-
-                .alert {{
-                background: rgba(255, 170, 46, 0.1);
-                border-left: 4px solid #ffaa2e;
-                border-radius: 8px;
-                padding: 20px;
-                text-align: center;
-                margin-bottom: 30px;
-                color: #ffaa2e;
-                font-size: 15px;
-                line-height: 1.6;
-                }}
-
-                .greeting,
-                .instructions {{
-                color: #cbd5e0;
-                font-size: 16px;
-                line-height: 1.8;
-                text-align: center;
-                margin-bottom: 30px;
-                }}
-
-                .instructions {{
-                margin-bottom: 40px;
-                }}
-
-                .code-card {{
-                background: linear-gradient(-145deg, #1d1e20 0%, #746d7740 38%, #ffffff3b 50%, #746d7740 62%, #1d1e20 100%);
-                border-radius: 16px;
-                padding: 40px 30px;
-                text-align: center;
-                margin-bottom: 30px;
-                }}
-
-                .code-label {{
-                color: #94a3b8;
-                font-size: 14px;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-                margin-bottom: 15px;
-                }}
-
-                .code-boxes {{
-                display: flex;
-                justify-content: center;
-                gap: 15px;
-                margin-bottom: 20px;
-                }}
-
-                .code-box {{
-                width: 70px;
-                height: 90px;
-                background: #d9d9d98c;
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                }}
-
-                .code-box span {{
-                color: #ffffff;
-                font-size: 48px;
-                font-weight: 700;
-                font-family: 'Courier New', monospace;
-                }}
-
-                .expire {{
-                color: #ff6b6b;
-                font-size: 15px;
-                font-weight: 600;
-                }}
-
-                .how-to {{
-                background: rgba(26, 29, 41, 0.5);
-                border-radius: 12px;
-                border: 1px solid rgba(138, 74, 237, 0.2);
-                padding: 25px;
-                margin-bottom: 30px;
-                }}
-
-                .how-to h3 {{
-                color: #ffffff;
-                font-size: 18px;
-                margin-bottom: 20px;
-                font-weight: 600;
-                }}
-
-                .how-to ol {{
-                color: #cbd5e0;
-                font-size: 15px;
-                line-height: 1.8;
-                padding-left: 20px;
-                }}
-
-                .warning {{
-                background: rgba(255, 107, 107, 0.1);
-                border-left: 4px solid #ff6b6b;
-                border-radius: 8px;
-                padding: 20px;
-                margin-bottom: 30px;
-                color: #ff6b6b;
-                font-size: 15px;
-                line-height: 1.6;
-                }}
-
-                .help {{
-                color: #94a3b8;
-                font-size: 14px;
-                text-align: center;
-                line-height: 1.6;
-                }}
-
-                .help a {{
-                color: #8a4aed;
-                text-decoration: none;
-                }}
-
-                .help a:hover {{
-                text-decoration: underline;
-                }}
-
-                .footer {{
-                background: rgba(26, 29, 41, 0.8);
-                border-top: 1px solid rgba(138, 74, 237, 0.2);
-                padding: 30px 40px;
-                text-align: center;
-                font-size: 13px;
-                color: #64748b;
-                }}
-
-                .footer strong {{
-                color: #ffffff;
-                }}
-
-                .footer p {{
-                margin-bottom: 10px;
-                }}
-            </style>
-            </head>
-            <body>
-            <div id="email-recovery" class="email-recovery">
-                <div class="header">
-                <img src="https://raw.githubusercontent.com/Dieghonm/Eden-Map/refs/heads/main/assets/Logo2.png" alt="Logo Eden Map">
-                <h1>Seu código de recuperação de senha</h1>
-                </div>
-
-                <div class="content">
-                <div class="alert">
-                    <strong>Se você <span style="color:#ff6b6b;">não solicitou</span> o token, <span style="color:#ff6b6b;">basta ignorar</span> esse email.</strong>
-                </div>
-
-                <p class="greeting">Olá <strong style="color:#fff;">{login}</strong>,</p>
-                <p class="instructions">Use o código abaixo para redefinir sua senha:</p>
-
-                <div class="code-card">
-                    <p class="code-label">Seu Código</p>
-                    <div class="code-boxes">
-                    <div class="code-box"><span>{digito1}</span></div>
-                    <div class="code-box"><span>{digito2}</span></div>
-                    <div class="code-box"><span>{digito3}</span></div>
-                    <div class="code-box"><span>{digito4}</span></div>
-                    </div>
-                    <p class="expire">⏱️ Expira em 15 minutos</p>
-                </div>
-
-                <div class="warning">
-                    <strong>⚠️ Importante:</strong><br>
-                    Nunca compartilhe este código com ninguém. A equipe do Eden Map nunca pedirá este código por email ou telefone.
-                </div>
-
-                <p class="help">
-                    Precisa de ajuda?<br>
-                    Entre em contato: <a href="mailto:duo.estudio.tech@gmail.com">duo.estudio.tech@gmail.com</a>
-                </p>
-                </div>
-
-                <div class="footer">
-                <p><strong>Eden Map</strong></p>
-                <p>© 2025 Eden Map. Todos os direitos reservados.</p>
-                <p>Este é um email automático, não responda.<br>Se você não solicitou esta recuperação, ignore este email.</p>
-                </div>
-            </div>
-            </body>
-            </html>
-                    """
-                    
+        corpo_html = carregar_template("tempkey").render(
+            login=login,
+            digito1=digito1,
+            digito2=digito2,
+            digito3=digito3,
+            digito4=digito4
+        )
+        
         return self.enviar_email_simples(
             destinatario=email,
             assunto=assunto,
             corpo_html=corpo_html
         )
 
+    
+    def enviar_lembretes_plano(
+        self,
+        usuarios: Iterable[Dict[str, Any]],
+        tamanho_lote: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Envia lembrete de expiração de plano para vários usuários em lote
+        
+        Args:
+            usuarios: Iterável de dicts com "email", "login", "plan" e "dias_restantes"
+            tamanho_lote: Destinatários por requisição
+            
+        Returns:
+            Lista com um resultado por destinatário (ver enviar_em_lote)
+        """
+        assunto = "⏳ Seu plano Eden Map está perto de expirar"
+        
+        # Campos preenchidos pelo Brevo por destinatário
+        corpo_html = carregar_template("lembrete_plano").render(
+            login="{{ params.login }}",
+            plano_nome="{{ params.plano_nome }}",
+            dias_restantes="{{ params.dias_restantes }}"
+        )
+        
+        destinatarios = (
+            {
+                "email": usuario["email"],
+                "nome": usuario["login"],
+                "params": {
+                    "login": usuario["login"],
+                    "plano_nome": PLANS_NAMES.get((usuario.get("plan") or "trial").lower(), usuario.get("plan")),
+                    "dias_restantes": usuario["dias_restantes"]
+                }
+            }
+            for usuario in usuarios
+        )
+        
+        return self.enviar_em_lote(destinatarios, assunto, corpo_html, tamanho_lote)
 
 def get_email_service() -> Optional[BrevoEmailService]:
     """
@@ -580,4 +391,4 @@ def get_email_service() -> Optional[BrevoEmailService]:
         logger.warning("⚠️  BREVO_API_KEY não configurada no .env")
         return None
     
-    return BrevoEmailService(api_key)
+    return BrevoEmailService(api_key, base_url=settings.brevo_base_url)
@@ -0,0 +1,88 @@
+import re
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+# Placeholders no formato {{ campo }} (chaves simples do CSS não são afetadas)
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class EmailTemplate:
+    """
+    Template HTML pré-compilado
+
+    O arquivo é dividido uma única vez em partes estáticas e campos variáveis.
+    Na renderização apenas os campos são substituídos; as partes estáticas
+    são reaproveitadas entre todos os envios.
+    """
+
+    __slots__ = ("nome", "_partes", "_posicoes")
+
+    def __init__(self, nome: str, fonte: str):
+        """
+        Args:
+            nome: Nome do template (sem extensão)
+            fonte: Conteúdo HTML com placeholders {{ campo }}
+        """
+        self.nome = nome
+        partes: List[str] = []
+        posicoes: Dict[str, List[int]] = {}
+
+        inicio = 0
+        for match in _PLACEHOLDER.finditer(fonte):
+            partes.append(fonte[inicio:match.start()])
+            posicoes.setdefault(match.group(1), []).append(len(partes))
+            partes.append("")
+            inicio = match.end()
+        partes.append(fonte[inicio:])
+
+        self._partes: Tuple[str, ...] = tuple(partes)
+        self._posicoes: Tuple[Tuple[str, Tuple[int, ...]], ...] = tuple(
+            (campo, tuple(indices)) for campo, indices in posicoes.items()
+        )
+
+    @property
+    def campos(self) -> List[str]:
+        """Campos variáveis esperados pelo template"""
+        return [campo for campo, _ in self._posicoes]
+
+    def render(self, **valores) -> str:
+        """
+        Renderiza o template substituindo apenas os campos variáveis
+
+        Args:
+            **valores: Valor de cada campo do template (escapados como HTML)
+
+        Returns:
+            HTML final
+
+        Raises:
+            KeyError: Se algum campo do template não for informado
+        """
+        partes = list(self._partes)
+        for campo, indices in self._posicoes:
+            valor = escape(str(valores[campo]), quote=False)
+            for indice in indices:
+                partes[indice] = valor
+        return "".join(partes)
+
+
+@lru_cache(maxsize=None)
+def carregar_template(nome: str) -> EmailTemplate:
+    """
+    Carrega (sob demanda) e compila um template de email do disco
+
+    O arquivo só é lido na primeira chamada; as seguintes reutilizam
+    o template já compilado.
+
+    Args:
+        nome: Nome do arquivo em app/services/templates, sem a extensão .html
+
+    Returns:
+        EmailTemplate compilado
+    """
+    caminho = TEMPLATES_DIR / f"{nome}.html"
+    return EmailTemplate(nome, caminho.read_text(encoding="utf-8"))
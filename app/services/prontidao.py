@@ -0,0 +1,119 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger('app.services.prontidao')
+
+
+class VerificadorProntidao:
+    """
+    Verificações de prontidão (readiness) feitas em segundo plano
+
+    Uma thread refaz as verificações a cada `intervalo` segundos usando uma
+    conexão do pool (nenhuma conexão nova por verificação) e guarda o
+    resultado. A probe só lê esse resultado, então nunca espera por uma
+    dependência lenta; se a última verificação ficar mais velha que
+    `idade_maxima` (ex.: banco travado), a instância é dada como não pronta.
+
+    - banco: SELECT 1 em uma conexão do pool
+    - schema: colunas dos modelos ausentes no banco (migração pendente)
+    - email: estado do circuit breaker do Brevo (aberto = degradado, mas pronto)
+    """
+
+    def __init__(self, engine, circuito_email, intervalo: float = 5.0, idade_maxima: Optional[float] = None):
+        """
+        Args:
+            engine: Engine do SQLAlchemy (o pool já existente)
+            circuito_email: CircuitBreaker do serviço de email
+            intervalo: Segundos entre verificações
+            idade_maxima: Idade máxima do resultado antes de considerar não pronto
+                (padrão: 3x o intervalo)
+        """
+        self.engine = engine
+        self.circuito_email = circuito_email
+        self.intervalo = intervalo
+        self.idade_maxima = idade_maxima or intervalo * 3
+
+        self._resultado: Optional[Dict[str, Any]] = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        """Faz a primeira verificação e inicia a thread de atualização"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self.verificar()
+        self._thread = threading.Thread(target=self._loop, name="prontidao", daemon=True)
+        self._thread.start()
+        # Sem o evento de shutdown (ex.: TestClient não fechado), para no fim do processo
+        atexit.register(self.parar)
+
+    def parar(self, timeout: float = 5.0):
+        """Interrompe a thread e espera a verificação em andamento terminar"""
+        self._parar.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        atexit.unregister(self.parar)
+
+    def _loop(self):
+        while not self._parar.wait(self.intervalo):
+            self.verificar()
+
+    def verificar(self) -> Dict[str, Any]:
+        """Executa as verificações agora e atualiza o resultado em cache"""
+        from ..database.migrations import colunas_ausentes
+
+        verificacoes: Dict[str, Dict[str, Any]] = {}
+
+        inicio = time.perf_counter()
+        try:
+            with self.engine.connect() as conexao:
+                conexao.execute(text("SELECT 1"))
+                verificacoes["banco"] = {"ok": True, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2)}
+                ausentes = colunas_ausentes(conexao)
+                verificacoes["schema"] = {"ok": not ausentes, "colunas_ausentes": ausentes}
+        except Exception as e:
+            logger.warning(f"Prontidão: banco indisponível: {e}")
+            verificacoes["banco"] = {"ok": False, "erro": str(e)}
+            verificacoes["schema"] = {"ok": False, "erro": "banco indisponível"}
+
+        estado_email = self.circuito_email.estado
+        verificacoes["email"] = {
+            "ok": True,
+            "circuito": estado_email,
+            "degradado": estado_email != self.circuito_email.FECHADO,
+        }
+
+        resultado = {
+            "pronto": all(v["ok"] for v in verificacoes.values()),
+            "verificacoes": verificacoes,
+            "verificado_em": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            self._resultado = resultado
+            self._verificado_em = time.monotonic()
+        return resultado
+
+    def estado(self) -> Dict[str, Any]:
+        """Último resultado (sem fazer verificações), marcado como não pronto se estiver velho"""
+        with self._lock:
+            resultado = self._resultado
+            idade = time.monotonic() - self._verificado_em
+
+        if resultado is None:
+            return {"pronto": False, "motivo": "verificações ainda não executadas"}
+
+        resultado = {**resultado, "idade_segundos": round(idade, 1)}
+        if idade > self.idade_maxima:
+            resultado["pronto"] = False
+            resultado["motivo"] = "verificações atrasadas (dependência lenta ou travada)"
+        return resultado
@@ -1,11 +1,18 @@
+import logging
+
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from ..core.constants import PLANS_TIME
 from ..models.user import Usuario
 from ..schemas.schemas import UsuarioCreate
 from ..utils.jwt_auth import hash_password, verify_password
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
+
 def criar_usuario(db: Session, usuario: UsuarioCreate):
     """
     Cria um novo usuário no banco com validações completas
@@ -54,6 +61,66 @@ def listar_usuarios(db: Session):
     return db.query(Usuario).all()
 
 
+def listar_campos_usuarios(db: Session, colunas: List[str]):
+    """Lista todos os usuários carregando só as colunas informadas"""
+    return db.query(*[getattr(Usuario, coluna) for coluna in colunas]).order_by(Usuario.id).all()
+
+
+def buscar_campos_usuario(db: Session, usuario_id: int, colunas: List[str]):
+    """Busca só as colunas informadas de um usuário (Row ou None)"""
+    return db.query(*[getattr(Usuario, coluna) for coluna in colunas]).filter(Usuario.id == usuario_id).first()
+
+
+def iterar_destinatarios(
+    db: Session,
+    tag: Optional[str] = None,
+    plan: Optional[str] = None,
+    expira_em_dias: Optional[int] = None,
+    tamanho_lote: int = 500
+):
+    """
+    Itera (em streaming) os usuários que devem receber um envio em lote
+    
+    Carrega apenas as colunas usadas no email, em blocos de tamanho_lote,
+    sem materializar a tabela inteira em memória.
+    
+    Args:
+        db: Sessão do banco de dados
+        tag: Filtra por tag (admin, tester, cliente)
+        plan: Filtra por plano
+        expira_em_dias: Apenas planos que expiram nos próximos N dias
+        tamanho_lote: Linhas buscadas por vez no cursor
+    
+    Returns:
+        Iterador de linhas com id, email, login, plan e plan_date
+    """
+    query = db.query(
+        Usuario.id, Usuario.email, Usuario.login, Usuario.plan, Usuario.plan_date
+    )
+    
+    if tag:
+        query = query.filter(Usuario.tag == tag)
+    if plan:
+        query = query.filter(Usuario.plan == plan)
+    
+    if expira_em_dias is not None:
+        agora = datetime.utcnow()
+        condicoes = []
+        for nome_plano, duracao in PLANS_TIME.items():
+            # Plano expira entre agora e agora + N dias
+            filtro_plano = Usuario.plan == nome_plano
+            if nome_plano == "trial":
+                filtro_plano = or_(filtro_plano, Usuario.plan.is_(None))
+            condicoes.append(and_(
+                filtro_plano,
+                Usuario.plan_date > agora - timedelta(days=duracao),
+                Usuario.plan_date <= agora - timedelta(days=duracao - expira_em_dias),
+            ))
+        query = query.filter(or_(*condicoes))
+    
+    return query.order_by(Usuario.id).yield_per(tamanho_lote)
+
+
 def buscar_usuario_por_id(db: Session, usuario_id: int):
     """Busca usuário por ID"""
     return db.query(Usuario).filter(Usuario.id == usuario_id).first()
@@ -145,7 +212,7 @@ def enviar_email_boas_vindas(usuario, plan: str = "trial"):
         
         email_service = get_email_service()
         if not email_service:
-            print(f"⚠️  Email service não configurado. Saltando email para {usuario.email}")
+            logger.warning("Email service não configurado; email de boas-vindas ignorado", extra={"usuario_id": usuario.id})
             return False
         
         sucesso = email_service.enviar_boas_vindas(
@@ -155,14 +222,14 @@ def enviar_email_boas_vindas(usuario, plan: str = "trial"):
         )
         
         if sucesso:
-            print(f"✅ Email de boas-vindas enviado para {usuario.email}")
+            logger.info("Email de boas-vindas enviado", extra={"usuario_id": usuario.id})
         else:
-            print(f"❌ Falha ao enviar email para {usuario.email}")
+            logger.warning("Falha ao enviar email de boas-vindas", extra={"usuario_id": usuario.id})
         
         return sucesso
         
-    except Exception as e:
-        print(f"❌ Erro ao enviar email: {str(e)}")
+    except Exception:
+        logger.exception("Erro ao enviar email de boas-vindas")
         return False
 
 
@@ -245,5 +312,5 @@ def recuperar_senha(
         
     except Exception as e:
         db.rollback()
-        print(f"❌ Erro ao recuperar senha: {str(e)}")
+        logger.exception("Erro ao recuperar senha")
         return False, f"Erro ao alterar senha: {str(e)}"
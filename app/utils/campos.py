@@ -0,0 +1,64 @@
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from pydantic import BaseModel
+
+
+def interpretar_campos(fields: Optional[str], modelo: Type[BaseModel]) -> Optional[List[str]]:
+    """
+    Interpreta o parâmetro fields= ("login,plan,expires") contra os campos do modelo
+
+    Returns:
+        Campos pedidos na ordem recebida (sem repetição), ou None se fields
+        não foi informado (resposta completa)
+
+    Raises:
+        ValueError: Se algum campo não existir no modelo
+    """
+    if fields is None or not fields.strip():
+        return None
+
+    validos = set(modelo.model_fields) | set(modelo.model_computed_fields)
+    campos = list(dict.fromkeys(campo.strip() for campo in fields.split(",") if campo.strip()))
+    invalidos = [campo for campo in campos if campo not in validos]
+    if invalidos:
+        raise ValueError(
+            f"Campos inválidos: {', '.join(invalidos)}. Disponíveis: {', '.join(sorted(validos))}"
+        )
+    return campos
+
+
+def colunas_para_campos(campos: Iterable[str], modelo: Type[BaseModel]) -> List[str]:
+    """
+    Colunas do banco necessárias para os campos pedidos
+
+    Campos calculados (computed_field) entram só se pedidos, trazendo as
+    colunas declaradas em `modelo.dependencias_calculadas`.
+    """
+    dependencias = getattr(modelo, "dependencias_calculadas", {})
+    colunas: Dict[str, None] = {}
+    for campo in campos:
+        if campo in modelo.model_computed_fields:
+            for coluna in dependencias.get(campo, ()):
+                colunas[coluna] = None
+        else:
+            colunas[campo] = None
+    return list(colunas)
+
+
+def serializar_parcial(modelo: Type[BaseModel], valores: Dict[str, Any], campos: Iterable[str]) -> Dict[str, Any]:
+    """
+    Serializa só `campos` a partir de valores parciais de uma linha
+
+    Cada valor passa pelos validadores do seu campo (ex.: defaults de
+    semana/dia), sem exigir os demais campos obrigatórios do modelo. Campos
+    calculados não pedidos não são calculados.
+    """
+    instancia = modelo.model_construct()
+    validador = modelo.__pydantic_validator__
+    for campo, valor in valores.items():
+        if campo in modelo.model_fields:
+            validador.validate_assignment(instancia, campo, valor)
+        else:
+            # Colunas só usadas por campos calculados (ex.: plan_date para expires)
+            object.__setattr__(instancia, campo, valor)
+    return instancia.model_dump(mode="json", include=set(campos))
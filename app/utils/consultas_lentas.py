@@ -0,0 +1,208 @@
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .tempos import ouvir_statements
+
+logger = logging.getLogger('app.consultas_lentas')
+
+# Statements para os quais EXPLAIN faz sentido (PRAGMA, DDL etc. ficam de fora)
+_COMANDOS_COM_PLANO = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_LISTA_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Forma normalizada do SQL para agrupar execuções da mesma consulta
+
+    Literais e placeholders viram "?", listas de IN viram "(...)" e os
+    espaços são normalizados.
+
+    Example:
+        "SELECT * FROM usuarios WHERE id IN (?, ?, ?) LIMIT 10"
+        -> "SELECT * FROM usuarios WHERE id IN (...) LIMIT ?"
+    """
+    sql = _LITERAL_TEXTO.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _LITERAL_NUMERO.sub("?", sql)
+    sql = _LISTA_IN.sub("(...)", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+
+def redigir_parametros(parametros) -> Any:
+    """Troca os valores dos parâmetros pelo tipo (ex.: "<str>"): podem ser senhas ou emails"""
+    if isinstance(parametros, dict):
+        return {chave: f"<{type(valor).__name__}>" for chave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [f"<{type(valor).__name__}>" for valor in parametros]
+    return None
+
+
+def _varredura_completa(plano: List[str]) -> bool:
+    """Plano com leitura da tabela inteira (SQLite: "SCAN t" sem índice; Postgres: "Seq Scan")"""
+    for linha in plano:
+        if "Seq Scan" in linha:
+            return True
+        if re.search(r"\bSCAN\b", linha) and "INDEX" not in linha and "CONSTANT ROW" not in linha:
+            return True
+    return False
+
+
+class RegistroConsultasLentas:
+    """
+    Registra statements SQL mais lentos que `limite_ms`
+
+    Cada consulta lenta vai para o log com os parâmetros redigidos e o plano
+    de execução (EXPLAIN QUERY PLAN no SQLite, EXPLAIN no Postgres). O plano
+    é capturado no máximo uma vez por fingerprint a cada
+    `intervalo_plano_segundos`. As estatísticas são agregadas por
+    fingerprint, por processo, limitadas a `max_fingerprints`.
+    """
+
+    def __init__(
+        self,
+        limite_ms: float = 100.0,
+        capturar_plano: bool = True,
+        max_fingerprints: int = 200,
+        intervalo_plano_segundos: float = 300.0,
+    ):
+        self.limite_ms = limite_ms
+        self.capturar_plano = capturar_plano
+        self.max_fingerprints = max(1, max_fingerprints)
+        self.intervalo_plano_segundos = intervalo_plano_segundos
+        self._estatisticas: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def instrumentar(self, engine):
+        """Recebe a duração de cada statement do engine (tempos.ouvir_statements)"""
+        dialeto = engine.dialect.name
+
+        def _concluido(conn, statement, parametros, executemany, inicio, duracao, erro):
+            duracao_ms = duracao * 1000
+            if erro is None and duracao_ms >= self.limite_ms:
+                self.registrar(conn, dialeto, statement, parametros, executemany, duracao_ms)
+
+        ouvir_statements(engine, _concluido)
+
+    def registrar(self, conn, dialeto: str, statement: str, parametros, executemany: bool, duracao_ms: float):
+        chave = fingerprint(statement)
+        with self._lock:
+            estatistica = self._estatisticas.get(chave)
+            if estatistica is None:
+                if len(self._estatisticas) >= self.max_fingerprints:
+                    # Descarta a consulta com menor tempo total acumulado
+                    menor = min(self._estatisticas, key=lambda k: self._estatisticas[k]["total_ms"])
+                    del self._estatisticas[menor]
+                estatistica = self._estatisticas[chave] = {
+                    "fingerprint": chave,
+                    "execucoes": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "plano": None,
+                    "varredura_completa": None,
+                    "plano_capturado_em": 0.0,
+                }
+            estatistica["execucoes"] += 1
+            estatistica["total_ms"] += duracao_ms
+            estatistica["max_ms"] = max(estatistica["max_ms"], duracao_ms)
+            estatistica["ultima_em"] = datetime.utcnow().isoformat()
+            capturar = (
+                self.capturar_plano
+                and not executemany
+                and time.monotonic() - estatistica["plano_capturado_em"] >= self.intervalo_plano_segundos
+            )
+            if capturar:
+                estatistica["plano_capturado_em"] = time.monotonic()
+
+        plano = estatistica["plano"]
+        if capturar:
+            plano = self._explicar(conn, dialeto, statement, parametros)
+            if plano is not None:
+                estatistica["plano"] = plano
+                estatistica["varredura_completa"] = _varredura_completa(plano)
+
+        logger.warning(
+            "Consulta lenta",
+            extra={
+                "duracao_ms": round(duracao_ms, 2),
+                "fingerprint": chave,
+                "parametros": redigir_parametros(parametros),
+                "plano": plano,
+                "varredura_completa": estatistica["varredura_completa"],
+            },
+        )
+
+    def _explicar(self, conn, dialeto: str, statement: str, parametros) -> Optional[List[str]]:
+        """
+        Plano de execução do statement
+
+        Usa um cursor direto do driver na mesma conexão: não dispara os
+        eventos do SQLAlchemy (nem é contado como consulta) e enxerga as
+        mesmas tabelas temporárias e a mesma transação. No Postgres o
+        EXPLAIN roda dentro de um SAVEPOINT (o equivalente a begin_nested()
+        no nível do driver): se falhar, só o savepoint é desfeito e a
+        transação da requisição continua utilizável.
+        """
+        if not statement.lstrip().upper().startswith(_COMANDOS_COM_PLANO):
+            return None
+        if dialeto == "sqlite":
+            prefixo = "EXPLAIN QUERY PLAN "
+        elif dialeto == "postgresql":
+            prefixo = "EXPLAIN "
+        else:
+            return None
+        savepoint = dialeto == "postgresql"
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                if savepoint:
+                    cursor.execute("SAVEPOINT explicar_consulta")
+                try:
+                    cursor.execute(prefixo + statement, parametros or ())
+                    linhas = cursor.fetchall()
+                except Exception:
+                    if savepoint:
+                        cursor.execute("ROLLBACK TO SAVEPOINT explicar_consulta")
+                    raise
+                finally:
+                    if savepoint:
+                        cursor.execute("RELEASE SAVEPOINT explicar_consulta")
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.debug("Não foi possível capturar o plano: %s", e)
+            return None
+        if dialeto == "sqlite":
+            # (id, parent, notused, detail)
+            return [str(linha[-1]) for linha in linhas]
+        return [str(linha[0]) for linha in linhas]
+
+    def mais_lentas(self, limite: int = 20, ordenar_por: str = "total_ms") -> List[Dict[str, Any]]:
+        """Consultas lentas agregadas por fingerprint, das mais custosas para as menos"""
+        with self._lock:
+            itens = [
+                {
+                    "fingerprint": e["fingerprint"],
+                    "execucoes": e["execucoes"],
+                    "total_ms": round(e["total_ms"], 2),
+                    "media_ms": round(e["total_ms"] / e["execucoes"], 2),
+                    "max_ms": round(e["max_ms"], 2),
+                    "ultima_em": e.get("ultima_em"),
+                    "varredura_completa": e["varredura_completa"],
+                    "plano": e["plano"],
+                }
+                for e in self._estatisticas.values()
+            ]
+        return sorted(itens, key=lambda item: item[ordenar_por], reverse=True)[:limite]
+
+    def limpar(self):
+        with self._lock:
+            self._estatisticas.clear()
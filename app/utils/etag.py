@@ -0,0 +1,37 @@
+from typing import Optional
+
+
+def gerar_etag(*partes) -> str:
+    """
+    Monta um ETag fraco a partir de partes que identificam a versão do recurso
+
+    Example:
+        gerar_etag("u", 10, 3) -> 'W/"u-10-3"'
+    """
+    return 'W/"' + "-".join(str(parte) for parte in partes) + '"'
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica o header If-None-Match contra o ETag atual (comparação fraca)
+
+    Args:
+        if_none_match: Valor do header (pode ter vários ETags separados por vírgula, ou "*")
+        etag: ETag atual do recurso
+
+    Returns:
+        True se o cliente já tem a versão atual (responder 304)
+    """
+    if not if_none_match:
+        return False
+
+    atual = etag[2:] if etag.startswith("W/") else etag
+    for valor in if_none_match.split(","):
+        valor = valor.strip()
+        if valor == "*":
+            return True
+        if valor.startswith("W/"):
+            valor = valor[2:]
+        if valor == atual:
+            return True
+    return False
@@ -4,6 +4,9 @@ from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from ..core.config import settings
+from .tempos import medido
+from .metricas import jwt_decodificacoes_total, medir_bcrypt
+from .tracing import rastreado
 
 # Contexto de hash de senha (bcrypt)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -13,6 +16,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 43200  # 30 dias
 ACCESS_TOKEN_EXPIRE_SECONDS = 2592000  # 30 dias em segundos
 
 
+@medido("bcrypt")
+@medir_bcrypt
+@rastreado("bcrypt.hash")
 def hash_password(password: str) -> str:
     """
     Cria um hash seguro da senha usando bcrypt
@@ -26,6 +32,9 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@medido("bcrypt")
+@medir_bcrypt
+@rastreado("bcrypt.verificar")
 def verify_password(password: str, hashed_password: str) -> bool:
     """
     Verifica se uma senha corresponde ao hash armazenado
@@ -43,6 +52,8 @@ def verify_password(password: str, hashed_password: str) -> bool:
         return False
 
 
+@medido("jwt")
+@rastreado("jwt.criar")
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Cria um token JWT com duração de 1 MÊS
@@ -78,6 +89,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         )
 
 
+@medido("jwt")
+@rastreado("jwt.verificar")
 def verify_token(token: str) -> Dict[str, Any]:
     """
     Verifica e decodifica um token JWT
@@ -102,17 +115,23 @@ def verify_token(token: str) -> Dict[str, Any]:
         
         user_id = payload.get("user_id")
         if user_id is None:
+            jwt_decodificacoes_total.labels("invalido").inc()
             raise credentials_exception
         
+        jwt_decodificacoes_total.labels("ok").inc()
         return payload
         
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
+        jwt_decodificacoes_total.labels("expirado").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token expirado. Faça login novamente.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except JWTError:
+        jwt_decodificacoes_total.labels("invalido").inc()
         raise credentials_exception
     except Exception as e:
         raise HTTPException(
@@ -137,12 +156,13 @@ def get_user_from_token(token: str) -> Dict[str, Any]:
         "email": payload.get("email"),
         "login": payload.get("login"),
         "tag": payload.get("tag"),
+        "plan": payload.get("plan"),
         "token_duration": payload.get("token_duration", "1_month"),
         "token_version": payload.get("token_version", "1.0")
     }
 
 
-def create_user_token_data(user_id: int, email: str, login: str, tag: str) -> Dict[str, Any]:
+def create_user_token_data(user_id: int, email: str, login: str, tag: str, plan: Optional[str] = None) -> Dict[str, Any]:
     """
     Cria os dados do usuário para incluir no token
     
@@ -151,6 +171,7 @@ def create_user_token_data(user_id: int, email: str, login: str, tag: str) -> Di
         email: Email do usuário  
         login: Login do usuário
         tag: Tag/role do usuário
+        plan: Plano do usuário (usado nos limites por plano)
     
     Returns:
         Dicionário com dados para o token
@@ -160,6 +181,7 @@ def create_user_token_data(user_id: int, email: str, login: str, tag: str) -> Di
         "email": email,
         "login": login,
         "tag": tag,
+        "plan": plan,
         "token_type": "access",
         "created_at": datetime.utcnow().isoformat()
     }
\ No newline at end of file
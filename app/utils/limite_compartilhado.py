@@ -0,0 +1,47 @@
+import time
+from typing import Hashable
+
+from limits import parse
+from limits.storage import Storage
+from limits.strategies import FixedWindowRateLimiter
+
+from .token_bucket import LimiteExcedido
+
+
+class LimiteCompartilhado:
+    """
+    Limite por chave (IP + conta, usuário) no storage de rate limit
+
+    Usa o mesmo storage dos limites por IP do slowapi (RATE_LIMIT_STORAGE_URI):
+    com sqlite:// ou redis:// todos os workers incrementam o mesmo contador,
+    então o limite configurado vale para o servidor inteiro, não por worker.
+    Janela fixa, como os limites do slowapi: o contador zera quando a janela
+    expira e as chaves ociosas saem do storage sozinhas.
+    """
+
+    def __init__(self, limite: str, storage: Storage, namespace: str):
+        """
+        Args:
+            limite: Limite no formato do slowapi/limits, ex: "10/minute"
+            storage: Storage do limits (ver app/utils/rate_limit_storage.py)
+            namespace: Prefixo das chaves, separa limites com o mesmo valor
+        """
+        self.limite = limite
+        self.item = parse(limite)
+        self.namespace = namespace
+        self._estrategia = FixedWindowRateLimiter(storage)
+
+    def verificar(self, chave: Hashable, custo: int = 1):
+        """
+        Conta `custo` requisições da chave ou levanta LimiteExcedido
+
+        Raises:
+            LimiteExcedido: Se a chave passou do limite na janela atual
+        """
+        if not self._estrategia.hit(self.item, self.namespace, str(chave), cost=custo):
+            reinicio = self._estrategia.get_window_stats(self.item, self.namespace, str(chave))[0]
+            raise LimiteExcedido(self.limite, max(0.0, reinicio - time.time()))
+
+    def limpar(self, chave: Hashable):
+        """Zera o contador da chave (ex.: após login bem-sucedido)"""
+        self._estrategia.clear(self.item, self.namespace, str(chave))
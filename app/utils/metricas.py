@@ -0,0 +1,132 @@
+import os
+from contextlib import contextmanager
+from functools import wraps
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    REGISTRY,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+# Com PROMETHEUS_MULTIPROC_DIR definido (run.py faz isso com vários
+# workers) cada processo grava seus valores em arquivos mmap nesse diretório
+# e /metrics soma todos na leitura. Sem ele, vale o registry do processo.
+MULTIPROCESSO = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Buckets em segundos: de respostas em cache (~1ms) até bcrypt + email (~segundos)
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+requisicoes_total = Counter(
+    "http_requests_total",
+    "Requisições HTTP por rota, método e status",
+    ["metodo", "rota", "status"],
+)
+latencia_requisicao = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota e status",
+    ["metodo", "rota", "status"],
+    buckets=BUCKETS_LATENCIA,
+)
+requisicoes_em_andamento = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    multiprocess_mode="livesum",
+)
+threadpool_em_uso = Gauge(
+    "threadpool_threads_in_use",
+    "Threads da threadpool das endpoints síncronas em uso",
+    multiprocess_mode="livesum",
+)
+threadpool_capacidade = Gauge(
+    "threadpool_threads_total",
+    "Tamanho da threadpool das endpoints síncronas",
+    multiprocess_mode="livesum",
+)
+db_conexoes_em_uso = Gauge(
+    "db_pool_connections_in_use",
+    "Conexões do pool do banco emprestadas no momento",
+    multiprocess_mode="livesum",
+)
+db_pool_capacidade = Gauge(
+    "db_pool_connections_total",
+    "Capacidade do pool do banco por processo (pool_size + max_overflow)",
+    multiprocess_mode="max",
+)
+bcrypt_em_andamento = Gauge(
+    "bcrypt_operations_in_progress",
+    "Operações de bcrypt (hash/verificação) em andamento ou aguardando CPU",
+    multiprocess_mode="livesum",
+)
+jwt_decodificacoes_total = Counter(
+    "jwt_decode_total",
+    "Tokens JWT decodificados por resultado",
+    ["resultado"],
+)
+emails_total = Counter(
+    "email_send_total",
+    "Chamadas de envio de email por resultado",
+    ["resultado"],
+)
+rate_limit_rejeicoes_total = Counter(
+    "rate_limit_rejections_total",
+    "Requisições recusadas por rate limit, por rota e tipo de limite",
+    ["rota", "limite"],
+)
+
+
+@contextmanager
+def em_andamento(gauge: Gauge):
+    """Incrementa o gauge enquanto o bloco executa"""
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+def medir_bcrypt(funcao):
+    """Decorator: conta a operação em bcrypt_em_andamento enquanto executa"""
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        with em_andamento(bcrypt_em_andamento):
+            return funcao(*args, **kwargs)
+    return wrapper
+
+
+def instrumentar_pool(engine):
+    """Acompanha as conexões emprestadas do pool pelos eventos checkout/checkin"""
+    pool = engine.pool
+    if hasattr(pool, "size"):
+        overflow = getattr(pool, "_max_overflow", 0)
+        db_pool_capacidade.set(pool.size() + max(overflow, 0))
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        db_conexoes_em_uso.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        db_conexoes_em_uso.dec()
+
+
+def gerar_metricas() -> Tuple[bytes, str]:
+    """Texto no formato do Prometheus e o content-type correspondente"""
+    if MULTIPROCESSO:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def processo_encerrado(pid: int):
+    """Remove os gauges "live" de um worker que terminou (hook do gunicorn)"""
+    if MULTIPROCESSO:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+
+from ..core.constants import ORCAMENTO_CONSULTAS
+from .tempos import medicao_ativa, tempos_atuais
+
+
+def orcamento_da_rota(metodo: str, rota: str) -> Optional[int]:
+    """Máximo de statements declarado para a rota, ou None se não houver"""
+    return ORCAMENTO_CONSULTAS.get(f"{metodo} {rota}")
+
+
+def consultas_da_requisicao() -> int:
+    """Statements SQL executados até agora na requisição atual"""
+    return tempos_atuais().get("db", {}).get("n", 0)
+
+
+class ContadorConsultas:
+    def __init__(self):
+        self.total = 0
+        self.statements = []
+
+    def zerar(self):
+        self.total = 0
+        self.statements = []
+
+
+@contextmanager
+def contar_consultas(engine):
+    """
+    Conta os statements executados no engine dentro de requisições
+
+    Statements de fora de requisições (inicialização, verificação de
+    prontidão em segundo plano) não entram na conta.
+
+    Example:
+        with contar_consultas(engine) as contador:
+            client.get("/me", headers=headers)
+        assert contador.total <= 2
+    """
+    contador = ContadorConsultas()
+
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        if medicao_ativa():
+            contador.total += 1
+            contador.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _contar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, "before_cursor_execute", _contar)
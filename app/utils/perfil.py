@@ -0,0 +1,136 @@
+import asyncio
+import cProfile
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+# Pedido de perfil da requisição atual (definido pelo PerfilMiddleware).
+# É um dict mutável para a rota devolver o nome do arquivo gerado.
+perfil_solicitado: ContextVar[Optional[Dict[str, Any]]] = ContextVar("perfil_solicitado", default=None)
+
+_NOME_VALIDO = re.compile(r"^[\w.-]+\.prof$")
+
+
+class ArmazemPerfis:
+    """
+    Diretório de perfis (.prof do cProfile) com rotação
+
+    Mantém no máximo `max_arquivos`; ao salvar um novo, os mais antigos
+    são apagados.
+    """
+
+    def __init__(self, diretorio: str, max_arquivos: int = 50):
+        self.diretorio = diretorio
+        self.max_arquivos = max(1, max_arquivos)
+        self._lock = threading.Lock()
+
+    def salvar(self, profiler: cProfile.Profile, metodo: str, rota: str, duracao_ms: float) -> str:
+        """Grava o perfil e retorna o nome do arquivo"""
+        os.makedirs(self.diretorio, exist_ok=True)
+        rota_nome = re.sub(r"[^\w]+", "_", rota).strip("_") or "raiz"
+        nome = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{metodo}_{rota_nome}_{int(duracao_ms)}ms.prof"
+        profiler.dump_stats(os.path.join(self.diretorio, nome))
+        self._rotacionar()
+        return nome
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """Perfis disponíveis, do mais recente para o mais antigo"""
+        if not os.path.isdir(self.diretorio):
+            return []
+        perfis = []
+        for nome in os.listdir(self.diretorio):
+            if not _NOME_VALIDO.match(nome):
+                continue
+            info = os.stat(os.path.join(self.diretorio, nome))
+            perfis.append({
+                "nome": nome,
+                "tamanho_bytes": info.st_size,
+                "criado_em": datetime.utcfromtimestamp(info.st_mtime).isoformat(),
+            })
+        return sorted(perfis, key=lambda perfil: perfil["nome"], reverse=True)
+
+    def caminho(self, nome: str) -> Optional[str]:
+        """Caminho do perfil, ou None se o nome for inválido ou não existir"""
+        if not _NOME_VALIDO.match(nome):
+            return None
+        caminho = os.path.join(self.diretorio, nome)
+        return caminho if os.path.isfile(caminho) else None
+
+    def _rotacionar(self):
+        with self._lock:
+            nomes = sorted(n for n in os.listdir(self.diretorio) if _NOME_VALIDO.match(n))
+            for nome in nomes[:-self.max_arquivos]:
+                try:
+                    os.remove(os.path.join(self.diretorio, nome))
+                except OSError:
+                    pass
+
+
+armazem_perfis: Optional[ArmazemPerfis] = None
+
+
+def configurar_armazem(diretorio: str, max_arquivos: int):
+    global armazem_perfis
+    armazem_perfis = ArmazemPerfis(diretorio, max_arquivos)
+
+
+def _executar_com_perfil(pedido: Dict[str, Any], rota: str, funcao, *args, **kwargs):
+    profiler = cProfile.Profile()
+    inicio = time.perf_counter()
+    profiler.enable()
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        profiler.disable()
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        if armazem_perfis is not None:
+            pedido["arquivo"] = armazem_perfis.salvar(profiler, pedido["metodo"], rota, duracao_ms)
+
+
+class RotaPerfilavel(APIRoute):
+    """
+    APIRoute que executa a função da endpoint sob cProfile quando a
+    requisição pediu perfil
+
+    O profiler é ligado na thread que executa a endpoint (a threadpool, no
+    caso das endpoints síncronas), então mede o trabalho real da rota e não
+    o event loop. Dependências (ex.: get_db) ficam fora do perfil.
+    """
+
+    def get_route_handler(self):
+        original = self.dependant.call
+        rota = self.path
+
+        if asyncio.iscoroutinefunction(original):
+            @wraps(original)
+            async def chamada(*args, **kwargs):
+                pedido = perfil_solicitado.get()
+                if pedido is None:
+                    return await original(*args, **kwargs)
+                profiler = cProfile.Profile()
+                inicio = time.perf_counter()
+                profiler.enable()
+                try:
+                    return await original(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    if armazem_perfis is not None:
+                        duracao_ms = (time.perf_counter() - inicio) * 1000
+                        pedido["arquivo"] = armazem_perfis.salvar(profiler, pedido["metodo"], rota, duracao_ms)
+        else:
+            @wraps(original)
+            def chamada(*args, **kwargs):
+                pedido = perfil_solicitado.get()
+                if pedido is None:
+                    return original(*args, **kwargs)
+                return _executar_com_perfil(pedido, rota, original, *args, **kwargs)
+
+        self.dependant.call = chamada
+        return super().get_route_handler()
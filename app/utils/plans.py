@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+# Duração de cada plano em dias
+PLANOS = {
+    "trial": 15,
+    "mensal": 30,
+    "trimestral": 90,
+    "semestral": 180,
+    "anual": 365,
+    "admin": 36500,
+}
+
+
+def _get_plan_name(usuario) -> str:
+    return (usuario.plan or "trial").lower()
+
+
+def calcular_dias_restantes(usuario) -> int:
+    """
+    Calcula dias restantes do plano do usuário.
+    Retorna 0 em caso de erro, plano desconhecido ou plan_date ausente.
+    """
+    try:
+        plan = _get_plan_name(usuario)
+        plan_date = usuario.plan_date
+        if not plan_date or plan not in PLANOS:
+            return 0
+        fim = plan_date + timedelta(days=PLANOS[plan])
+        dias = (fim - datetime.utcnow()).days
+        return max(dias, 0)
+    except Exception:
+        return 0
+
+
+def obter_duracao_plano(usuario) -> int:
+    """Retorna a duração total do plano em dias. Default: 30."""
+    try:
+        plan = _get_plan_name(usuario)
+        return PLANOS.get(plan, 30)
+    except Exception:
+        return 30
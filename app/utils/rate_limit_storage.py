@@ -0,0 +1,112 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from limits.storage import Storage
+
+# Registro de esquema: importar este módulo torna "sqlite://" válido em
+# Limiter(storage_uri=...). Outros backends do limits (ex.: "redis://",
+# "memcached://") continuam disponíveis pela mesma configuração.
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage de rate limit em um arquivo SQLite compartilhado
+
+    Todos os workers do mesmo host apontam para o mesmo arquivo, então os
+    contadores são globais e não multiplicados pelo número de processos.
+    Cada incremento é um único UPSERT (atômico no SQLite) que também reinicia
+    a janela quando ela já expirou.
+
+    URI no mesmo formato do SQLAlchemy:
+        sqlite:///./ratelimit.db      (relativo)
+        sqlite:////var/run/rl.db      (absoluto)
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    # A cada N incrementos (em média) remove janelas expiradas da tabela
+    LIMPEZA_A_CADA = 1000
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.caminho = self._caminho_da_uri(uri or "sqlite:///./ratelimit.db")
+        self.timeout = float(options.get("timeout", 5))
+        self._local = threading.local()
+        self._criar_tabela()
+
+    @staticmethod
+    def _caminho_da_uri(uri: str) -> str:
+        caminho = uri.split("://", 1)[1]
+        # sqlite:///relativo -> "relativo"; sqlite:////absoluto -> "/absoluto"
+        if caminho.startswith("/"):
+            caminho = caminho[1:]
+        return caminho or "ratelimit.db"
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Uma conexão por thread (e por processo), em modo autocommit"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None or self._local.pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _criar_tabela(self):
+        self._conexao().execute(
+            "CREATE TABLE IF NOT EXISTS limites ("
+            " chave TEXT PRIMARY KEY,"
+            " contador INTEGER NOT NULL,"
+            " expira_em REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1, **_) -> int:
+        agora = time.time()
+        conexao = self._conexao()
+        contador = conexao.execute(
+            "INSERT INTO limites (chave, contador, expira_em) VALUES (?, ?, ?) "
+            "ON CONFLICT(chave) DO UPDATE SET "
+            " contador = CASE WHEN expira_em <= ? THEN excluded.contador ELSE contador + excluded.contador END,"
+            " expira_em = CASE WHEN expira_em <= ? THEN excluded.expira_em ELSE expira_em END "
+            "RETURNING contador",
+            (key, amount, agora + expiry, agora, agora),
+        ).fetchall()[0][0]
+
+        if random.randrange(self.LIMPEZA_A_CADA) == 0:
+            conexao.execute("DELETE FROM limites WHERE expira_em <= ?", (agora,))
+        return contador
+
+    def get(self, key: str) -> int:
+        linha = self._conexao().execute(
+            "SELECT contador FROM limites WHERE chave = ? AND expira_em > ?", (key, time.time())
+        ).fetchone()
+        return linha[0] if linha else 0
+
+    def get_expiry(self, key: str) -> float:
+        linha = self._conexao().execute(
+            "SELECT expira_em FROM limites WHERE chave = ? AND expira_em > ?", (key, time.time())
+        ).fetchone()
+        return linha[0] if linha else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._conexao().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._conexao().execute("DELETE FROM limites").rowcount
+
+    def clear(self, key: str) -> None:
+        self._conexao().execute("DELETE FROM limites WHERE chave = ?", (key,))
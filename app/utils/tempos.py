@@ -0,0 +1,160 @@
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+
+# Tempos da requisição atual: {fase: [segundos acumulados, quantidade]}.
+# O dict é criado pelo middleware e compartilhado com a threadpool (o
+# contexto é copiado, mas aponta para o mesmo objeto), então as endpoints
+# síncronas acumulam nele normalmente. Fora de requisições vale None e a
+# medição não faz nada.
+_fases: ContextVar[Optional[Dict[str, list]]] = ContextVar("tempos_requisicao", default=None)
+
+
+def iniciar_medicao() -> Token:
+    """Começa a acumular tempos por fase no contexto atual"""
+    return _fases.set({})
+
+
+def encerrar_medicao(token: Token):
+    _fases.reset(token)
+
+
+def medicao_ativa() -> bool:
+    """True dentro de uma requisição medida pelo ServerTimingMiddleware"""
+    return _fases.get() is not None
+
+
+def registrar(fase: str, segundos: float):
+    """Soma `segundos` à fase na requisição atual (sem efeito fora de requisições)"""
+    fases = _fases.get()
+    if fases is None:
+        return
+    acumulado = fases.get(fase)
+    if acumulado is None:
+        fases[fase] = [segundos, 1]
+    else:
+        acumulado[0] += segundos
+        acumulado[1] += 1
+
+
+def tempos_atuais() -> Dict[str, Dict[str, float]]:
+    """Tempos da requisição atual: {fase: {"ms": total, "n": quantidade}}"""
+    fases = _fases.get() or {}
+    return {fase: {"ms": round(segundos * 1000, 2), "n": n} for fase, (segundos, n) in fases.items()}
+
+
+@contextmanager
+def medir_fase(fase: str):
+    """
+    Mede o bloco e soma o tempo na fase
+
+    Example:
+        with medir_fase("email"):
+            requests.post(...)
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(fase, time.perf_counter() - inicio)
+
+
+def medido(fase: str):
+    """Decorator: soma o tempo de cada chamada da função na fase"""
+    def decorator(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar(fase, time.perf_counter() - inicio)
+        return wrapper
+    return decorator
+
+
+# Ouvintes de statements por engine (ver ouvir_statements)
+_ouvintes_por_engine: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+# Statements em execução na conexão: [(perf_counter, time.time())]
+_CHAVE_EM_EXECUCAO = "_statements_em_execucao"
+
+
+def ouvir_statements(engine, ouvinte: Callable):
+    """
+    Chama `ouvinte` ao fim de cada statement SQL do engine
+
+    Um só conjunto de eventos do SQLAlchemy mede os statements para todos
+    os interessados (tempos por fase, consultas lentas, tracing), com uma
+    única pilha em conn.info. Se o statement falha, o evento handle_error
+    tira a entrada da pilha e o ouvinte recebe a exceção; sem isso ela
+    ficaria na conexão devolvida ao pool.
+
+    Args:
+        engine: Engine do SQLAlchemy
+        ouvinte: Função (conn, statement, parametros, executemany, inicio,
+            duracao, erro); `inicio` em time.time(), `duracao` em segundos
+            e `erro` com a exceção quando o statement falhou (senão None)
+    """
+    ouvintes = _ouvintes_por_engine.get(engine)
+    if ouvintes is None:
+        ouvintes = _ouvintes_por_engine[engine] = []
+        _instalar_eventos(engine, ouvintes)
+    ouvintes.append(ouvinte)
+
+
+def _instalar_eventos(engine, ouvintes: List[Callable]):
+    def concluir(conn, entrada, statement, parametros, executemany, erro):
+        inicio_relogio, inicio = entrada
+        duracao = time.perf_counter() - inicio_relogio
+        for ouvinte in ouvintes:
+            ouvinte(conn, statement, parametros, executemany, inicio, duracao, erro)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_CHAVE_EM_EXECUCAO, []).append((time.perf_counter(), time.time()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        pilha = conn.info.get(_CHAVE_EM_EXECUCAO)
+        if pilha:
+            concluir(conn, pilha.pop(), statement, parameters, executemany, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _erro(contexto):
+        conn = contexto.connection
+        pilha = conn.info.get(_CHAVE_EM_EXECUCAO) if conn is not None else None
+        if not pilha:
+            return
+        # O statement que falhou é o último empilhado; nada mais segue em
+        # execução nesta conexão depois do erro
+        entrada = pilha[-1]
+        pilha.clear()
+        executemany = bool(contexto.execution_context is not None and contexto.execution_context.executemany)
+        concluir(conn, entrada, contexto.statement, contexto.parameters, executemany, contexto.original_exception)
+
+
+def instrumentar_engine(engine, fase: str = "db"):
+    """Soma o tempo de todas as queries do engine na fase"""
+
+    def _somar(conn, statement, parametros, executemany, inicio, duracao, erro):
+        registrar(fase, duracao)
+
+    ouvir_statements(engine, _somar)
+
+
+def formatar_server_timing(tempos: Dict[str, Dict[str, float]], total_ms: float) -> str:
+    """
+    Monta o header Server-Timing
+
+    Example:
+        db;dur=1.20, bcrypt;dur=230.51, total;dur=233.02
+    """
+    partes = [f"{fase};dur={valores['ms']:.2f}" for fase, valores in tempos.items()]
+    partes.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(partes)
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+from limits import parse
+
+
+class TokenBucketLimiter:
+    """
+    Limiter token bucket em memória com número máximo de chaves
+
+    Implementado como GCRA (Generic Cell Rate Algorithm), equivalente a um
+    token bucket: para cada chave guarda só um float, o "instante teórico de
+    chegada" (TAT). Chaves ociosas por mais que o período de recarga completo
+    são equivalentes a um bucket cheio e podem ser descartadas sem perda; além
+    disso, ao passar de `max_chaves` a chave usada há mais tempo é removida
+    (LRU), então a memória fica limitada mesmo em varreduras com milhões de IPs.
+    """
+
+    def __init__(self, limite: str, max_chaves: int = 100_000):
+        """
+        Args:
+            limite: Limite no formato do slowapi/limits, ex: "10/minute"
+                (capacidade do bucket = 10, recarga completa em 1 minuto)
+            max_chaves: Quantidade máxima de chaves guardadas
+        """
+        item = parse(limite)
+        self.limite = limite
+        self.capacidade = item.amount
+        self.periodo = float(item.get_expiry())
+        self.intervalo = self.periodo / self.capacidade
+        self.max_chaves = max(1, max_chaves)
+
+        self._tat: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, chave: Hashable, custo: int = 1) -> Tuple[bool, float]:
+        """
+        Tenta consumir `custo` tokens da chave
+
+        Returns:
+            (permitido, segundos até haver tokens suficientes)
+        """
+        agora = time.monotonic()
+        incremento = self.intervalo * custo
+
+        with self._lock:
+            tat = self._tat.get(chave, agora)
+            if tat < agora:
+                tat = agora
+
+            novo_tat = tat + incremento
+            # Cabe no bucket se o novo TAT não passar de agora + capacidade
+            espera = novo_tat - agora - self.periodo
+            if espera > 0:
+                if chave in self._tat:
+                    self._tat.move_to_end(chave)
+                return False, espera
+
+            self._tat[chave] = novo_tat
+            self._tat.move_to_end(chave)
+            if len(self._tat) > self.max_chaves:
+                self._descartar(agora)
+            return True, 0.0
+
+    def verificar(self, chave: Hashable, custo: int = 1):
+        """
+        Consome tokens da chave ou levanta LimiteExcedido
+
+        Raises:
+            LimiteExcedido: Se não houver tokens suficientes
+        """
+        permitido, espera = self.consumir(chave, custo)
+        if not permitido:
+            raise LimiteExcedido(self.limite, espera)
+
+    def _descartar(self, agora: float):
+        """Remove a chave menos recente e mais algumas ociosas do início da fila (com lock)"""
+        self._tat.popitem(last=False)
+        for _ in range(8):
+            if not self._tat:
+                break
+            chave, tat = next(iter(self._tat.items()))
+            if tat > agora:
+                break
+            # TAT no passado = bucket cheio: descartar não muda nada
+            del self._tat[chave]
+
+    def limpar(self, chave: Hashable):
+        """Remove o estado de uma chave (ex.: após login bem-sucedido)"""
+        with self._lock:
+            self._tat.pop(chave, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tat)
+
+
+class LimiteExcedido(Exception):
+    """Levantada quando um limite por chave (TokenBucketLimiter, LimiteCompartilhado) recusa a requisição"""
+
+    def __init__(self, limite: str, retry_after: float):
+        super().__init__(limite)
+        self.limite = limite
+        self.retry_after = retry_after
@@ -0,0 +1,373 @@
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from .tempos import ouvir_statements
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotação sem lock entre processos
+    fcntl = None
+
+NOME_SERVICO = "backbase"
+
+# Limite de spans guardados por trace (ex.: envio de emails em lote faz uma
+# query por página); os excedentes só são contados
+MAX_SPANS_POR_TRACE = 500
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Trace:
+    """
+    Spans de uma requisição, exportados juntos quando ela termina
+
+    Com `gravando` falso só o span raiz existe: span(), rastreado() e os
+    ganchos de SQL e HTTP nem criam os filhos.
+    """
+
+    def __init__(self, trace_id: str, amostrado: bool, gravando: bool = True):
+        self.trace_id = trace_id
+        self.amostrado = amostrado
+        self.gravando = gravando
+        self.spans: List["Span"] = []
+        self.descartados = 0
+
+
+class Span:
+    """Uma operação com início, duração e tags (modelo do Zipkin v2)"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "nome", "tipo", "inicio", "_inicio_relogio", "duracao", "tags")
+
+    def __init__(self, trace: Trace, nome: str, parent_id: Optional[str] = None, tipo: Optional[str] = None):
+        self.trace = trace
+        self.span_id = _novo_id(16)
+        self.parent_id = parent_id
+        self.nome = nome
+        self.tipo = tipo
+        self.inicio = time.time()
+        self._inicio_relogio = time.perf_counter()
+        self.duracao: Optional[float] = None
+        self.tags: Dict[str, str] = {}
+
+    def tag(self, chave: str, valor: Any):
+        self.tags[chave] = str(valor)
+
+    def finalizar(self):
+        self.duracao = time.perf_counter() - self._inicio_relogio
+        if len(self.trace.spans) < MAX_SPANS_POR_TRACE:
+            self.trace.spans.append(self)
+        else:
+            self.trace.descartados += 1
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-{'01' if self.trace.amostrado else '00'}"
+
+    def para_zipkin(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "id": self.span_id,
+            "name": self.nome,
+            "timestamp": int(self.inicio * 1_000_000),
+            "duration": max(1, int((self.duracao or 0) * 1_000_000)),
+            "localEndpoint": {"serviceName": NOME_SERVICO},
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        if self.tipo:
+            span["kind"] = self.tipo
+        if self.tags:
+            span["tags"] = self.tags
+        return span
+
+
+# Span ativo no contexto atual. O contexto é copiado para a threadpool, então
+# spans abertos nas endpoints síncronas ficam como filhos do span da requisição
+_span_atual: ContextVar[Optional[Span]] = ContextVar("span_atual", default=None)
+
+
+def _novo_id(digitos: int) -> str:
+    return f"{random.getrandbits(digitos * 4):0{digitos}x}"
+
+
+def span_atual() -> Optional[Span]:
+    return _span_atual.get()
+
+
+def _pai_gravando() -> Optional[Span]:
+    """Span ativo, se o trace dele grava filhos"""
+    pai = _span_atual.get()
+    if pai is None or not pai.trace.gravando:
+        return None
+    return pai
+
+
+class Amostragem:
+    """
+    Política de amostragem
+
+    Na exportação vale a decisão inicial (header traceparent com flag
+    "sampled" ou sorteio com `taxa`) e, mesmo sem ela, requisições com erro
+    5xx ou mais lentas que `lento_ms` são sempre exportadas. Para isso a
+    árvore de spans precisa ser montada antes de saber o resultado: nas
+    requisições não amostradas, só uma fração `taxa_cauda` monta a árvore;
+    nas demais o trace tem só o span raiz (exportado do mesmo jeito se
+    lento ou com erro).
+    """
+
+    def __init__(self, taxa: float = 0.1, lento_ms: float = 500.0, taxa_cauda: float = 1.0):
+        self.taxa = taxa
+        self.lento_ms = lento_ms
+        self.taxa_cauda = taxa_cauda
+
+    def decidir_inicio(self, traceparent_amostrado: Optional[bool]) -> bool:
+        if traceparent_amostrado is not None:
+            return traceparent_amostrado
+        return random.random() < self.taxa
+
+    def decidir_gravacao(self, amostrado: bool) -> bool:
+        """Se o trace monta os spans filhos (sempre, quando já amostrado)"""
+        return amostrado or random.random() < self.taxa_cauda
+
+    def exportar(self, trace: Trace, raiz: Span, status: Optional[int]) -> bool:
+        if trace.amostrado:
+            return True
+        if status is None or status >= 500:
+            return True
+        return (raiz.duracao or 0) * 1000 >= self.lento_ms
+
+
+class ExportadorArquivo:
+    """
+    Grava traces em arquivo local com rotação, em segundo plano
+
+    Cada linha é um array JSON com os spans de um trace no formato Zipkin v2
+    (importável no Zipkin e no Jaeger). A escrita acontece em uma thread
+    separada; com a fila cheia o trace é descartado em vez de bloquear a
+    requisição. Vários workers podem escrever no mesmo arquivo: as linhas são
+    gravadas com O_APPEND e a rotação usa um lock de arquivo.
+    """
+
+    def __init__(self, caminho: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5, tamanho_fila: int = 1000):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.backups = max(1, backups)
+        self.descartados = 0
+        self._fila: queue.Queue = queue.Queue(tamanho_fila)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def exportar(self, spans: List[Dict[str, Any]]):
+        self._garantir_thread()
+        try:
+            self._fila.put_nowait(spans)
+        except queue.Full:
+            self.descartados += 1
+
+    def _garantir_thread(self):
+        # Verificado a cada exportação: depois do fork (gunicorn com preload)
+        # a thread do processo pai não existe no filho
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is not None:
+                    self._fila = queue.Queue(self._fila.maxsize)
+                self._thread = threading.Thread(target=self._escrever, name="exportador-traces", daemon=True)
+                self._thread.start()
+
+    def _escrever(self):
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        while True:
+            spans = self._fila.get()
+            linha = (json.dumps(spans, separators=(",", ":")) + "\n").encode()
+            try:
+                self._rotacionar_se_preciso()
+                descritor = os.open(self.caminho, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(descritor, linha)
+                finally:
+                    os.close(descritor)
+            except OSError:
+                self.descartados += 1
+
+    def _rotacionar_se_preciso(self):
+        try:
+            if os.path.getsize(self.caminho) < self.max_bytes:
+                return
+        except OSError:
+            return
+        with open(self.caminho + ".lock", "w") as trava:
+            if fcntl is not None:
+                fcntl.flock(trava, fcntl.LOCK_EX)
+            # Outro worker pode ter rotacionado enquanto esperávamos o lock
+            if not os.path.exists(self.caminho) or os.path.getsize(self.caminho) < self.max_bytes:
+                return
+            for indice in range(self.backups - 1, 0, -1):
+                origem = f"{self.caminho}.{indice}"
+                if os.path.exists(origem):
+                    os.replace(origem, f"{self.caminho}.{indice + 1}")
+            os.replace(self.caminho, f"{self.caminho}.1")
+
+
+class Rastreador:
+    """Cria traces e spans e entrega os traces finalizados ao exportador"""
+
+    def __init__(self, exportador: ExportadorArquivo, amostragem: Amostragem):
+        self.exportador = exportador
+        self.amostragem = amostragem
+
+    def iniciar_requisicao(self, nome: str, traceparent: Optional[str] = None) -> Span:
+        """Span raiz (SERVER) da requisição, continuando o trace do header traceparent"""
+        trace_id = parent_id = amostrado = None
+        if traceparent:
+            encontrado = _TRACEPARENT.match(traceparent.strip().lower())
+            if encontrado:
+                trace_id, parent_id, flags = encontrado.groups()
+                amostrado = bool(int(flags, 16) & 1)
+        amostrado = self.amostragem.decidir_inicio(amostrado)
+        trace = Trace(trace_id or _novo_id(32), amostrado, self.amostragem.decidir_gravacao(amostrado))
+        return Span(trace, nome, parent_id=parent_id, tipo="SERVER")
+
+    def finalizar_requisicao(self, raiz: Span, status: Optional[int]):
+        raiz.tag("http.status_code", status if status is not None else "erro")
+        raiz.finalizar()
+        trace = raiz.trace
+        if trace.descartados:
+            raiz.tag("spans_descartados", trace.descartados)
+        if not trace.gravando:
+            raiz.tag("spans_filhos", "nao_gravados")
+        if self.amostragem.exportar(trace, raiz, status):
+            self.exportador.exportar([span.para_zipkin() for span in trace.spans])
+
+
+rastreador: Optional[Rastreador] = None
+
+
+def configurar_rastreador(
+    caminho: str, taxa: float, lento_ms: float, max_bytes: int, backups: int, taxa_cauda: float = 1.0
+):
+    global rastreador
+    rastreador = Rastreador(ExportadorArquivo(caminho, max_bytes, backups), Amostragem(taxa, lento_ms, taxa_cauda))
+
+
+@contextmanager
+def span(nome: str, tipo: Optional[str] = None, **tags):
+    """
+    Abre um span filho do span atual (sem efeito fora de requisições rastreadas)
+
+    Example:
+        with span("brevo.enviar", tipo="CLIENT", destinatarios=10):
+            ...
+    """
+    pai = _pai_gravando()
+    if pai is None:
+        yield None
+        return
+    filho = Span(pai.trace, nome, parent_id=pai.span_id, tipo=tipo)
+    for chave, valor in tags.items():
+        filho.tag(chave, valor)
+    token = _span_atual.set(filho)
+    try:
+        yield filho
+    except Exception as e:
+        filho.tag("error", type(e).__name__)
+        raise
+    finally:
+        _span_atual.reset(token)
+        filho.finalizar()
+
+
+def rastreado(nome: str):
+    """Decorator: cada chamada da função vira um span"""
+    def decorator(funcao):
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            if _pai_gravando() is None:
+                return funcao(*args, **kwargs)
+            with span(nome):
+                return funcao(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def rastrear_engine(engine):
+    """
+    Um span por statement SQL executado no engine
+
+    O span é montado ao fim do statement a partir do início e da duração
+    medidos por tempos.ouvir_statements; se o statement falha, ele é
+    fechado do mesmo jeito, com a tag `error`.
+    """
+    sistema = engine.dialect.name
+
+    def _concluido(conn, statement, parametros, executemany, inicio, duracao, erro):
+        pai = _pai_gravando()
+        if pai is None:
+            return
+        filho = Span(pai.trace, f"db {statement.split(None, 1)[0].upper()}", parent_id=pai.span_id, tipo="CLIENT")
+        filho.inicio = inicio
+        filho._inicio_relogio -= duracao
+        filho.tag("db.system", sistema)
+        # Só o SQL com placeholders: os parâmetros podem conter dados pessoais
+        filho.tag("db.statement", statement[:1000])
+        if erro is not None:
+            filho.tag("error", type(erro).__name__)
+        filho.finalizar()
+
+    ouvir_statements(engine, _concluido)
+
+
+def rastrear_requests(hosts_propagacao: Iterable[str] = ()):
+    """
+    Um span por chamada HTTP feita com a biblioteca requests (ex.: Brevo)
+
+    O header traceparent só é enviado aos hosts de `hosts_propagacao`
+    (serviços internos que continuam o trace); APIs de terceiros recebem a
+    requisição sem ele.
+
+    Args:
+        hosts_propagacao: Hostnames que recebem o traceparent (vazio = nenhum)
+    """
+    import requests
+
+    if getattr(requests.Session.send, "_rastreado", False):
+        return
+    original = requests.Session.send
+    hosts = {host.strip().lower() for host in hosts_propagacao if host.strip()}
+
+    @wraps(original)
+    def send(self, request, **kwargs):
+        if _pai_gravando() is None:
+            return original(self, request, **kwargs)
+        url = request.url.split("?", 1)[0]
+        with span(f"http {request.method}", tipo="CLIENT", **{"http.method": request.method, "http.url": url}) as filho:
+            if (urlsplit(url).hostname or "") in hosts:
+                request.headers["traceparent"] = filho.traceparent
+            resposta = original(self, request, **kwargs)
+            filho.tag("http.status_code", resposta.status_code)
+            return resposta
+
+    send._rastreado = True
+    requests.Session.send = send
+
+
+def ativar_span(span_: Span):
+    """Define o span ativo do contexto (usado pelo middleware)"""
+    return _span_atual.set(span_)
+
+
+def desativar_span(token):
+    _span_atual.reset(token)
@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por item e tamanho máximo
+
+    Quando o limite é atingido o item usado há mais tempo é descartado (LRU),
+    então o consumo de memória fica limitado mesmo sob rajadas de chaves novas.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Quantidade máxima de itens
+            ttl: Tempo de vida padrão de cada item, em segundos
+        """
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        """Retorna o valor se existir e não tiver expirado"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return default
+            expira_em, valor = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                return default
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave: Hashable, valor: Any, ttl: Optional[float] = None):
+        """Armazena um valor com o TTL padrão ou um TTL específico"""
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maxsize:
+                self._itens.popitem(last=False)
+
+    def pop(self, chave: Hashable, default: Any = None) -> Any:
+        """Remove e retorna um valor (expirado ou não)"""
+        with self._lock:
+            item = self._itens.pop(chave, None)
+            return default if item is None else item[1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._itens)
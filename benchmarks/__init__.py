@@ -0,0 +1,51 @@
+"""
+Benchmarks da API
+
+Executar a partir da raiz do repositório, por exemplo:
+    python -m benchmarks.bench_email_templates
+
+As variáveis obrigatórias do Settings recebem valores locais caso não
+estejam definidas, para que os benchmarks rodem sem .env e sem rede.
+"""
+import os
+import tempfile
+
+# Banco descartável dos benchmarks (bench_endpoints recria as tabelas nele)
+BANCO_BENCHMARK = "sqlite:///" + os.path.join(tempfile.gettempdir(), "backbase_benchmark.db")
+
+_AMBIENTE_PADRAO = {
+    "ENVIRONMENT": "benchmark",
+    "DATABASE_URL": BANCO_BENCHMARK,
+    "SECRET_KEY": "benchmark-secret",
+    "JWT_SECRET_KEY": "benchmark-secret",
+    "BREVO_API_KEY": "",
+    "BREVO_SENDER_EMAIL": "noreply@backbase.com",
+    "BREVO_SENDER_NAME": "Eden Map",
+    "EMAIL_ENABLED": "false",
+    # Limites por IP altos e em memória: os benchmarks repetem a mesma rota
+    # centenas de vezes a partir do mesmo cliente
+    "RATE_LIMIT_STORAGE_URI": "memory://",
+    "RATE_LIMIT_LOGIN": "1000000/minute",
+    "RATE_LIMIT_CADASTRO": "1000000/minute",
+    "RATE_LIMIT_TEMKEY": "1000000/minute",
+    "RATE_LIMIT_LOGIN_CONTA": "1000000/minute",
+    "RATE_LIMIT_TEMPKEY_CONTA": "1000000/minute",
+    "TRACING_ENABLED": "false",
+    "SLOW_QUERY_MS": "0",
+    "LOG_LEVEL": "WARNING",
+}
+
+for _chave, _valor in _AMBIENTE_PADRAO.items():
+    os.environ.setdefault(_chave, _valor)
+
+
+def exigir_banco_benchmark(database_url: str, motivo: str):
+    """
+    Recusa (SystemExit) escrever num banco que não é o dos benchmarks
+
+    Args:
+        database_url: Banco que seria alterado
+        motivo: O que será feito nele, para a mensagem de erro
+    """
+    if database_url != BANCO_BENCHMARK:
+        raise SystemExit(f"{motivo}: use o banco dos benchmarks ({BANCO_BENCHMARK})")
@@ -0,0 +1,38 @@
+"""
+Benchmark de autenticação: bcrypt e JWT
+
+hash_password/verify_password dominam /login, /cadastro e /tempkey;
+create_access_token/verify_token rodam em toda rota autenticada.
+
+    python -m benchmarks.bench_auth
+"""
+from typing import Dict
+
+from . import utils
+from app.utils.jwt_auth import (
+    create_access_token,
+    create_user_token_data,
+    hash_password,
+    verify_password,
+    verify_token,
+)
+
+SENHA = "Senha123@"
+
+
+def executar(repeticoes: int = 2000, repeticoes_bcrypt: int = 10) -> Dict[str, dict]:
+    hash_senha = hash_password(SENHA)
+    dados = create_user_token_data(1, "usuario@teste.com", "usuario", "cliente", "mensal")
+    token = create_access_token(dados)
+
+    return {
+        "auth.hash_password": utils.medir(lambda: hash_password(SENHA), repeticoes_bcrypt, 1),
+        "auth.verify_password": utils.medir(lambda: verify_password(SENHA, hash_senha), repeticoes_bcrypt, 1),
+        "auth.create_access_token": utils.medir(lambda: create_access_token(dados), repeticoes),
+        "auth.verify_token": utils.medir(lambda: verify_token(token), repeticoes),
+    }
+
+
+if __name__ == "__main__":
+    for nome, resultado in executar().items():
+        utils.imprimir(nome, resultado)
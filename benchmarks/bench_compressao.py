@@ -0,0 +1,90 @@
+"""
+Benchmark da compressão de respostas
+
+Mede o custo de CPU de comprimir um payload no formato de /usuarios contra
+os bytes economizados, para cada nível de gzip e qualidade de brotli (se o
+pacote brotli estiver instalado).
+
+    python -m benchmarks.bench_compressao [--usuarios 2000]
+"""
+import argparse
+import zlib
+from datetime import datetime
+from typing import Dict
+
+import orjson
+
+from . import utils
+from app.middleware.compressao import brotli
+
+NIVEIS_GZIP = (1, 4, 6, 9)
+QUALIDADES_BROTLI = (1, 4, 6, 11)
+
+
+def gerar_payload(quantidade: int) -> bytes:
+    """JSON parecido com a resposta de /usuarios"""
+    agora = datetime.utcnow().isoformat()
+    return orjson.dumps([
+        {
+            "id": i,
+            "login": f"usuario_{i}",
+            "email": f"usuario{i}@teste.com",
+            "tag": "cliente",
+            "plan": "mensal",
+            "plan_date": agora,
+            "created_at": agora,
+            "desejo_nome": f"Desejo {i}",
+            "desejo_descricao": "Descrição do desejo do usuário na jornada",
+            "sentimentos_selecionados": [i % 7, (i * 3) % 11, (i * 5) % 13],
+            "caminho_selecionado": "caminho_" + str(i % 4),
+            "teste_resultados": {"ansiedade": i % 10, "foco": (i * 7) % 10, "energia": (i * 3) % 10},
+            "semana_atual": 1 + i % 12,
+            "dia_atual": 1 + i % 7,
+            "progresso_atualizado_em": agora,
+        }
+        for i in range(quantidade)
+    ])
+
+
+def _resultado(medicao: Dict[str, float], original: int, comprimido: int) -> Dict[str, float]:
+    return {
+        **medicao,
+        "bytes_original": original,
+        "bytes_comprimido": comprimido,
+        "economia_pct": round((1 - comprimido / original) * 100, 1),
+        "mb_por_s": round(original / (medicao["media_us"] / 1_000_000) / 1024 / 1024, 1),
+    }
+
+
+def executar(repeticoes: int = 30, usuarios: int = 2000) -> Dict[str, dict]:
+    payload = gerar_payload(usuarios)
+    resultados = {}
+
+    for nivel in NIVEIS_GZIP:
+        def comprimir_gzip(nivel=nivel):
+            compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+            return compressor.compress(payload) + compressor.flush()
+
+        tamanho = len(comprimir_gzip())
+        resultados[f"compressao.gzip_{nivel}"] = _resultado(utils.medir(comprimir_gzip, repeticoes, 3), len(payload), tamanho)
+
+    if brotli is not None:
+        for qualidade in QUALIDADES_BROTLI:
+            def comprimir_brotli(qualidade=qualidade):
+                return brotli.compress(payload, quality=qualidade)
+
+            tamanho = len(comprimir_brotli())
+            resultados[f"compressao.brotli_{qualidade}"] = _resultado(utils.medir(comprimir_brotli, repeticoes, 3), len(payload), tamanho)
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--usuarios", type=int, default=2000)
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli não instalado: medindo só gzip")
+    for nome, resultado in executar(usuarios=args.usuarios).items():
+        utils.imprimir(nome, resultado)
@@ -0,0 +1,46 @@
+"""
+Benchmark de renderização dos templates de email
+
+Compara o template pré-compilado (carregar_template) com a montagem do HTML
+a cada envio, que era o comportamento anterior.
+
+    python -m benchmarks.bench_email_templates
+"""
+from typing import Dict
+
+from . import utils
+from app.services.email_templates import _PLACEHOLDER, TEMPLATES_DIR, carregar_template
+
+VALORES_BOAS_VINDAS = {"login": "usuario_teste", "email": "usuario@teste.com", "plano_nome": "Mensal"}
+VALORES_TEMPKEY = {"login": "usuario_teste", "digito1": "1", "digito2": "2", "digito3": "3", "digito4": "4"}
+
+
+def _montar_sem_cache(nome: str, valores: dict) -> str:
+    """Monta o HTML do zero, como acontecia com as f-strings a cada chamada"""
+    fonte = (TEMPLATES_DIR / f"{nome}.html").read_text(encoding="utf-8")
+    return _PLACEHOLDER.sub(lambda m: str(valores[m.group(1)]), fonte)
+
+
+def executar(repeticoes: int = 2000) -> Dict[str, dict]:
+    boas_vindas = carregar_template("boas_vindas")
+    tempkey = carregar_template("tempkey")
+
+    return {
+        "email.boas_vindas.precompilado": utils.medir(
+            lambda: boas_vindas.render(**VALORES_BOAS_VINDAS), repeticoes
+        ),
+        "email.tempkey.precompilado": utils.medir(
+            lambda: tempkey.render(**VALORES_TEMPKEY), repeticoes
+        ),
+        "email.boas_vindas.sem_cache": utils.medir(
+            lambda: _montar_sem_cache("boas_vindas", VALORES_BOAS_VINDAS), repeticoes
+        ),
+        "email.tempkey.sem_cache": utils.medir(
+            lambda: _montar_sem_cache("tempkey", VALORES_TEMPKEY), repeticoes
+        ),
+    }
+
+
+if __name__ == "__main__":
+    for nome, resultado in executar().items():
+        utils.imprimir(nome, resultado)
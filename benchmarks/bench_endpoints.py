@@ -0,0 +1,112 @@
+"""
+Benchmark das endpoints pela aplicação completa (TestClient, em processo)
+
+Recria o banco SQLite dos benchmarks com `--usuarios` usuários
+(benchmarks.semear) e mede cada rota com todos os middlewares. Os tokens
+são gerados direto (sem /login) e alternados entre os usuários para não
+esbarrar no limite por plano.
+
+    python -m benchmarks.bench_endpoints [--usuarios 1000]
+"""
+import argparse
+import itertools
+from typing import Callable, Dict, List
+
+from . import exigir_banco_benchmark, utils
+from .semear import SENHA, semear
+from app.core.config import settings
+
+
+def _semear(total: int) -> List[dict]:
+    """Recria as tabelas e insere `total` usuários; retorna id/login/email/plan de cada um"""
+    from app.database import SessionLocal
+    from app.models.user import Usuario
+
+    exigir_banco_benchmark(settings.database_url, "bench_endpoints recria as tabelas")
+
+    semear(settings.database_url, total, recriar=True, prefixo="bench", seed=0, progresso_inicial=True)
+    with SessionLocal() as db:
+        return [
+            {"id": u.id, "login": u.login, "email": u.email, "plan": u.plan}
+            for u in db.query(Usuario.id, Usuario.login, Usuario.email, Usuario.plan).order_by(Usuario.id)
+        ]
+
+
+def _token(usuario: dict, tag: str = "cliente") -> Dict[str, str]:
+    from app.utils.jwt_auth import create_access_token, create_user_token_data
+
+    dados = create_user_token_data(usuario["id"], usuario["email"], usuario["login"], tag, usuario["plan"])
+    return {"Authorization": f"Bearer {create_access_token(dados)}"}
+
+
+def executar(repeticoes: int = 300, usuarios: int = 1000, repeticoes_bcrypt: int = 10) -> Dict[str, dict]:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    semeados = _semear(usuarios)
+    tokens = [_token(u) for u in semeados]
+    # Alterna usuários: cada um fica bem abaixo do limite por minuto do plano
+    proximo_token = itertools.cycle(tokens).__next__
+    proximo_usuario = itertools.cycle(semeados).__next__
+    admin = _token({"id": semeados[0]["id"], "email": "admin@teste.com", "login": "admin", "plan": "admin"}, "admin")
+    novos = itertools.count()
+
+    resultados = {}
+    with TestClient(app) as client:
+
+        def requisicao(metodo: str, caminho: str, esperado: int, **kwargs) -> Callable[[], None]:
+            def chamar():
+                extras = {chave: valor() if callable(valor) else valor for chave, valor in kwargs.items()}
+                resposta = client.request(metodo, caminho, **extras)
+                if resposta.status_code != esperado:
+                    raise RuntimeError(f"{metodo} {caminho}: status {resposta.status_code} (esperado {esperado}): {resposta.text[:200]}")
+            return chamar
+
+        def medir(nome: str, funcao: Callable[[], None], reps: int = repeticoes, aquecimento: int = 20):
+            resultados[f"endpoint.{nome}"] = utils.medir(funcao, reps, aquecimento)
+
+        # If-None-Match com o ETag atual de cada usuário, para medir o caminho do 304
+        condicionais = itertools.cycle([
+            {**token, "If-None-Match": client.get("/me", headers=token).headers["etag"]}
+            for token in tokens[:max(1, min(len(tokens), repeticoes))]
+        ]).__next__
+
+        medir("health_live", requisicao("GET", "/health/live", 200))
+        medir("health_ready", requisicao("GET", "/health/ready", 200))
+        medir("me", requisicao("GET", "/me", 200, headers=proximo_token))
+        medir("me_fields", requisicao("GET", "/me?fields=login,plan,expires", 200, headers=proximo_token))
+        medir("me_304", requisicao("GET", "/me", 304, headers=condicionais))
+        medir("me_progresso", requisicao("GET", "/me/progresso", 200, headers=proximo_token))
+        medir("me_progresso_put", requisicao("PUT", "/me/progresso", 200, headers=proximo_token, json={"semana_atual": 2, "dia_atual": 3}))
+        medir("me_progresso_avancar", requisicao("POST", "/me/progresso/avancar", 200, headers=proximo_token))
+        medir("me_starting_put", requisicao("PUT", "/me/starting", 200, headers=proximo_token, json={
+            "desejo_nome": "Viajar", "sentimentos_selecionados": [1, 3, 5], "caminho_selecionado": "Motivação",
+        }))
+        medir("batch_3_operacoes", requisicao("POST", "/batch", 200, headers=proximo_token, json={"operacoes": [
+            {"metodo": "GET", "caminho": "/me"},
+            {"metodo": "PUT", "caminho": "/me/progresso", "corpo": {"dia_atual": 4}},
+            {"metodo": "GET", "caminho": "/me/progresso"},
+        ]}))
+        medir("usuarios", requisicao("GET", "/usuarios", 200, headers=admin), max(10, repeticoes // 10), 3)
+        medir("usuarios_fields", requisicao("GET", "/usuarios?fields=id,login", 200, headers=admin), max(10, repeticoes // 10), 3)
+
+        # Rotas com bcrypt: poucas repetições
+        medir("login", requisicao("POST", "/login", 200, json=lambda: {"email_ou_login": proximo_usuario()["login"], "senha": SENHA}),
+              repeticoes_bcrypt, 1)
+        medir("cadastro", requisicao("POST", "/cadastro", 200, json=lambda: {
+            "login": f"novo_{next(novos)}", "senha": SENHA, "email": f"novo_{next(novos)}@teste.com",
+        }), repeticoes_bcrypt, 1)
+        medir("tempkey_codigo", requisicao("POST", "/tempkey", 200, json=lambda: {"email_ou_login": proximo_usuario()["login"]}),
+              repeticoes_bcrypt, 1)
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--usuarios", type=int, default=1000)
+    args = parser.parse_args()
+
+    for nome, resultado in executar(usuarios=args.usuarios).items():
+        utils.imprimir(nome, resultado)
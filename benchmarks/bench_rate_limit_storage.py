@@ -0,0 +1,83 @@
+"""
+Benchmark do storage de rate limit
+
+Mede o custo por requisição de um hit no limiter (memory:// x sqlite://) e
+verifica a contagem com N processos disputando a mesma chave.
+
+    python -m benchmarks.bench_rate_limit_storage [--workers 4] [--hits 500]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+from typing import Dict
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from . import utils
+from app.utils import rate_limit_storage  # noqa: F401 - registra sqlite://
+
+
+def _uri_temporaria() -> str:
+    caminho = os.path.join(tempfile.mkdtemp(prefix="bench_rl_"), "ratelimit.db")
+    return f"sqlite:///{caminho}"
+
+
+def _martelar(uri: str, hits: int, fila):
+    """Processo filho: faz `hits` hits na mesma chave e informa quantos passaram"""
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    limite = parse("1000000/hour")
+    aceitos = sum(1 for _ in range(hits) if limiter.hit(limite, "compartilhada"))
+    fila.put(aceitos)
+
+
+def verificar_workers(workers: int, hits: int) -> Dict[str, int]:
+    """Roda `workers` processos em paralelo e confere o contador final"""
+    uri = _uri_temporaria()
+    storage_from_string(uri)  # cria a tabela antes dos filhos
+
+    fila = multiprocessing.Queue()
+    processos = [multiprocessing.Process(target=_martelar, args=(uri, hits, fila)) for _ in range(workers)]
+    for processo in processos:
+        processo.start()
+    aceitos = sum(fila.get() for _ in processos)
+    for processo in processos:
+        processo.join()
+
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    contador = limiter.get_window_stats(parse("1000000/hour"), "compartilhada").remaining
+    return {
+        "workers": workers,
+        "hits_esperados": workers * hits,
+        "hits_aceitos": aceitos,
+        "contador_final": 1000000 - contador,
+    }
+
+
+def executar(repeticoes: int = 5000) -> Dict[str, dict]:
+    limite = parse("1000000/minute")
+    resultados = {}
+    for nome, uri in (("memory", "memory://"), ("sqlite", _uri_temporaria())):
+        limiter = FixedWindowRateLimiter(storage_from_string(uri))
+        resultados[f"rate_limit.hit.{nome}"] = utils.medir(
+            lambda: limiter.hit(limite, "127.0.0.1", "/login"), repeticoes
+        )
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--hits", type=int, default=500)
+    args = parser.parse_args()
+
+    for nome, resultado in executar().items():
+        utils.imprimir(nome, resultado)
+
+    verificacao = verificar_workers(args.workers, args.hits)
+    utils.imprimir("rate_limit.sqlite.multiprocesso", verificacao)
+    if verificacao["contador_final"] != verificacao["hits_esperados"]:
+        raise SystemExit("❌ Contador divergente entre workers")
+    print("✅ Contador consistente entre workers")
@@ -0,0 +1,99 @@
+"""
+Benchmark da serialização das respostas
+
+Compara, para /me e /usuarios, o caminho antigo (dict montado à mão +
+jsonable_encoder + JSONResponse) com o atual (response model construído do
+objeto ORM + ORJSONResponse), sem banco e sem rede.
+
+    python -m benchmarks.bench_serializacao
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from . import utils
+from app.models.user import Usuario
+from app.schemas.schemas import MeResponse, UsuarioResponse
+from app.utils.plans import calcular_dias_restantes, obter_duracao_plano
+
+
+def _usuario(indice: int) -> Usuario:
+    agora = datetime.utcnow()
+    return Usuario(
+        id=indice,
+        login=f"usuario_{indice}",
+        senha="hash",
+        email=f"usuario{indice}@teste.com",
+        tag="cliente",
+        plan="mensal",
+        plan_date=agora - timedelta(days=indice % 30),
+        created_at=agora,
+        desejo_nome="Desejo",
+        desejo_descricao="Descrição do desejo",
+        sentimentos_selecionados=[1, 4, 7],
+        caminho_selecionado="caminho",
+        teste_resultados={"a": 3, "b": 5},
+        semana_atual=2,
+        dia_atual=4,
+        progresso_atualizado_em=agora,
+    )
+
+
+def _me_antigo(usuario: Usuario) -> bytes:
+    conteudo = {
+        "id": usuario.id,
+        "login": usuario.login,
+        "email": usuario.email,
+        "tag": usuario.tag,
+        "plan": usuario.plan,
+        "plan_date": usuario.plan_date.isoformat() if usuario.plan_date else None,
+        "created_at": usuario.created_at.isoformat() if usuario.created_at else None,
+        "token_duration": obter_duracao_plano(usuario),
+        "expires": calcular_dias_restantes(usuario),
+        "desejo_nome": usuario.desejo_nome,
+        "desejo_descricao": usuario.desejo_descricao,
+        "sentimentos_selecionados": usuario.sentimentos_selecionados,
+        "caminho_selecionado": usuario.caminho_selecionado,
+        "teste_resultados": usuario.teste_resultados,
+        "semana_atual": usuario.semana_atual or 1,
+        "dia_atual": usuario.dia_atual or 1,
+        "progresso_atualizado_em": usuario.progresso_atualizado_em.isoformat() if usuario.progresso_atualizado_em else None,
+    }
+    return JSONResponse(jsonable_encoder(conteudo)).body
+
+
+def _me_atual(usuario: Usuario) -> bytes:
+    conteudo = MeResponse.model_validate(usuario).model_dump(mode="json")
+    return ORJSONResponse(conteudo).body
+
+
+_LISTA = TypeAdapter(List[UsuarioResponse])
+
+
+def _usuarios_antigo(usuarios: List[Usuario]) -> bytes:
+    conteudo = _LISTA.dump_python(_LISTA.validate_python(usuarios, from_attributes=True))
+    return JSONResponse(jsonable_encoder(conteudo)).body
+
+
+def _usuarios_atual(usuarios: List[Usuario]) -> bytes:
+    conteudo = _LISTA.dump_python(_LISTA.validate_python(usuarios, from_attributes=True), mode="json")
+    return ORJSONResponse(conteudo).body
+
+
+def executar(repeticoes: int = 2000) -> Dict[str, dict]:
+    usuario = _usuario(1)
+    usuarios = [_usuario(i) for i in range(200)]
+    return {
+        "serializacao.me_dict_json": utils.medir(lambda: _me_antigo(usuario), repeticoes),
+        "serializacao.me_modelo_orjson": utils.medir(lambda: _me_atual(usuario), repeticoes),
+        "serializacao.usuarios200_json": utils.medir(lambda: _usuarios_antigo(usuarios), repeticoes // 10),
+        "serializacao.usuarios200_orjson": utils.medir(lambda: _usuarios_atual(usuarios), repeticoes // 10),
+    }
+
+
+if __name__ == "__main__":
+    for nome, resultado in executar().items():
+        utils.imprimir(nome, resultado)
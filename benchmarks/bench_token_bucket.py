@@ -0,0 +1,65 @@
+"""
+Benchmark do TokenBucketLimiter
+
+Mede memória e latência por verificação com muitas chaves distintas
+(ex.: varredura vinda de uma faixa grande de IPs), com chaves compostas
+IP + conta como as usadas em /login e /tempkey.
+
+    python -m benchmarks.bench_token_bucket [--chaves 1000000]
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Dict
+
+from . import utils
+from app.utils.token_bucket import TokenBucketLimiter
+
+
+def _chave(indice: int) -> str:
+    return f"10.{(indice >> 16) & 255}.{(indice >> 8) & 255}.{indice & 255}|usuario{indice % 5000}@teste.com"
+
+
+def medir_chaves(total: int, max_chaves: int) -> Dict[str, float]:
+    """Insere `total` chaves distintas e mede memória retida e tempo médio por verificação"""
+    chaves = [_chave(i) for i in range(total)]
+
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    limiter = TokenBucketLimiter("5/minute", max_chaves=max_chaves)
+    inicio = time.perf_counter()
+    for chave in chaves:
+        limiter.consumir(chave)
+    duracao = time.perf_counter() - inicio
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    retidas = len(limiter)
+    return {
+        "chaves_distintas": total,
+        "max_chaves": max_chaves,
+        "chaves_retidas": retidas,
+        "memoria_mib": round((atual - base) / 1024 / 1024, 1),
+        # Memória do limiter por chave (sem contar a string da chave, que é do chamador)
+        "bytes_por_chave": round((atual - base) / max(retidas, 1), 1),
+        "media_us": round(duracao / total * 1_000_000, 3),
+    }
+
+
+def executar(repeticoes: int = 20000, chaves: int = 200_000) -> Dict[str, dict]:
+    limiter = TokenBucketLimiter("1000000/minute", max_chaves=100_000)
+    return {
+        "token_bucket.mesma_chave": utils.medir(lambda: limiter.consumir("127.0.0.1|usuario"), repeticoes),
+        "token_bucket.chaves_distintas": medir_chaves(chaves, max_chaves=100_000),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chaves", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    limiter = TokenBucketLimiter("1000000/minute", max_chaves=100_000)
+    utils.imprimir("token_bucket.mesma_chave", utils.medir(lambda: limiter.consumir("127.0.0.1|usuario"), 20000))
+    utils.imprimir("token_bucket.limitado_100k", medir_chaves(args.chaves, max_chaves=100_000))
+    utils.imprimir("token_bucket.sem_limite", medir_chaves(args.chaves, max_chaves=args.chaves))
@@ -0,0 +1,35 @@
+"""
+Benchmark da validação dos schemas de entrada
+
+Mede a validação (pydantic + validators do projeto) dos corpos de /login,
+/cadastro e /me/starting.
+
+    python -m benchmarks.bench_validacao
+"""
+from typing import Dict
+
+from . import utils
+from app.schemas.schemas import LoginRequest, StartingDataUpdate, UsuarioCreate
+
+LOGIN = {"email_ou_login": "  Usuario@Teste.com ", "senha": "Senha123@"}
+CADASTRO = {"login": "usuario_teste", "senha": "Senha123@", "email": "usuario@teste.com", "plan": "mensal"}
+STARTING = {
+    "desejo_nome": "Viajar",
+    "desejo_descricao": "Conhecer o litoral do nordeste com a família",
+    "sentimentos_selecionados": [1, 3, 5],
+    "caminho_selecionado": "Motivação",
+    "teste_resultados": {"ansiedade": 40.0, "autoimagem": 35.0, "motivacao": 25.0},
+}
+
+
+def executar(repeticoes: int = 5000) -> Dict[str, dict]:
+    return {
+        "validacao.login_request": utils.medir(lambda: LoginRequest.model_validate(LOGIN), repeticoes),
+        "validacao.usuario_create": utils.medir(lambda: UsuarioCreate.model_validate(CADASTRO), repeticoes),
+        "validacao.starting_data_update": utils.medir(lambda: StartingDataUpdate.model_validate(STARTING), repeticoes),
+    }
+
+
+if __name__ == "__main__":
+    for nome, resultado in executar().items():
+        utils.imprimir(nome, resultado)
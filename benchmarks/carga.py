@@ -0,0 +1,326 @@
+"""
+Teste de carga contra um servidor local (httpx assíncrono)
+
+Sobe `run.py` em uma porta livre sobre o banco SQLite dos benchmarks, com
+`--usuarios` usuários semeados e o Brevo substituído por um servidor HTTP
+local (roda sem rede), e dispara um cenário com `--concorrencia` usuários
+virtuais durante `--duracao` segundos.
+
+Cenários:
+    login      login storm: POST /login em sequência (bcrypt)
+    cadastro   signup burst: POST /cadastro com logins novos (+ email de boas-vindas)
+    progresso  polling do app: GET /me/progresso
+    avancar    toques em "avançar dia": POST /me/progresso/avancar
+    admin      listagem do painel: GET /usuarios (completo e com fields=)
+    misto      mistura ponderada dos anteriores (tráfego típico do app)
+
+Os tokens iniciais são gerados direto (sem bcrypt); com `--reuso-token N`
+cada usuário virtual faz um /login real a cada N requisições autenticadas.
+Os limites por IP ficam altos, mas os limites por plano (USER_RATE_LIMITS)
+continuam valendo: 429 nos resultados é o servidor aplicando o plano.
+
+    python -m benchmarks.carga --cenario misto --concorrencia 50 --rampa 10 --duracao 60
+    python -m benchmarks.carga --cenario progresso --workers 4 --salvar reports/carga.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from . import utils
+from .bench_endpoints import SENHA, _semear, _token
+
+# Pesos do cenário "misto" (proporção de iterações de cada cenário)
+PESOS_MISTO = {
+    "progresso": 60,
+    "avancar": 20,
+    "login": 10,
+    "cadastro": 5,
+    "admin": 5,
+}
+
+
+class Estatisticas:
+    """Latências e erros por operação"""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.erros: Dict[str, Counter] = defaultdict(Counter)
+        self.inicio = time.perf_counter()
+        self.fim: Optional[float] = None
+
+    def registrar(self, operacao: str, segundos: float, erro: Optional[str] = None):
+        self.latencias[operacao].append(segundos)
+        if erro is not None:
+            self.erros[operacao][erro] += 1
+
+    def relatorio(self) -> Dict[str, dict]:
+        duracao = (self.fim or time.perf_counter()) - self.inicio
+
+        def resumo(latencias: List[float], erros: Counter) -> dict:
+            ordenadas = sorted(latencias)
+
+            def percentil(p: float) -> float:
+                return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] * 1000, 2)
+
+            return {
+                "requisicoes": len(ordenadas),
+                "erros": sum(erros.values()),
+                "rps": round(len(ordenadas) / duracao, 1),
+                "p50_ms": percentil(0.50),
+                "p95_ms": percentil(0.95),
+                "p99_ms": percentil(0.99),
+                "max_ms": round(ordenadas[-1] * 1000, 2),
+                "erros_por_tipo": dict(erros.most_common()),
+            }
+
+        operacoes = {
+            operacao: resumo(latencias, self.erros[operacao])
+            for operacao, latencias in sorted(self.latencias.items())
+        }
+        todas = [latencia for latencias in self.latencias.values() for latencia in latencias]
+        todos_erros = sum((self.erros[operacao] for operacao in self.latencias), Counter())
+        return {
+            "duracao_s": round(duracao, 1),
+            "total": resumo(todas, todos_erros) if todas else None,
+            "operacoes": operacoes,
+        }
+
+
+class UsuarioVirtual:
+    """Um cliente do app: usuário semeado, token atual e contagem de reuso"""
+
+    def __init__(self, cliente: httpx.AsyncClient, estatisticas: Estatisticas, usuario: dict, reuso_token: int):
+        self.cliente = cliente
+        self.estatisticas = estatisticas
+        self.usuario = usuario
+        self.reuso_token = reuso_token
+        self.headers = _token(usuario)
+        self.usos_token = 0
+
+    async def requisicao(self, operacao: str, metodo: str, caminho: str, esperados=(200,), **kwargs) -> Optional[httpx.Response]:
+        """Executa e registra uma requisição; status fora de `esperados` conta como erro"""
+        inicio = time.perf_counter()
+        try:
+            resposta = await self.cliente.request(metodo, caminho, **kwargs)
+        except httpx.HTTPError as e:
+            self.estatisticas.registrar(operacao, time.perf_counter() - inicio, type(e).__name__)
+            return None
+        erro = None if resposta.status_code in esperados else str(resposta.status_code)
+        self.estatisticas.registrar(operacao, time.perf_counter() - inicio, erro)
+        return resposta
+
+    async def login(self, usuario: dict) -> Optional[str]:
+        resposta = await self.requisicao("login", "POST", "/login", json={"email_ou_login": usuario["login"], "senha": SENHA})
+        if resposta is None or resposta.status_code != 200:
+            return None
+        return resposta.json()["access_token"]
+
+    async def autenticado(self) -> Dict[str, str]:
+        """Headers com token, renovado por /login a cada `reuso_token` usos"""
+        if self.reuso_token and self.usos_token >= self.reuso_token:
+            token = await self.login(self.usuario)
+            if token is not None:
+                self.headers = {"Authorization": f"Bearer {token}"}
+            self.usos_token = 0
+        self.usos_token += 1
+        return self.headers
+
+
+def criar_cenarios(semeados: List[dict], admin: Dict[str, str]) -> Dict[str, Callable[[UsuarioVirtual], Awaitable[None]]]:
+    """Cenários por nome; cada chamada é uma iteração de um usuário virtual"""
+    proximo_usuario = itertools.cycle(semeados).__next__
+    novos = itertools.count()
+    prefixo = f"carga{int(time.time())}"
+
+    async def login(vu: UsuarioVirtual):
+        await vu.login(proximo_usuario())
+
+    async def cadastro(vu: UsuarioVirtual):
+        numero = next(novos)
+        await vu.requisicao("cadastro", "POST", "/cadastro", json={
+            "login": f"{prefixo}_{numero}", "senha": SENHA, "email": f"{prefixo}_{numero}@teste.com",
+        })
+
+    async def progresso(vu: UsuarioVirtual):
+        await vu.requisicao("progresso", "GET", "/me/progresso", headers=await vu.autenticado())
+
+    async def avancar(vu: UsuarioVirtual):
+        await vu.requisicao("avancar", "POST", "/me/progresso/avancar", headers=await vu.autenticado())
+
+    async def listar(vu: UsuarioVirtual):
+        if random.random() < 0.5:
+            await vu.requisicao("admin", "GET", "/usuarios", headers=admin)
+        else:
+            await vu.requisicao("admin_fields", "GET", "/usuarios?fields=id,login,plan", headers=admin)
+
+    cenarios = {"login": login, "cadastro": cadastro, "progresso": progresso, "avancar": avancar, "admin": listar}
+    nomes, pesos = zip(*PESOS_MISTO.items())
+
+    async def misto(vu: UsuarioVirtual):
+        await cenarios[random.choices(nomes, pesos)[0]](vu)
+
+    cenarios["misto"] = misto
+    return cenarios
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def iniciar_servidor(workers: int, porta_brevo: int, log: str) -> subprocess.Popen:
+    """Sobe run.py em 127.0.0.1 numa porta livre (porta em `processo.porta`)"""
+    porta = _porta_livre()
+    ambiente = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(porta),
+        "WEB_CONCURRENCY": str(workers),
+        "PROMETHEUS_MULTIPROC_DIR": tempfile.mkdtemp(prefix="backbase_carga_metricas_"),
+        "BREVO_API_KEY": "carga",
+        "BREVO_BASE_URL": f"http://127.0.0.1:{porta_brevo}",
+        "EMAIL_ENABLED": "true",
+    }
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(log, "wb") as saida:
+        processo = subprocess.Popen(
+            [sys.executable, "run.py"], cwd=raiz, env=ambiente, stdout=saida, stderr=subprocess.STDOUT,
+        )
+    processo.porta = porta
+    return processo
+
+
+async def aguardar_servidor(processo: subprocess.Popen, log: str, timeout: float = 60.0):
+    url = f"http://127.0.0.1:{processo.porta}/health/live"
+    limite = time.monotonic() + timeout
+    async with httpx.AsyncClient() as cliente:
+        while time.monotonic() < limite:
+            if processo.poll() is not None:
+                raise SystemExit(f"O servidor terminou com código {processo.returncode}; veja {log}")
+            try:
+                if (await cliente.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"O servidor não respondeu em {timeout:.0f}s; veja {log}")
+
+
+async def executar_carga(
+    base_url: str,
+    cenario: str,
+    semeados: List[dict],
+    concorrencia: int = 20,
+    rampa: float = 5.0,
+    duracao: float = 30.0,
+    pensar_ms: float = 0.0,
+    reuso_token: int = 0,
+) -> Dict[str, dict]:
+    """
+    Executa o cenário com `concorrencia` usuários virtuais
+
+    Args:
+        base_url: Endereço do servidor
+        cenario: Nome do cenário (ver criar_cenarios)
+        semeados: Usuários existentes no banco (id/login/email/plan)
+        concorrencia: Usuários virtuais simultâneos
+        rampa: Segundos para iniciar todos os usuários virtuais (início escalonado)
+        duracao: Segundos de execução, contando a rampa
+        pensar_ms: Pausa média entre iterações de um usuário (exponencial; 0 = sem pausa)
+        reuso_token: Requisições por token antes de um novo /login (0 = nunca)
+
+    Returns:
+        Relatório de Estatisticas
+    """
+    estatisticas = Estatisticas()
+    admin = _token({"id": semeados[0]["id"], "email": "admin@teste.com", "login": "admin", "plan": "admin"}, "admin")
+    iteracao = criar_cenarios(semeados, admin)[cenario]
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=30.0) as cliente:
+        fim = time.monotonic() + duracao
+
+        async def usuario_virtual(indice: int):
+            await asyncio.sleep(rampa * indice / concorrencia)
+            vu = UsuarioVirtual(cliente, estatisticas, semeados[indice % len(semeados)], reuso_token)
+            while time.monotonic() < fim:
+                await iteracao(vu)
+                if pensar_ms:
+                    await asyncio.sleep(random.expovariate(1000 / pensar_ms))
+
+        await asyncio.gather(*(usuario_virtual(i) for i in range(concorrencia)))
+
+    estatisticas.fim = time.perf_counter()
+    return estatisticas.relatorio()
+
+
+def imprimir(relatorio: Dict[str, dict]):
+    print(f"\nDuração: {relatorio['duracao_s']}s")
+    linhas = list(relatorio["operacoes"].items())
+    if relatorio["total"]:
+        linhas.append(("TOTAL", relatorio["total"]))
+    for operacao, item in linhas:
+        print(
+            f"{operacao:<14} req={item['requisicoes']:<7} rps={item['rps']:<8} p50={item['p50_ms']}ms "
+            f"p95={item['p95_ms']}ms p99={item['p99_ms']}ms max={item['max_ms']}ms erros={item['erros']}"
+        )
+        for tipo, quantidade in item["erros_por_tipo"].items():
+            print(f"{'':<14}   {tipo}: {quantidade}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga contra um servidor local")
+    parser.add_argument("--cenario", default="misto", choices=["login", "cadastro", "progresso", "avancar", "admin", "misto"])
+    parser.add_argument("--concorrencia", type=int, default=20)
+    parser.add_argument("--rampa", type=float, default=5.0, help="Segundos para iniciar todos os usuários virtuais")
+    parser.add_argument("--duracao", type=float, default=30.0, help="Segundos de teste, contando a rampa")
+    parser.add_argument("--pensar-ms", type=float, default=0.0, help="Pausa média entre iterações de um usuário")
+    parser.add_argument("--reuso-token", type=int, default=0, help="Requisições por token antes de novo /login (0 = sempre o mesmo)")
+    parser.add_argument("--usuarios", type=int, default=1000, help="Usuários semeados no banco")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do servidor (WEB_CONCURRENCY)")
+    parser.add_argument("--salvar", help="Arquivo JSON para o relatório")
+    args = parser.parse_args()
+
+    semeados = _semear(args.usuarios)
+    brevo = utils.iniciar_brevo_local()
+    log = os.path.join(tempfile.gettempdir(), "backbase_carga_servidor.log")
+    processo = iniciar_servidor(args.workers, brevo.server_port, log)
+    try:
+        asyncio.run(aguardar_servidor(processo, log))
+        print(f"Servidor em 127.0.0.1:{processo.porta} ({args.workers} worker(s)); log em {log}")
+        relatorio = asyncio.run(executar_carga(
+            f"http://127.0.0.1:{processo.porta}", args.cenario, semeados, args.concorrencia,
+            args.rampa, args.duracao, args.pensar_ms, args.reuso_token,
+        ))
+    finally:
+        processo.terminate()
+        try:
+            processo.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+        brevo.shutdown()
+
+    imprimir(relatorio)
+    if args.salvar:
+        diretorio = os.path.dirname(args.salvar)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump({"parametros": vars(args), **relatorio}, arquivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Executa a suíte de benchmarks, salva o resultado em JSON e compara com uma baseline
+
+    python -m benchmarks.executar --salvar reports/benchmark.json
+    python -m benchmarks.executar --comparar benchmarks/baseline.json --tolerancia 0.25
+    python -m benchmarks.executar --apenas auth,endpoints
+
+No modo de comparação, um benchmark é regressão quando o p50 atual passa
+do p50 da baseline em mais que `--tolerancia` (fração); nesse caso o
+processo termina com exit 1. Medições com p50 menor que `--minimo-us` são
+ignoradas na comparação: nessa escala o ruído da máquina domina.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from . import utils
+
+# Módulo de benchmarks.<nome> por nome curto, na ordem de execução
+MODULOS = {
+    "auth": "bench_auth",
+    "validacao": "bench_validacao",
+    "email_templates": "bench_email_templates",
+    "serializacao": "bench_serializacao",
+    "compressao": "bench_compressao",
+    "token_bucket": "bench_token_bucket",
+    "rate_limit_storage": "bench_rate_limit_storage",
+    "endpoints": "bench_endpoints",
+}
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def executar(nomes: List[str]) -> Dict[str, dict]:
+    """
+    Executa os módulos escolhidos
+
+    Args:
+        nomes: Nomes curtos (chaves de MODULOS)
+
+    Returns:
+        Metadados da execução e os resultados de utils.medir() por benchmark
+    """
+    inicio = time.perf_counter()
+    resultados = {}
+    for nome in nomes:
+        modulo = importlib.import_module(f"benchmarks.{MODULOS[nome]}")
+        print(f"# {nome}", file=sys.stderr)
+        for chave, resultado in modulo.executar().items():
+            utils.imprimir(chave, resultado)
+            resultados[chave] = resultado
+
+    return {
+        "metadados": {
+            "data": datetime.utcnow().isoformat(),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "modulos": nomes,
+            "duracao_s": round(time.perf_counter() - inicio, 1),
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(atual: Dict[str, dict], baseline: Dict[str, dict], tolerancia: float, minimo_us: float) -> List[str]:
+    """
+    Compara o p50 de cada benchmark presente nas duas execuções
+
+    Returns:
+        Descrição das regressões (lista vazia = nenhuma)
+    """
+    regressoes = []
+    for chave, resultado in atual["resultados"].items():
+        anterior = baseline["resultados"].get(chave)
+        if anterior is None:
+            continue
+        p50, p50_anterior = resultado["p50_us"], anterior["p50_us"]
+        variacao = p50 / p50_anterior - 1 if p50_anterior else 0.0
+        marcador = ""
+        if max(p50, p50_anterior) >= minimo_us and variacao > tolerancia:
+            marcador = "  <-- regressão"
+            regressoes.append(f"{chave}: p50 {p50_anterior}us -> {p50}us ({variacao:+.0%})")
+        print(f"{chave:<40} {p50_anterior:>12} -> {p50:>12} us  {variacao:+7.1%}{marcador}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks da API")
+    parser.add_argument("--apenas", help=f"Módulos separados por vírgula ({', '.join(MODULOS)})")
+    parser.add_argument("--salvar", help="Arquivo JSON onde gravar o resultado (ex.: baseline)")
+    parser.add_argument("--comparar", help="Baseline JSON para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Aumento de p50 aceito (fração; padrão 0.25)")
+    parser.add_argument("--minimo-us", type=float, default=5.0, help="p50 abaixo disso não entra na comparação")
+    args = parser.parse_args()
+
+    nomes = list(MODULOS)
+    if args.apenas:
+        nomes = [nome.strip() for nome in args.apenas.split(",") if nome.strip()]
+        desconhecidos = [nome for nome in nomes if nome not in MODULOS]
+        if desconhecidos:
+            parser.error(f"módulos desconhecidos: {', '.join(desconhecidos)}")
+
+    atual = executar(nomes)
+
+    if args.salvar:
+        diretorio = os.path.dirname(args.salvar)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResultado salvo em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            baseline = json.load(arquivo)
+        metadados = baseline.get("metadados", {})
+        print(f"\nComparando com {args.comparar} (commit {metadados.get('commit')}, python {metadados.get('python')})")
+        regressoes = comparar(atual, baseline, args.tolerancia, args.minimo_us)
+        if regressoes:
+            print(f"\nRegressões acima de {args.tolerancia:.0%}:")
+            for regressao in regressoes:
+                print(f"  - {regressao}")
+            sys.exit(1)
+        print("\nNenhuma regressão.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Verificação do orçamento de consultas SQL por rota
+
+Executa cada endpoint da API em processo (TestClient) sobre um banco SQLite
+novo e conta os statements de cada requisição. Falha (exit 1) quando uma
+rota passa do valor declarado em ORCAMENTO_CONSULTAS
+(app/core/constants.py) ou quando uma rota não tem orçamento declarado.
+
+O Brevo é substituído por um servidor HTTP local, então roda sem rede.
+
+    python -m benchmarks.orcamento_consultas
+"""
+import os
+import sys
+import tempfile
+from http.server import HTTPServer
+from typing import Dict, List, Tuple
+
+from . import utils
+
+_BANCO = os.path.join(tempfile.gettempdir(), "backbase_orcamento_consultas.db")
+
+
+def _preparar_ambiente() -> HTTPServer:
+    """Banco novo, Brevo local e recursos que não afetam a contagem desligados"""
+    servidor = utils.iniciar_brevo_local()
+
+    for sufixo in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(_BANCO + sufixo):
+            os.remove(_BANCO + sufixo)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{_BANCO}",
+        "RATE_LIMIT_STORAGE_URI": "memory://",
+        "BREVO_API_KEY": "orcamento-consultas",
+        "BREVO_BASE_URL": f"http://127.0.0.1:{servidor.server_port}",
+        "EMAIL_ENABLED": "true",
+        "EMAIL_BATCH_RATE_PER_SECOND": "0",
+        "TRACING_ENABLED": "false",
+        "SLOW_QUERY_MS": "0",
+        "LOG_LEVEL": "ERROR",
+    })
+    return servidor
+
+
+def executar() -> Dict[str, dict]:
+    """Prepara o ambiente isolado e executa medir_rotas()"""
+    servidor = _preparar_ambiente()
+    try:
+        return medir_rotas()
+    finally:
+        servidor.shutdown()
+
+
+def medir_rotas() -> Dict[str, dict]:
+    """
+    Executa os cenários na aplicação já configurada (banco novo, Brevo
+    local) e retorna, por rota ("MÉTODO /template"), o máximo de statements
+    observado, o orçamento declarado e os status HTTP recebidos
+    """
+    from fastapi.routing import APIRoute
+    from fastapi.testclient import TestClient
+
+    from app.core.constants import ORCAMENTO_CONSULTAS
+    from app.database import SessionLocal
+    from app.database.connection import engine
+    from app.main import app, tempkeys_pendentes
+    from app.models.user import Usuario
+    from app.utils.jwt_auth import hash_password
+    from app.utils.orcamento_consultas import contar_consultas
+
+    medidas: Dict[str, Tuple[int, List[int]]] = {}
+
+    with TestClient(app) as client, contar_consultas(engine) as contador:
+
+        def chamar(metodo: str, rota: str, caminho: str = None, **kwargs):
+            contador.zerar()
+            resposta = client.request(metodo, caminho or rota, **kwargs)
+            chave = f"{metodo} {rota}"
+            maximo, status = medidas.get(chave, (0, []))
+            medidas[chave] = (max(maximo, contador.total), status + [resposta.status_code])
+            return resposta
+
+        def autenticar(email_ou_login: str, senha: str) -> Dict[str, str]:
+            resposta = chamar("POST", "/login", json={"email_ou_login": email_ou_login, "senha": senha})
+            return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+        for rota in ("/", "/health", "/health/live", "/health/ready", "/metrics"):
+            chamar("GET", rota)
+
+        # Usuário comum
+        chamar("POST", "/cadastro", json={"login": "orcamento", "senha": "Senha123@", "email": "orcamento@teste.com"})
+        usuario = autenticar("orcamento", "Senha123@")
+        etag_me = chamar("GET", "/me", headers=usuario).headers["etag"]
+        etag_campos = chamar("GET", "/me", caminho="/me?fields=login,expires", headers=usuario).headers["etag"]
+        # Requisições condicionais: ETag atual (304) e desatualizado (resposta completa)
+        chamar("GET", "/me", headers={**usuario, "If-None-Match": etag_me})
+        chamar("GET", "/me", caminho="/me?fields=login,expires", headers={**usuario, "If-None-Match": etag_campos})
+        chamar("PUT", "/me/starting", json={"desejo_nome": "Desejo", "sentimentos_selecionados": [1, 2, 3]}, headers=usuario)
+        chamar("GET", "/me", headers={**usuario, "If-None-Match": etag_me})
+        chamar("GET", "/me", caminho="/me?fields=login,expires", headers={**usuario, "If-None-Match": 'W/"desatualizado"'})
+        etag_progresso = chamar("GET", "/me/progresso", headers=usuario).headers["etag"]
+        chamar("GET", "/me/progresso", headers={**usuario, "If-None-Match": etag_progresso})
+        chamar("PUT", "/me/progresso", json={"semana_atual": 1, "dia_atual": 2}, headers=usuario)
+        chamar("POST", "/me/progresso/avancar", headers=usuario)
+        chamar("GET", "/me/progresso", headers={**usuario, "If-None-Match": etag_progresso})
+        chamar("POST", "/batch", headers=usuario, json={"operacoes": [
+            {"metodo": "GET", "caminho": "/me"},
+            {"metodo": "PUT", "caminho": "/me/progresso", "corpo": {"dia_atual": 5}},
+            {"metodo": "POST", "caminho": "/me/progresso/avancar"},
+        ]})
+
+        # Admin
+        admin = autenticar("dieghonm", "Admin123@")
+        chamar("GET", "/usuarios", headers=admin)
+        chamar("GET", "/usuarios", caminho="/usuarios?fields=id,login", headers=admin)
+        # O TestClient só devolve a resposta depois do BackgroundTasks:
+        # as consultas do envio entram na conta da rota
+        job = chamar("POST", "/admin/emails/lote", headers=admin, json={
+            "tipo": "campanha", "assunto": "Novidades", "mensagem_html": "<p>Olá {{ params.login }}</p>", "tamanho_lote": 2,
+        }).json()
+        chamar("GET", "/admin/emails/lote/{job_id}", caminho=f"/admin/emails/lote/{job['job_id']}", headers=admin)
+        chamar("POST", "/admin/emails/lote", headers=admin, json={"tipo": "lembrete_plano", "expira_em_dias": 30})
+        chamar("GET", "/admin/email/circuito", headers=admin)
+        chamar("GET", "/admin/consultas-lentas", headers=admin)
+        chamar("DELETE", "/admin/consultas-lentas", headers=admin)
+        chamar("GET", "/admin/perfis", headers=admin)
+        chamar("GET", "/admin/perfis/{nome}", caminho="/admin/perfis/inexistente.prof", headers=admin)
+
+        # Recuperação de senha: código conhecido gravado direto no banco
+        chamar("POST", "/tempkey", json={"email_ou_login": "orcamento"})
+        with SessionLocal() as db:
+            registro = db.query(Usuario).filter_by(login="orcamento").one()
+            registro.temp_senha = hash_password("1234")
+            db.commit()
+            tempkeys_pendentes.pop(registro.id, None)
+        chamar("POST", "/tempkey", json={"email_ou_login": "orcamento", "tempKey": "1234"})
+        chamar("POST", "/tempkey", json={"email_ou_login": "orcamento", "tempKey": "1234", "new_password": "Nova123@"})
+
+        rotas = {
+            f"{metodo} {rota.path}"
+            for rota in app.routes
+            if isinstance(rota, APIRoute)
+            for metodo in rota.methods
+        }
+
+    resultado = {}
+    for chave in sorted(rotas | set(medidas) | set(ORCAMENTO_CONSULTAS)):
+        consultas, status = medidas.get(chave, (None, []))
+        resultado[chave] = {
+            "consultas": consultas,
+            "orcamento": ORCAMENTO_CONSULTAS.get(chave),
+            "status": sorted(set(status)),
+            "existe": chave in rotas,
+        }
+    return resultado
+
+
+def verificar(resultado: Dict[str, dict]) -> List[str]:
+    """Problemas encontrados (lista vazia = todas as rotas dentro do orçamento)"""
+    problemas = []
+    for chave, item in resultado.items():
+        if not item["existe"]:
+            problemas.append(f"{chave}: orçamento declarado para rota inexistente")
+        elif item["orcamento"] is None:
+            problemas.append(f"{chave}: rota sem orçamento em ORCAMENTO_CONSULTAS")
+        elif item["consultas"] is None:
+            problemas.append(f"{chave}: rota não exercitada pelos cenários")
+        elif any(codigo >= 500 or codigo == 422 for codigo in item["status"]):
+            # 422: o cenário ficou desatualizado e não chega a executar a rota
+            problemas.append(f"{chave}: status {item['status']} durante a medição")
+        elif item["consultas"] > item["orcamento"]:
+            problemas.append(f"{chave}: {item['consultas']} consultas (orçamento {item['orcamento']})")
+    return problemas
+
+
+if __name__ == "__main__":
+    resultado = executar()
+    for chave, item in resultado.items():
+        consultas = "-" if item["consultas"] is None else item["consultas"]
+        orcamento = "-" if item["orcamento"] is None else item["orcamento"]
+        print(f"{chave:<40} consultas={consultas:<3} orcamento={orcamento:<3} status={item['status']}")
+
+    problemas = verificar(resultado)
+    if problemas:
+        print("\nOrçamento de consultas violado:")
+        for problema in problemas:
+            print(f"  - {problema}")
+        sys.exit(1)
+    print("\nTodas as rotas dentro do orçamento de consultas.")
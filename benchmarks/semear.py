@@ -0,0 +1,216 @@
+"""
+Gera usuários sintéticos em massa (SQLite ou Postgres)
+
+Cria linhas realistas de `usuarios` (planos com datas de vencimento
+variadas, Starting preenchido para parte dos usuários e progresso
+espalhado pelas 12 semanas) sem passar por criar_usuario: o hash da senha
+é calculado uma vez e as linhas entram em lotes grandes, uma transação por
+lote (executemany no SQLite, COPY no Postgres).
+
+    python -m benchmarks.semear --total 1000000
+    python -m benchmarks.semear --database-url postgresql://... --sim --total 1000000 --lote 100000
+    python -m benchmarks.semear --total 100000 --recriar
+
+Os logins e emails continuam a numeração a partir do maior id da tabela,
+então rodar de novo acrescenta usuários em vez de colidir com os
+existentes. A senha de todos é SENHA.
+
+Sem --database-url o destino é o banco descartável dos benchmarks; outro
+banco (mesmo o DATABASE_URL do ambiente) só com --sim, já que --recriar
+apaga as tabelas.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine, func, select
+
+from . import BANCO_BENCHMARK, exigir_banco_benchmark
+
+from app.core.constants import PLANS_TIME
+from app.database import Base
+from app.models.user import Usuario
+from app.utils.jwt_auth import hash_password
+
+SENHA = "Senha123@"
+
+# Proporção aproximada de cada plano na base
+PESOS_PLANOS = {"trial": 40, "mensal": 25, "trimestral": 15, "semestral": 10, "anual": 10}
+
+DESEJOS = ["Viajar", "Casa própria", "Carreira", "Saúde", "Família", "Estudos", "Empreender", "Paz interior"]
+CAMINHOS = ["Ansiedade", "Autoimagem", "Atenção Plena", "Motivação", "Relacionamentos"]
+
+# Colunas preenchidas pelo gerador, na ordem das tuplas de gerar_linhas()
+COLUNAS = [
+    "login", "senha", "email", "tag", "plan", "plan_date", "created_at",
+    "desejo_nome", "desejo_descricao", "sentimentos_selecionados", "caminho_selecionado", "teste_resultados",
+    "semana_atual", "dia_atual", "progresso_atualizado_em", "versao",
+]
+
+
+def _data(valor: datetime) -> str:
+    """Formato aceito pelos dois bancos e pelo DateTime do SQLAlchemy no SQLite"""
+    return valor.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def gerar_linhas(
+    inicio: int,
+    quantidade: int,
+    senha_hashada: str,
+    prefixo: str = "user",
+    agora: Optional[datetime] = None,
+    rng: Optional[random.Random] = None,
+    progresso_inicial: bool = False,
+) -> Iterator[Tuple]:
+    """
+    Linhas de `usuarios` como tuplas na ordem de COLUNAS
+
+    Args:
+        inicio: Número do primeiro usuário (login `<prefixo>_<n>`)
+        quantidade: Quantidade de linhas
+        senha_hashada: Hash usado em todas as linhas
+        prefixo: Prefixo de login e email
+        agora: Referência para as datas (padrão: agora, UTC)
+        rng: Gerador aleatório (passar um com seed para repetir a base)
+        progresso_inicial: Todos na semana 1, dia 1 (sem Starting nem progresso)
+
+    Returns:
+        Iterador de tuplas; datas e JSON já serializados como texto
+    """
+    agora = agora or datetime.utcnow()
+    rng = rng or random.Random()
+    planos, pesos = zip(*PESOS_PLANOS.items())
+
+    for n in range(inicio, inicio + quantidade):
+        plano = rng.choices(planos, pesos)[0]
+        # Até 1,5x a duração do plano atrás: parte dos planos já venceu
+        plan_date = agora - timedelta(seconds=rng.randrange(int(PLANS_TIME[plano] * 1.5 * 86400)))
+        created_at = plan_date - timedelta(seconds=rng.randrange(120 * 86400))
+
+        desejo = descricao = sentimentos = caminho = resultados = progresso_em = None
+        semana = dia = 1
+        if not progresso_inicial and rng.random() < 0.6:
+            desejo = rng.choice(DESEJOS)
+            descricao = f"Quero {desejo.lower()} nos próximos meses" if rng.random() < 0.5 else None
+            sentimentos = json.dumps(rng.sample(range(1, 6), 3))
+            caminho = rng.choice(CAMINHOS)
+            resultados = json.dumps({c: round(rng.random() * 10, 1) for c in CAMINHOS})
+            semana = rng.randint(1, 12)
+            dia = rng.randint(1, 7)
+            progresso_em = _data(plan_date + (agora - plan_date) * rng.random())
+
+        yield (
+            f"{prefixo}_{n}", senha_hashada, f"{prefixo}_{n}@teste.com", "cliente", plano, _data(plan_date), _data(created_at),
+            desejo, descricao, sentimentos, caminho, resultados,
+            semana, dia, progresso_em, 1,
+        )
+
+
+def _inserir_copy(conexao, linhas: List[Tuple]):
+    """COPY FROM STDIN em CSV (psycopg2): o caminho mais rápido do Postgres"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for linha in linhas:
+        # Campo vazio sem aspas é NULL no COPY ... CSV
+        escritor.writerow(["" if valor is None else valor for valor in linha])
+    buffer.seek(0)
+    cursor = conexao.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY usuarios ({', '.join(COLUNAS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _inserir_executemany(conexao, linhas: List[Tuple]):
+    marcadores = ", ".join(["?"] * len(COLUNAS)) if conexao.dialect.paramstyle == "qmark" else ", ".join(["%s"] * len(COLUNAS))
+    conexao.exec_driver_sql(f"INSERT INTO usuarios ({', '.join(COLUNAS)}) VALUES ({marcadores})", linhas)
+
+
+def semear(
+    database_url: str,
+    total: int,
+    lote: int = 50_000,
+    recriar: bool = False,
+    prefixo: str = "user",
+    seed: Optional[int] = None,
+    progresso_inicial: bool = False,
+) -> int:
+    """
+    Insere `total` usuários sintéticos
+
+    Args:
+        database_url: Banco de destino (sqlite:/// ou postgresql://)
+        total: Quantidade de usuários
+        lote: Linhas por transação
+        recriar: Apaga e recria as tabelas antes
+        prefixo: Prefixo de login e email
+        seed: Semente do gerador (base reproduzível)
+        progresso_inicial: Todos na semana 1, dia 1 (sem Starting nem progresso)
+
+    Returns:
+        Número do primeiro usuário gerado (logins `<prefixo>_<n>` a partir dele)
+    """
+    engine = create_engine(database_url)
+    try:
+        if recriar:
+            Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        with engine.connect() as conexao:
+            inicio = (conexao.execute(select(func.max(Usuario.id))).scalar() or 0) + 1
+            dialeto = engine.dialect.name
+            if dialeto == "sqlite":
+                # Carga descartável: sem fsync a cada commit
+                conexao.exec_driver_sql("PRAGMA synchronous=OFF")
+            conexao.commit()
+            inserir = _inserir_copy if dialeto == "postgresql" else _inserir_executemany
+
+            linhas = gerar_linhas(
+                inicio, total, hash_password(SENHA), prefixo,
+                rng=random.Random(seed), progresso_inicial=progresso_inicial,
+            )
+            inseridos = 0
+            while inseridos < total:
+                pedaco = [linha for _, linha in zip(range(lote), linhas)]
+                inserir(conexao, pedaco)
+                conexao.commit()
+                inseridos += len(pedaco)
+
+            if dialeto == "postgresql":
+                conexao.exec_driver_sql("ANALYZE usuarios")
+                conexao.commit()
+        return inicio
+    finally:
+        engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Gera usuários sintéticos em massa")
+    parser.add_argument("--database-url", default=BANCO_BENCHMARK, help=f"Banco de destino (padrão: {BANCO_BENCHMARK})")
+    parser.add_argument("--total", type=int, default=1_000_000)
+    parser.add_argument("--lote", type=int, default=50_000, help="Linhas por transação")
+    parser.add_argument("--recriar", action="store_true", help="Apaga e recria as tabelas antes")
+    parser.add_argument("--prefixo", default="user", help="Prefixo de login e email")
+    parser.add_argument("--seed", type=int, help="Semente do gerador (base reproduzível)")
+    parser.add_argument("--sim", action="store_true", help="Confirma a escrita num banco que não é o dos benchmarks")
+    args = parser.parse_args(argv)
+
+    if not args.sim:
+        exigir_banco_benchmark(args.database_url, "semear grava usuários sintéticos (--sim para confirmar outro banco)")
+
+    inicio = time.perf_counter()
+    primeiro = semear(args.database_url, args.total, args.lote, args.recriar, args.prefixo, args.seed)
+    duracao = time.perf_counter() - inicio
+    print(
+        f"{args.total} usuários inseridos ({args.prefixo}_{primeiro} a {args.prefixo}_{primeiro + args.total - 1}) "
+        f"em {duracao:.1f}s ({args.total / duracao:,.0f} linhas/s); senha: {SENHA}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict
+
+
+def medir(funcao: Callable[[], Any], repeticoes: int = 1000, aquecimento: int = 50) -> Dict[str, float]:
+    """
+    Mede tempo por chamada e memória alocada por chamada
+
+    Args:
+        funcao: Função sem argumentos a ser medida
+        repeticoes: Quantidade de chamadas medidas
+        aquecimento: Chamadas descartadas antes da medição
+
+    Returns:
+        Dicionário com média/percentis em microssegundos e pico de memória
+        alocada (bytes) em uma chamada
+    """
+    for _ in range(aquecimento):
+        funcao()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter_ns()
+        funcao()
+        tempos.append(time.perf_counter_ns() - inicio)
+    tempos.sort()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    def percentil(p: float) -> float:
+        return tempos[min(len(tempos) - 1, int(len(tempos) * p))] / 1000
+
+    return {
+        "repeticoes": repeticoes,
+        "media_us": round(sum(tempos) / len(tempos) / 1000, 3),
+        "p50_us": round(percentil(0.50), 3),
+        "p95_us": round(percentil(0.95), 3),
+        "p99_us": round(percentil(0.99), 3),
+        "alocado_bytes": pico - base,
+    }
+
+
+def imprimir(nome: str, resultado: Dict[str, float]):
+    """Imprime um resultado de medir() em uma linha"""
+    campos = "  ".join(f"{chave}={valor}" for chave, valor in resultado.items())
+    print(f"{nome:<40} {campos}")
+
+
+class BrevoLocal(BaseHTTPRequestHandler):
+    """
+    Responde como a API do Brevo (201 com messageId/messageIds)
+
+    Requisições com algum destinatário em `server.recusados` recebem 400,
+    como o Brevo faz com um email inválido: a requisição inteira falha.
+    """
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        versoes = corpo.get("messageVersions") or []
+        destinatarios = [para["email"] for versao in versoes or [corpo] for para in versao.get("to") or []]
+        recusado = next((email for email in destinatarios if email in self.server.recusados), None)
+        if recusado:
+            status = 400
+            resposta = {"code": "invalid_parameter", "message": f"email is not valid: {recusado}"}
+        else:
+            status = 201
+            resposta = {"messageIds": [f"<id-{i}>" for i in range(len(versoes))]} if versoes else {"messageId": "<id>"}
+        dados = json.dumps(resposta).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_brevo_local() -> ThreadingHTTPServer:
+    """
+    Sobe o BrevoLocal em uma porta livre de 127.0.0.1, em segundo plano
+
+    Returns:
+        Servidor (porta em `server_port`; encerrar com `shutdown()`;
+        emails em `recusados` fazem a requisição falhar)
+    """
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), BrevoLocal)
+    servidor.recusados = set()
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
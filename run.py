@@ -1,9 +1,156 @@
-import sys
+"""
+Inicialização do servidor
+
+    python run.py
+
+Com gunicorn instalado (Linux/produção), ele gerencia os processos com
+workers uvicorn: a aplicação pode ser importada antes do fork (preload),
+os workers são reciclados após SERVER_MAX_REQUESTS requisições e, no
+SIGTERM, as requisições em andamento terminam antes do desligamento.
+Sem gunicorn (ex.: Windows), usa o uvicorn com múltiplos workers.
+
+uvloop e httptools são usados automaticamente quando instalados.
+"""
+import logging
 import os
+import shutil
+
+from app.core.config import iniciar_logs, settings
+
+logger = logging.getLogger("run")
+
+
+def calcular_workers() -> int:
+    """WEB_CONCURRENCY ou, se não definido, o número de CPUs"""
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    return os.cpu_count() or 1
+
+
+def _opcional(valor: int):
+    """0 nas configurações significa "sem limite" (None para o uvicorn)"""
+    return valor if valor > 0 else None
+
+
+def preparar_metricas(workers: int):
+    """
+    Com mais de um worker, aponta o prometheus_client para um diretório
+    compartilhado (limpo a cada inicialização) para /metrics somar todos.
+    Precisa rodar antes de importar a aplicação.
+    """
+    if workers <= 1 and not settings.metrics_multiproc_dir:
+        return
+    diretorio = settings.metrics_multiproc_dir or os.path.abspath("metrics_multiproc")
+    shutil.rmtree(diretorio, ignore_errors=True)
+    os.makedirs(diretorio, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = diretorio
+
+
+def _worker_encerrado(servidor, worker):
+    """Hook child_exit do gunicorn: descarta os gauges do worker que saiu"""
+    from app.utils.metricas import processo_encerrado
+    processo_encerrado(worker.pid)
+
+
+def configuracao_uvicorn() -> dict:
+    """Parâmetros do uvicorn comuns aos dois modos"""
+    return {
+        "loop": "auto",
+        "http": "auto",
+        "timeout_keep_alive": settings.server_keepalive_seconds,
+        "limit_concurrency": _opcional(settings.server_limit_concurrency),
+        "timeout_graceful_shutdown": settings.server_graceful_timeout,
+    }
+
+
+try:
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # gunicorn não instalado
+    UvicornWorker = None
+
+if UvicornWorker is not None:
+    class Worker(UvicornWorker):
+        """Worker uvicorn do gunicorn com as configurações de settings"""
+        CONFIG_KWARGS = configuracao_uvicorn()
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # O UvicornWorker liga os loggers do uvicorn aos handlers
+            # (síncronos) do gunicorn; aqui eles voltam a passar pela fila
+            # de app.core.logs, em JSON e com request_id
+            for nome in ("uvicorn.error", "uvicorn.access"):
+                logger_uvicorn = logging.getLogger(nome)
+                logger_uvicorn.handlers = []
+                logger_uvicorn.propagate = True
+
+
+def executar_gunicorn(workers: int):
+    from gunicorn.app.base import BaseApplication
+
+    class Servidor(BaseApplication):
+        def load_config(self):
+            opcoes = {
+                "bind": f"{settings.host}:{settings.port}",
+                "workers": workers,
+                # Caminho importável: o gunicorn carrega a classe pelo nome
+                "worker_class": "run.Worker",
+                "keepalive": settings.server_keepalive_seconds,
+                "max_requests": settings.server_max_requests,
+                "max_requests_jitter": settings.server_max_requests_jitter,
+                "graceful_timeout": settings.server_graceful_timeout,
+                "preload_app": settings.server_preload,
+                "child_exit": _worker_encerrado,
+            }
+            for chave, valor in opcoes.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    if settings.server_preload:
+        # Cria tabelas e usuários iniciais uma vez, antes do fork, para os
+        # workers não disputarem a inicialização do banco
+        import app.main  # noqa: F401 - registra os modelos no metadata
+        from app.database import VARIAVEL_BANCO_INICIALIZADO, inicializar_banco
+        from app.database.connection import engine
+
+        inicializar_banco()
+        engine.dispose()
+        # Herdada pelos workers: o startup_event deles não repete a inicialização
+        os.environ[VARIAVEL_BANCO_INICIALIZADO] = "1"
+
+    Servidor().run()
+
+
+def executar_uvicorn(workers: int):
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        limit_max_requests=_opcional(settings.server_max_requests),
+        # Sem a configuração de log do uvicorn: os loggers dele propagam
+        # para a fila de app.core.logs
+        log_config=None,
+        **configuracao_uvicorn(),
+    )
+
+
+def main():
+    iniciar_logs()
+    workers = calcular_workers()
+    preparar_metricas(workers)
+    if UvicornWorker is None:
+        logger.info("Iniciando uvicorn", extra={"workers": workers, "host": settings.host, "porta": settings.port})
+        executar_uvicorn(workers)
+        return
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+    logger.info("Iniciando gunicorn", extra={"workers": workers, "host": settings.host, "porta": settings.port})
+    executar_gunicorn(workers)
 
-from main import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,61 @@
+"""
+Configuração dos testes
+
+O ambiente é definido antes de qualquer import de `app` (o Settings lê as
+variáveis na importação): banco SQLite novo em um diretório temporário,
+limites em memória e o Brevo substituído pelo servidor local de
+benchmarks.utils, então a suíte roda sem .env e sem rede.
+"""
+import os
+import tempfile
+
+_DIRETORIO = tempfile.mkdtemp(prefix="backbase_testes_")
+
+os.environ.update({
+    "ENVIRONMENT": "test",
+    "DATABASE_URL": "sqlite:///" + os.path.join(_DIRETORIO, "testes.db"),
+    "SECRET_KEY": "testes-secret",
+    "JWT_SECRET_KEY": "testes-secret",
+    "RATE_LIMIT_STORAGE_URI": "memory://",
+    "BREVO_API_KEY": "testes",
+    "BREVO_SENDER_EMAIL": "noreply@backbase.com",
+    "BREVO_SENDER_NAME": "Eden Map",
+    "EMAIL_ENABLED": "true",
+    "EMAIL_BATCH_RATE_PER_SECOND": "0",
+    "TRACING_ENABLED": "false",
+    "SLOW_QUERY_MS": "0",
+    "LOG_LEVEL": "WARNING",
+    "LOG_FILE": "",
+    "PROFILE_DIR": os.path.join(_DIRETORIO, "perfis"),
+})
+
+from benchmarks import utils  # noqa: E402
+
+brevo_local = utils.iniciar_brevo_local()
+os.environ["BREVO_BASE_URL"] = f"http://127.0.0.1:{brevo_local.server_port}"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        yield cliente
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app.database.connection import engine as engine_app
+
+    return engine_app
+
+
+@pytest.fixture
+def brevo():
+    """Servidor local do Brevo; os emails recusados valem só para o teste"""
+    yield brevo_local
+    brevo_local.recusados.clear()
@@ -0,0 +1,99 @@
+import pytest
+from limits.storage import MemoryStorage
+
+from app import main
+from app.utils.limite_compartilhado import LimiteCompartilhado
+
+
+def _autenticar(client, login: str) -> dict:
+    client.post("/cadastro", json={"login": login, "senha": "Senha123@", "email": f"{login}@teste.com"})
+    resposta = client.post("/login", json={"email_ou_login": login, "senha": "Senha123@"})
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+def _batch(client, headers, *operacoes):
+    return client.post("/batch", json={"operacoes": list(operacoes)}, headers=headers)
+
+
+def test_operacoes_mistas_veem_as_anteriores_e_sao_gravadas(client):
+    headers = _autenticar(client, "batch_misto")
+
+    resposta = _batch(
+        client, headers,
+        {"metodo": "put", "caminho": "/me/progresso/", "corpo": {"semana_atual": 3, "dia_atual": 7}},
+        {"metodo": "POST", "caminho": "/me/progresso/avancar"},
+        {"metodo": "PUT", "caminho": "/me/starting", "corpo": {"desejo_nome": "Viajar"}},
+        {"metodo": "GET", "caminho": "/me"},
+    )
+
+    assert resposta.status_code == 200
+    corpo = resposta.json()
+    assert corpo["sucesso"] is True
+    assert [r["status"] for r in corpo["resultados"]] == [200, 200, 200, 200]
+    avancado = corpo["resultados"][1]["corpo"]["progresso"]
+    assert (avancado["semana_atual"], avancado["dia_atual"]) == (4, 1)
+    me = corpo["resultados"][3]["corpo"]
+    assert (me["semana_atual"], me["dia_atual"], me["desejo_nome"]) == (4, 1, "Viajar")
+
+    progresso = client.get("/me/progresso", headers=headers).json()["progresso"]
+    assert (progresso["semana_atual"], progresso["dia_atual"]) == (4, 1)
+
+
+def test_falha_desfaz_a_transacao_inteira(client):
+    headers = _autenticar(client, "batch_rollback")
+
+    resposta = _batch(
+        client, headers,
+        {"metodo": "PUT", "caminho": "/me/progresso", "corpo": {"semana_atual": 5, "dia_atual": 2}},
+        {"metodo": "PUT", "caminho": "/me/progresso", "corpo": {"semana_atual": 40}},
+        {"metodo": "GET", "caminho": "/me"},
+    )
+
+    corpo = resposta.json()
+    assert resposta.status_code == 200 and corpo["sucesso"] is False
+    assert [r["status"] for r in corpo["resultados"]] == [200, 422, 424]
+    progresso = client.get("/me/progresso", headers=headers).json()["progresso"]
+    assert (progresso["semana_atual"], progresso["dia_atual"]) == (1, 1)
+
+
+def test_operacao_desconhecida_da_404_e_desfaz_as_anteriores(client):
+    headers = _autenticar(client, "batch_desconhecida")
+
+    resposta = _batch(
+        client, headers,
+        {"metodo": "PUT", "caminho": "/me/starting", "corpo": {"desejo_nome": "Casa própria"}},
+        {"metodo": "DELETE", "caminho": "/me"},
+    )
+
+    corpo = resposta.json()
+    assert corpo["sucesso"] is False
+    assert [r["status"] for r in corpo["resultados"]] == [200, 404]
+    assert "DELETE /me" in corpo["resultados"][1]["corpo"]["detail"]
+    assert client.get("/me", headers=headers).json()["desejo_nome"] is None
+
+
+@pytest.fixture
+def limite_trial(monkeypatch):
+    limite = LimiteCompartilhado("5/minute", MemoryStorage(), "usuario_trial")
+    monkeypatch.setitem(main.limites_por_plano, "trial", limite)
+    return limite
+
+
+def test_cada_operacao_conta_no_limite_do_usuario(client, limite_trial):
+    headers = _autenticar(client, "batch_limite")
+    me = {"metodo": "GET", "caminho": "/me"}
+
+    assert client.get("/me/progresso", headers=headers).status_code == 200
+    assert _batch(client, headers, me, me, me, me).status_code == 200
+    # 1 + 4 = 5: o limite já foi consumido, pelo batch ou pelas rotas comuns
+    assert _batch(client, headers, me).status_code == 429
+    resposta = client.get("/me", headers=headers)
+    assert resposta.status_code == 429
+    assert resposta.json()["limit"] == "5/minute"
+
+
+def test_batch_acima_do_limite_e_recusado_inteiro(client, limite_trial):
+    headers = _autenticar(client, "batch_grande")
+    me = {"metodo": "GET", "caminho": "/me"}
+
+    assert _batch(client, headers, *[me] * 6).status_code == 429
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schemas.schemas import MeResponse, ProgressoResponse, UsuarioResponse
+from app.utils.campos import colunas_para_campos, interpretar_campos, serializar_parcial
+from app.utils.orcamento_consultas import contar_consultas
+
+
+def test_interpretar_campos_sem_fields_e_resposta_completa():
+    assert interpretar_campos(None, MeResponse) is None
+    assert interpretar_campos("  ", MeResponse) is None
+
+
+def test_interpretar_campos_mantem_ordem_e_remove_repetidos():
+    assert interpretar_campos(" login, expires,,login ", MeResponse) == ["login", "expires"]
+
+
+def test_interpretar_campos_recusa_campo_desconhecido():
+    with pytest.raises(ValueError, match="Campos inválidos: senha, nada"):
+        interpretar_campos("login,senha,nada", MeResponse)
+    # Campos calculados só existem em MeResponse
+    with pytest.raises(ValueError, match="expires"):
+        interpretar_campos("expires", UsuarioResponse)
+
+
+def test_colunas_para_campos_troca_calculados_pelas_dependencias():
+    assert colunas_para_campos(["login", "expires"], MeResponse) == ["login", "plan", "plan_date"]
+    assert colunas_para_campos(["token_duration", "plan"], MeResponse) == ["plan"]
+    assert colunas_para_campos(["semana_atual"], ProgressoResponse) == ["semana_atual"]
+
+
+def test_serializar_parcial_aplica_validadores_e_calcula_so_o_pedido():
+    agora = datetime.utcnow()
+    valores = {"login": "ana", "semana_atual": None, "plan": "mensal", "plan_date": agora - timedelta(days=10) + timedelta(hours=1)}
+
+    resultado = serializar_parcial(MeResponse, valores, ["login", "semana_atual", "expires"])
+
+    assert resultado == {"login": "ana", "semana_atual": 1, "expires": 20}
+
+
+def _autenticar(client, login: str) -> dict:
+    client.post("/cadastro", json={"login": login, "senha": "Senha123@", "email": f"{login}@teste.com"})
+    resposta = client.post("/login", json={"email_ou_login": login, "senha": "Senha123@"})
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+def test_campo_desconhecido_da_400(client):
+    headers = _autenticar(client, "campos_invalidos")
+    resposta = client.get("/me?fields=login,senha", headers=headers)
+    assert resposta.status_code == 400
+    assert "senha" in resposta.json()["detail"]
+
+
+def test_usuarios_nao_aceita_campos_calculados(client):
+    client.post("/cadastro", json={"login": "campos_admin", "senha": "Senha123@", "email": "campos_admin@teste.com", "tag": "admin"})
+    resposta = client.post("/login", json={"email_ou_login": "campos_admin", "senha": "Senha123@"})
+    headers = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+    assert client.get("/usuarios?fields=login,expires", headers=headers).status_code == 400
+    resposta = client.get("/usuarios?fields=login,plan", headers=headers)
+    assert resposta.status_code == 200
+    assert all(set(usuario) == {"login", "plan"} for usuario in resposta.json())
+
+
+def test_fields_com_if_none_match_busca_so_as_colunas_pedidas(client, engine):
+    headers = _autenticar(client, "campos_condicional")
+    resposta = client.get("/me?fields=login,plan", headers=headers)
+    assert resposta.json() == {"login": "campos_condicional", "plan": None}
+
+    for if_none_match, status in [(resposta.headers["etag"], 304), ('W/"desatualizado"', 200)]:
+        with contar_consultas(engine) as contador:
+            resposta = client.get("/me?fields=login,plan", headers={**headers, "If-None-Match": if_none_match})
+        assert resposta.status_code == status
+        (statement,) = contador.statements
+        assert "usuarios.login" in statement and "usuarios.email" not in statement
+        assert "usuarios.sentimentos_selecionados" not in statement
@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+
+from benchmarks.carga import Estatisticas, UsuarioVirtual
+
+USUARIO = {"id": 1, "email": "carga@teste.com", "login": "carga", "plan": "mensal"}
+
+
+def test_relatorio_calcula_percentis_e_erros_por_operacao():
+    estatisticas = Estatisticas()
+    for milissegundos in range(1, 101):
+        estatisticas.registrar("progresso", milissegundos / 1000, "429" if milissegundos % 10 == 0 else None)
+    estatisticas.registrar("login", 0.2, "ConnectError")
+    estatisticas.fim = estatisticas.inicio + 10
+
+    relatorio = estatisticas.relatorio()
+    progresso = relatorio["operacoes"]["progresso"]
+    assert (progresso["p50_ms"], progresso["p95_ms"], progresso["p99_ms"], progresso["max_ms"]) == (51.0, 96.0, 100.0, 100.0)
+    assert progresso["requisicoes"] == 100 and progresso["rps"] == 10.0
+    assert progresso["erros"] == 10 and progresso["erros_por_tipo"] == {"429": 10}
+    assert relatorio["total"]["requisicoes"] == 101
+    assert relatorio["total"]["erros_por_tipo"] == {"429": 10, "ConnectError": 1}
+
+
+def test_usuario_virtual_conta_status_inesperado_e_renova_o_token():
+    chamadas = []
+
+    def responder(requisicao: httpx.Request) -> httpx.Response:
+        chamadas.append(requisicao.url.path)
+        if requisicao.url.path == "/login":
+            return httpx.Response(200, json={"access_token": f"novo{len(chamadas)}"})
+        return httpx.Response(429 if len(chamadas) == 2 else 200)
+
+    async def cenario():
+        estatisticas = Estatisticas()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(responder), base_url="http://carga") as cliente:
+            vu = UsuarioVirtual(cliente, estatisticas, USUARIO, reuso_token=2)
+            for _ in range(3):
+                await vu.requisicao("progresso", "GET", "/me/progresso", headers=await vu.autenticado())
+            return vu, estatisticas
+
+    vu, estatisticas = asyncio.run(cenario())
+    # Terceira requisição autenticada: /login antes, token novo dali em diante
+    assert chamadas == ["/me/progresso", "/me/progresso", "/login", "/me/progresso"]
+    assert vu.headers == {"Authorization": "Bearer novo3"}
+    assert dict(estatisticas.erros["progresso"]) == {"429": 1}
+    assert len(estatisticas.latencias["login"]) == 1
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio manual no lugar do time.monotonic do módulo"""
+    atual = SimpleNamespace(agora=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=lambda: atual.agora))
+    return atual
+
+
+def _circuito(**opcoes):
+    padrao = {"taxa_falha": 0.5, "min_chamadas": 4, "janela": 10, "latencia_lenta": 2.0, "tempo_aberto": 30.0}
+    return CircuitBreaker("teste", **{**padrao, **opcoes})
+
+
+def _chamar(circuito, sucesso=True, duracao=0.1):
+    geracao = circuito.permitir()
+    assert geracao is not None
+    circuito.registrar(sucesso, duracao, geracao)
+
+
+def _abrir(circuito):
+    for _ in range(4):
+        _chamar(circuito, sucesso=False)
+    assert circuito.estado == CircuitBreaker.ABERTO
+
+
+def test_abre_pela_taxa_de_falhas(relogio):
+    circuito = _circuito()
+    for sucesso in (True, False, True):
+        _chamar(circuito, sucesso)
+    # Abaixo de min_chamadas a taxa ainda não é avaliada
+    assert circuito.estado == CircuitBreaker.FECHADO
+
+    _chamar(circuito, sucesso=False)  # 2 de 4 = 50%
+
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert circuito.permitir() is None
+    assert circuito.estado_atual()["contadores"]["recusadas"] == 1
+
+
+def test_abaixo_da_taxa_continua_fechado(relogio):
+    circuito = _circuito()
+    for sucesso in (True, True, True, False, True, True):
+        _chamar(circuito, sucesso)
+    assert circuito.estado == CircuitBreaker.FECHADO
+
+
+def test_chamadas_lentas_contam_como_falha(relogio):
+    circuito = _circuito()
+    for _ in range(4):
+        _chamar(circuito, sucesso=True, duracao=2.5)
+
+    assert circuito.estado == CircuitBreaker.ABERTO
+    contadores = circuito.estado_atual()["contadores"]
+    assert contadores["sucessos"] == 4 and contadores["lentas"] == 4
+
+
+def test_fim_do_tempo_aberto_passa_a_semi_aberto(relogio):
+    circuito = _circuito()
+    _abrir(circuito)
+
+    relogio.agora += 29.9
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert circuito.estado_atual()["segundos_para_sonda"] == pytest.approx(0.1)
+
+    relogio.agora += 0.1
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+    # Uma sonda por vez: a segunda chamada simultânea é recusada
+    assert circuito.permitir() is not None
+    assert circuito.permitir() is None
+
+
+def test_sonda_com_sucesso_fecha(relogio):
+    circuito = _circuito(sondas=2)
+    _abrir(circuito)
+    relogio.agora += 30
+
+    _chamar(circuito)
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+    _chamar(circuito)
+
+    assert circuito.estado == CircuitBreaker.FECHADO
+    transicoes = [(t["de"], t["para"]) for t in circuito.estado_atual()["transicoes"]]
+    assert transicoes == [("fechado", "aberto"), ("aberto", "semi_aberto"), ("semi_aberto", "fechado")]
+
+
+@pytest.mark.parametrize("resultado", [{"sucesso": False}, {"sucesso": True, "duracao": 3.0}])
+def test_sonda_com_falha_ou_lenta_reabre(relogio, resultado):
+    circuito = _circuito()
+    _abrir(circuito)
+    relogio.agora += 30
+
+    _chamar(circuito, **resultado)
+
+    assert circuito.estado == CircuitBreaker.ABERTO
+    assert circuito.permitir() is None
+
+
+def test_resultado_de_geracao_anterior_nao_conta_como_sonda(relogio):
+    circuito = _circuito()
+    # Chamada lenta que começa com o circuito fechado...
+    antiga = circuito.permitir()
+    _abrir(circuito)
+    relogio.agora += 30
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+
+    # ...e termina com sucesso durante o semi_aberto: não fecha o circuito
+    circuito.registrar(True, 0.1, antiga)
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+
+    # Nem a falha dela reabre; a sonda de verdade decide
+    circuito.registrar(False, 0.1, antiga)
+    assert circuito.estado == CircuitBreaker.SEMI_ABERTO
+    _chamar(circuito)
+    assert circuito.estado == CircuitBreaker.FECHADO
+    assert circuito.estado_atual()["contadores"]["chamadas"] == 7
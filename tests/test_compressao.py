@@ -0,0 +1,143 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from app.middleware import compressao
+from app.middleware.compressao import CompressaoMiddleware, escolher_codificacao
+
+CORPO_GRANDE = json.dumps([{"id": n, "login": f"user_{n}"} for n in range(200)]).encode()
+
+
+def _app(corpos, content_type=b"application/json", headers=(), status=200):
+    """App ASGI que responde com `corpos` (uma mensagem de corpo por item)"""
+
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), *headers],
+        })
+        for indice, corpo in enumerate(corpos):
+            await send({"type": "http.response.body", "body": corpo, "more_body": indice < len(corpos) - 1})
+
+    return app
+
+
+def _executar(app, accept_encoding="gzip", minimo_bytes=1024):
+    """Passa uma requisição pelo middleware; retorna (headers, mensagens de corpo)"""
+    enviadas = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensagem):
+        enviadas.append(mensagem)
+
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    asyncio.run(CompressaoMiddleware(app, minimo_bytes=minimo_bytes)(scope, receive, send))
+
+    inicio, *corpos = enviadas
+    return {nome.decode(): valor.decode() for nome, valor in inicio["headers"]}, corpos
+
+
+def _corpo(corpos) -> bytes:
+    return b"".join(mensagem["body"] for mensagem in corpos)
+
+
+def test_json_grande_e_comprimido_com_gzip():
+    headers, corpos = _executar(_app([CORPO_GRANDE]))
+
+    assert headers["content-encoding"] == "gzip"
+    assert int(headers["content-length"]) == len(_corpo(corpos)) < len(CORPO_GRANDE)
+    assert gzip.decompress(_corpo(corpos)) == CORPO_GRANDE
+
+
+def test_corpo_abaixo_do_minimo_sai_sem_compressao():
+    headers, corpos = _executar(_app([b'{"ok": true}']))
+
+    assert "content-encoding" not in headers
+    assert _corpo(corpos) == b'{"ok": true}'
+
+
+@pytest.mark.parametrize("content_type", [b"text/html; charset=utf-8", b"application/octet-stream", b"image/png"])
+def test_so_comprime_json(content_type):
+    headers, corpos = _executar(_app([CORPO_GRANDE], content_type=content_type))
+    assert "content-encoding" not in headers
+    assert _corpo(corpos) == CORPO_GRANDE
+
+
+def test_content_type_json_com_sufixo_e_charset():
+    headers, _ = _executar(_app([CORPO_GRANDE], content_type=b"application/problem+json; charset=utf-8"))
+    assert headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.parametrize("accept_encoding", [None, "identity", "gzip;q=0", "deflate"])
+def test_cliente_sem_codificacao_aceita_recebe_o_original(accept_encoding):
+    headers, corpos = _executar(_app([CORPO_GRANDE]), accept_encoding=accept_encoding)
+    assert "content-encoding" not in headers
+    assert _corpo(corpos) == CORPO_GRANDE
+
+
+def test_resposta_ja_codificada_nao_e_comprimida_de_novo():
+    ja_comprimido = gzip.compress(CORPO_GRANDE)
+    headers, corpos = _executar(_app([ja_comprimido], headers=[(b"content-encoding", b"gzip")]))
+
+    assert headers["content-encoding"] == "gzip"
+    assert _corpo(corpos) == ja_comprimido
+
+
+@pytest.mark.parametrize("status", [204, 304])
+def test_respostas_sem_corpo_passam_direto(status):
+    headers, _ = _executar(_app([b""], status=status))
+    assert "content-encoding" not in headers
+
+
+def test_streaming_comprime_chunk_a_chunk_sem_content_length():
+    pedacos = [CORPO_GRANDE[i:i + 700] for i in range(0, len(CORPO_GRANDE), 700)]
+
+    headers, corpos = _executar(_app(pedacos))
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    # Os dois primeiros pedaços (abaixo do mínimo sozinhos) saem juntos; o resto, um a um
+    assert len(corpos) == len(pedacos) - 1
+    assert [mensagem["more_body"] for mensagem in corpos] == [True] * (len(corpos) - 1) + [False]
+    assert gzip.decompress(_corpo(corpos)) == CORPO_GRANDE
+
+
+def test_streaming_que_termina_abaixo_do_minimo_sai_sem_compressao():
+    headers, corpos = _executar(_app([b'{"a":', b" 1}"]))
+    assert "content-encoding" not in headers
+    assert _corpo(corpos) == b'{"a": 1}'
+
+
+@pytest.mark.parametrize(
+    "vary, esperado",
+    [(None, "Accept-Encoding"), (b"Origin", "Origin, Accept-Encoding"), (b"accept-encoding", "accept-encoding")],
+)
+def test_vary_inclui_accept_encoding_uma_vez(vary, esperado):
+    headers_app = [(b"vary", vary)] if vary else []
+    headers, _ = _executar(_app([CORPO_GRANDE], headers=headers_app))
+    assert headers["vary"] == esperado
+
+
+def test_escolher_codificacao_respeita_q(monkeypatch):
+    monkeypatch.setattr(compressao, "brotli", None)
+    assert escolher_codificacao("gzip, deflate") == "gzip"
+    assert escolher_codificacao("br, gzip;q=0") is None
+    assert escolher_codificacao("*") == "gzip"
+    assert escolher_codificacao("*, gzip;q=0") is None
+
+
+def test_brotli_quando_disponivel():
+    brotli = pytest.importorskip("brotli")
+    assert escolher_codificacao("gzip, br") == "br"
+    assert escolher_codificacao("gzip, br;q=0") == "gzip"
+
+    headers, corpos = _executar(_app([CORPO_GRANDE[:2000], CORPO_GRANDE[2000:]]), accept_encoding="br")
+
+    assert headers["content-encoding"] == "br"
+    assert brotli.decompress(_corpo(corpos)) == CORPO_GRANDE
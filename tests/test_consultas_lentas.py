@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from app.utils.consultas_lentas import RegistroConsultasLentas
+
+
+class _CursorFalso:
+    """Cursor DBAPI que registra os comandos e falha no EXPLAIN"""
+
+    def __init__(self, comandos, falhar_explain):
+        self.comandos = comandos
+        self.falhar_explain = falhar_explain
+
+    def execute(self, sql, parametros=None):
+        self.comandos.append(sql.split(" FROM ")[0] if sql.startswith("EXPLAIN") else sql)
+        if sql.startswith("EXPLAIN") and self.falhar_explain:
+            raise RuntimeError("erro no EXPLAIN")
+
+    def fetchall(self):
+        return [("Index Scan using usuarios_pkey on usuarios",)]
+
+    def close(self):
+        pass
+
+
+def _conexao(comandos, falhar_explain=False):
+    dbapi = SimpleNamespace(cursor=lambda: _CursorFalso(comandos, falhar_explain))
+    return SimpleNamespace(connection=SimpleNamespace(dbapi_connection=dbapi))
+
+
+def test_explain_no_postgres_roda_em_savepoint():
+    comandos = []
+    plano = RegistroConsultasLentas()._explicar(_conexao(comandos), "postgresql", "SELECT * FROM usuarios", {})
+    assert plano == ["Index Scan using usuarios_pkey on usuarios"]
+    assert comandos == ["SAVEPOINT explicar_consulta", "EXPLAIN SELECT *", "RELEASE SAVEPOINT explicar_consulta"]
+
+
+def test_explain_com_erro_desfaz_so_o_savepoint():
+    comandos = []
+    plano = RegistroConsultasLentas()._explicar(_conexao(comandos, True), "postgresql", "SELECT * FROM usuarios", {})
+    assert plano is None
+    assert comandos == [
+        "SAVEPOINT explicar_consulta",
+        "EXPLAIN SELECT *",
+        "ROLLBACK TO SAVEPOINT explicar_consulta",
+        "RELEASE SAVEPOINT explicar_consulta",
+    ]
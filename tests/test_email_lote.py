@@ -0,0 +1,48 @@
+from app import main
+
+
+def _admin(client) -> dict:
+    resposta = client.post("/login", json={"email_ou_login": "dieghonm", "senha": "Admin123@"})
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+CAMPANHA = {"tipo": "campanha", "assunto": "Novidades", "mensagem_html": "<p>Olá</p>", "tag": "admin", "tamanho_lote": 1}
+
+
+def test_envio_responde_antes_de_enviar_e_guarda_o_resumo_no_job(client, brevo):
+    brevo.recusados.add("dieghonm@gmail.com")
+    headers = _admin(client)
+
+    resposta = client.post("/admin/emails/lote", headers=headers, json=CAMPANHA)
+    assert resposta.status_code == 202
+    # Serializada antes do envio (o TestClient só executa o BackgroundTasks depois)
+    assert resposta.json()["status"] == "em_andamento"
+
+    job = client.get(f"/admin/emails/lote/{resposta.json()['job_id']}", headers=headers).json()
+    assert job["status"] == "concluido"
+    assert job["falhas"] == 1 and job["enviados"] == job["total"] - 1 >= 2
+    assert [falha["email"] for falha in job["resultados_com_falha"]] == ["dieghonm@gmail.com"]
+    assert job["concluido_em"] is not None
+
+
+def test_erro_no_envio_fica_no_job(client, brevo, monkeypatch):
+    headers = _admin(client)
+
+    def falhar(*args, **kwargs):
+        raise RuntimeError("banco fora do ar")
+
+    monkeypatch.setattr(main, "iterar_destinatarios", falhar)
+    job_id = client.post("/admin/emails/lote", headers=headers, json=CAMPANHA).json()["job_id"]
+
+    job = client.get(f"/admin/emails/lote/{job_id}", headers=headers).json()
+    assert job["status"] == "erro"
+    assert job["erro"] == "banco fora do ar"
+
+
+def test_job_desconhecido_e_usuario_comum(client):
+    assert client.get("/admin/emails/lote/inexistente", headers=_admin(client)).status_code == 404
+
+    client.post("/cadastro", json={"login": "nao_admin_lote", "senha": "Senha123@", "email": "nao_admin_lote@teste.com"})
+    token = client.post("/login", json={"email_ou_login": "nao_admin_lote", "senha": "Senha123@"}).json()["access_token"]
+    resposta = client.post("/admin/emails/lote", headers={"Authorization": f"Bearer {token}"}, json=CAMPANHA)
+    assert resposta.status_code == 403
@@ -0,0 +1,32 @@
+from app.services.email_service import get_email_service
+
+
+def _destinatarios(quantidade):
+    return [{"email": f"pessoa_{n}@teste.com", "params": {"n": n}} for n in range(quantidade)]
+
+
+def test_envio_em_lote_retorna_um_resultado_por_destinatario(brevo):
+    resultados = get_email_service().enviar_em_lote(_destinatarios(5), "Olá {{ params.n }}", "<p>oi</p>", tamanho_lote=2)
+
+    assert [r["email"] for r in resultados] == [f"pessoa_{n}@teste.com" for n in range(5)]
+    assert all(r["sucesso"] and r["erro"] is None for r in resultados)
+    # messageIds na ordem das versões de cada lote
+    assert [r["message_id"] for r in resultados] == ["<id-0>", "<id-1>", "<id-0>", "<id-1>", "<id-0>"]
+
+
+def test_falha_de_um_lote_nao_afeta_os_outros(brevo):
+    brevo.recusados.add("pessoa_3@teste.com")
+
+    resultados = get_email_service().enviar_em_lote(_destinatarios(5), "Olá", "<p>oi</p>", tamanho_lote=2)
+
+    sucesso = {r["email"]: r["sucesso"] for r in resultados}
+    assert sucesso == {
+        "pessoa_0@teste.com": True,
+        "pessoa_1@teste.com": True,
+        "pessoa_2@teste.com": False,
+        "pessoa_3@teste.com": False,
+        "pessoa_4@teste.com": True,
+    }
+    falhas = [r for r in resultados if not r["sucesso"]]
+    assert all(r["message_id"] is None and r["erro"].startswith("400") for r in falhas)
+    assert "pessoa_3@teste.com" in falhas[0]["erro"]
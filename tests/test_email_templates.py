@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+from app.services.email_templates import TEMPLATES_DIR, EmailTemplate, carregar_template
+
+VALORES = {
+    "boas_vindas": {"login": "ana", "email": "ana@teste.com", "plano_nome": "Plano Anual"},
+    "tempkey": {"login": "ana", "digito1": "1", "digito2": "2", "digito3": "3", "digito4": "4"},
+    "lembrete_plano": {"login": "ana", "plano_nome": "Plano Anual", "dias_restantes": 3},
+}
+
+
+def test_substitui_todas_as_ocorrencias_e_preserva_o_restante():
+    template = EmailTemplate("teste", "<p>{{ nome }}</p><i>{{nome}}</i> {{ codigo }}")
+
+    assert template.campos == ["nome", "codigo"]
+    assert template.render(nome="ana", codigo=42) == "<p>ana</p><i>ana</i> 42"
+
+
+def test_chaves_simples_do_css_nao_sao_campos():
+    # Nos f-strings antigos o CSS precisava de {{ }}; nos arquivos é CSS normal
+    template = EmailTemplate("teste", "<style>body { margin: 0; } .a{color:red}</style><p>{{ nome }}</p>")
+
+    assert template.campos == ["nome"]
+    assert template.render(nome="ana") == "<style>body { margin: 0; } .a{color:red}</style><p>ana</p>"
+
+
+def test_valores_sao_escapados_como_html():
+    template = EmailTemplate("teste", '<strong style="color:#fff;">{{ login }}</strong>')
+
+    assert template.render(login="<b>Ana & Bia</b>") == '<strong style="color:#fff;">&lt;b&gt;Ana &amp; Bia&lt;/b&gt;</strong>'
+
+
+def test_campo_ausente_levanta_key_error():
+    with pytest.raises(KeyError):
+        EmailTemplate("teste", "{{ login }} {{ codigo }}").render(login="ana")
+
+
+@pytest.mark.parametrize("nome", sorted(VALORES))
+def test_templates_do_disco_renderizam_sem_placeholders_restantes(nome):
+    template = carregar_template(nome)
+    fonte = (TEMPLATES_DIR / f"{nome}.html").read_text(encoding="utf-8")
+
+    assert sorted(template.campos) == sorted(VALORES[nome])
+    html = template.render(**VALORES[nome])
+    assert "{{" not in html and "}}" not in html
+    # Fora dos campos, o HTML (com as chaves do CSS) sai igual ao arquivo
+    assert template.render(**{campo: "" for campo in template.campos}) == re.sub(r"\{\{\s*\w+\s*\}\}", "", fonte)
+    assert carregar_template(nome) is template
+
+
+def test_css_do_tempkey_chega_com_chaves_simples():
+    html = carregar_template("tempkey").render(**VALORES["tempkey"])
+
+    estilos = re.search(r"<style>(.*?)</style>", html, re.S).group(1)
+    assert "{{" not in estilos
+    assert estilos.count("{") == estilos.count("}") > 0
+
+
+def test_lembrete_mantem_os_placeholders_do_brevo():
+    html = carregar_template("lembrete_plano").render(
+        login="{{ params.login }}", plano_nome="{{ params.plano_nome }}", dias_restantes="{{ params.dias_restantes }}"
+    )
+
+    assert "{{ params.login }}" in html and "{{ params.dias_restantes }}" in html
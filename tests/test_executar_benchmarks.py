@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from benchmarks import executar
+
+
+def _execucao(**p50s):
+    return {"metadados": {"commit": "abc123"}, "resultados": {chave: {"p50_us": p50} for chave, p50 in p50s.items()}}
+
+
+def test_comparar_aponta_p50_acima_da_tolerancia():
+    baseline = _execucao(auth=100.0, endpoints=1000.0)
+    atual = _execucao(auth=130.0, endpoints=1200.0)
+
+    regressoes = executar.comparar(atual, baseline, tolerancia=0.25, minimo_us=5.0)
+    assert regressoes == ["auth: p50 100.0us -> 130.0us (+30%)"]
+
+
+def test_comparar_ignora_ruido_abaixo_do_minimo_e_benchmarks_novos():
+    baseline = _execucao(rapido=1.0, sem_base=0.0)
+    atual = _execucao(rapido=3.0, sem_base=50.0, novo=999.0)
+
+    assert executar.comparar(atual, baseline, tolerancia=0.25, minimo_us=5.0) == []
+
+
+def test_main_termina_com_erro_quando_ha_regressao(monkeypatch, tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_execucao(auth=100.0)), encoding="utf-8")
+    monkeypatch.setattr(executar, "executar", lambda nomes: _execucao(auth=200.0))
+    monkeypatch.setattr("sys.argv", ["executar", "--apenas", "auth", "--comparar", str(baseline)])
+
+    with pytest.raises(SystemExit) as saida:
+        executar.main()
+    assert saida.value.code == 1
+    assert "auth: p50 100.0us -> 200.0us (+100%)" in capsys.readouterr().out
+
+    monkeypatch.setattr(executar, "executar", lambda nomes: _execucao(auth=110.0))
+    executar.main()
+    assert "Nenhuma regressão." in capsys.readouterr().out
@@ -0,0 +1,21 @@
+from app import main
+from app.database import VARIAVEL_BANCO_INICIALIZADO
+
+
+def _executar_startup(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(main, "inicializar_banco", lambda: chamadas.append("inicializar_banco"))
+    monkeypatch.setattr(main, "iniciar_logs", lambda: None)
+    monkeypatch.setattr(main.prontidao, "iniciar", lambda: None)
+    main.startup_event()
+    return chamadas
+
+
+def test_worker_sem_preload_inicializa_o_banco(monkeypatch):
+    monkeypatch.delenv(VARIAVEL_BANCO_INICIALIZADO, raising=False)
+    assert _executar_startup(monkeypatch) == ["inicializar_banco"]
+
+
+def test_worker_com_preload_nao_repete_a_inicializacao(monkeypatch):
+    monkeypatch.setenv(VARIAVEL_BANCO_INICIALIZADO, "1")
+    assert _executar_startup(monkeypatch) == []
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from limits.storage import MemoryStorage
+
+from app.utils.limite_compartilhado import LimiteCompartilhado
+from app.utils.rate_limit_storage import SQLiteStorage
+from app.utils.token_bucket import LimiteExcedido
+
+
+def _consumir(limite, chave, vezes):
+    permitidas = 0
+    for _ in range(vezes):
+        try:
+            limite.verificar(chave)
+            permitidas += 1
+        except LimiteExcedido:
+            pass
+    return permitidas
+
+
+def test_workers_dividem_o_mesmo_contador(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'limites.db'}"
+    # Um storage por "worker", apontando para o mesmo arquivo
+    workers = [LimiteCompartilhado("5/minute", SQLiteStorage(uri), "login_conta") for _ in range(4)]
+
+    permitidas = sum(_consumir(worker, "1.2.3.4|ana", 3) for worker in workers)
+
+    assert permitidas == 5
+
+
+def test_custo_e_retry_after_ate_o_fim_da_janela():
+    limite = LimiteCompartilhado("10/minute", MemoryStorage(), "usuario")
+    limite.verificar(7, custo=8)
+
+    with pytest.raises(LimiteExcedido) as excecao:
+        limite.verificar(7, custo=3)
+
+    assert excecao.value.limite == "10/minute"
+    assert 55 < excecao.value.retry_after <= 60
+
+
+def test_namespace_e_chave_separam_os_contadores():
+    storage = MemoryStorage()
+    login = LimiteCompartilhado("1/minute", storage, "login_conta")
+    tempkey = LimiteCompartilhado("1/minute", storage, "tempkey_conta")
+
+    login.verificar("ana")
+    tempkey.verificar("ana")
+    login.verificar("bia")
+    with pytest.raises(LimiteExcedido):
+        login.verificar("ana")
+
+
+def test_limpar_zera_a_chave():
+    limite = LimiteCompartilhado("1/minute", MemoryStorage(), "login_conta")
+    limite.verificar("ana")
+    limite.limpar("ana")
+    limite.verificar("ana")
+
+
+def test_janela_expirada_libera_de_novo():
+    limite = LimiteCompartilhado("2/second", MemoryStorage(), "usuario")
+    assert _consumir(limite, 1, 5) == 2
+    time.sleep(1.1)
+    assert _consumir(limite, 1, 1) == 1
@@ -0,0 +1,73 @@
+import logging
+import os
+import subprocess
+import sys
+
+from app.core.logs import FiltroTaxa
+
+
+class _Captura(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append(record)
+
+
+def _logger(nome: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.Logger(nome, logging.INFO)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_filtro_taxa_descarta_repeticoes_e_conta_suprimidos(monkeypatch):
+    captura = _Captura()
+    filtro = FiltroTaxa(limite=2, janela=60)
+    captura.addFilter(filtro)
+    ruidoso = _logger("app.ruidoso", captura)
+
+    def registrar():
+        # Sempre a mesma linha: o limite é por ponto do código
+        ruidoso.warning("falha repetida")
+
+    for _ in range(5):
+        registrar()
+    assert len(captura.registros) == 2
+
+    # Janela seguinte: o próximo registro informa quantos foram descartados
+    monkeypatch.setattr(filtro, "janela", 0)
+    registrar()
+    assert captura.registros[-1].suprimidos == 3
+
+
+def test_log_de_acesso_passa_com_mensagem_ruidosa_limitada():
+    captura = _Captura()
+    captura.addFilter(FiltroTaxa(limite=2, janela=60))
+    ruidoso = _logger("app.ruidoso", captura)
+    acesso = _logger("uvicorn.access", captura)
+    tempos = _logger("app.tempos", captura)
+
+    for _ in range(50):
+        ruidoso.warning("falha repetida")
+        acesso.info('127.0.0.1 - "GET /me HTTP/1.1" 200')
+        tempos.info("tempos da requisição")
+
+    por_logger = {}
+    for registro in captura.registros:
+        por_logger[registro.name] = por_logger.get(registro.name, 0) + 1
+    assert por_logger == {"app.ruidoso": 2, "uvicorn.access": 50, "app.tempos": 50}
+
+
+def test_importar_configuracoes_nao_inicia_os_logs():
+    # Interpretador novo: no processo dos testes os logs já podem estar configurados
+    script = (
+        "from app.core import config, logs\n"
+        "assert logs._listener is None\n"
+        "config.iniciar_logs()\n"
+        "primeiro = logs._listener\n"
+        "config.iniciar_logs()\n"
+        "assert primeiro is not None and logs._listener is primeiro\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", script], env=os.environ.copy(), capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
@@ -0,0 +1,31 @@
+import pytest
+
+from app import main
+
+
+@pytest.fixture
+def token_metricas(monkeypatch):
+    monkeypatch.setattr(main.settings, "metrics_token", "segredo")
+    return "segredo"
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer errado", "segredo", "Basic segredo", "Bearer segredo2"])
+def test_metrics_recusa_token_errado(client, token_metricas, authorization):
+    headers = {"Authorization": authorization} if authorization else {}
+
+    resposta = client.get("/metrics", headers=headers)
+    assert resposta.status_code == 401
+    assert "# TYPE" not in resposta.text
+
+
+def test_metrics_aceita_o_token_configurado(client, token_metricas):
+    resposta = client.get("/metrics", headers={"Authorization": f"Bearer {token_metricas}"})
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith("text/plain")
+    assert "# TYPE" in resposta.text
+
+
+def test_metrics_sem_token_configurado_e_aberto(client):
+    assert main.settings.metrics_token == ""
+    assert client.get("/metrics").status_code == 200
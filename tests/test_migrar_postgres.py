@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, func, insert, select, text, update
+
+from app.database import Base
+from app.database import migrar_postgres
+from app.database.migrar_postgres import TABELA, copiar_novos, sincronizar, verificar
+
+
+@pytest.fixture
+def bancos(tmp_path):
+    origem = create_engine(f"sqlite:///{tmp_path / 'origem.db'}")
+    destino = create_engine(f"sqlite:///{tmp_path / 'destino.db'}")
+    Base.metadata.create_all(bind=origem)
+    Base.metadata.create_all(bind=destino)
+    yield origem, destino
+    origem.dispose()
+    destino.dispose()
+
+
+def _inserir(banco, ids, atualizado_em=None):
+    with banco.begin() as conexao:
+        conexao.execute(
+            insert(TABELA),
+            [
+                {
+                    "id": id_,
+                    "login": f"usuario{id_}",
+                    "senha": "hash",
+                    "email": f"usuario{id_}@teste.com",
+                    "sentimentos_selecionados": ["calma", "foco"],
+                    "atualizado_em": atualizado_em or datetime.utcnow(),
+                }
+                for id_ in ids
+            ],
+        )
+
+
+def _logins(banco):
+    with banco.connect() as conexao:
+        return dict(conexao.execute(select(TABELA.c.id, TABELA.c.login).order_by(TABELA.c.id)).all())
+
+
+def test_copia_e_retoma_do_maior_id_do_destino(bancos):
+    origem, destino = bancos
+    _inserir(origem, range(1, 8))
+
+    assert copiar_novos(origem, destino, lote=3) == 7
+    assert verificar(origem, destino, lote=3) == []
+
+    _inserir(origem, [8, 9])
+    assert copiar_novos(origem, destino, lote=3) == 2
+    assert verificar(origem, destino, lote=3) == []
+
+
+def test_verificar_aponta_divergencias(bancos):
+    origem, destino = bancos
+    _inserir(origem, range(1, 5))
+    copiar_novos(origem, destino, lote=10)
+    with destino.begin() as conexao:
+        conexao.execute(update(TABELA).where(TABELA.c.id == 2).values(login="outro"))
+
+    assert verificar(origem, destino, lote=10) == ["checksum: ids 1-4"]
+    assert verificar(origem, destino, lote=10, checksums=False) == []
+
+
+def test_sincronizar_regrava_alteradas_remove_apagadas_e_copia_novas(bancos):
+    origem, destino = bancos
+    _inserir(origem, range(1, 11), atualizado_em=datetime.utcnow() - timedelta(hours=1))
+    copiar_novos(origem, destino, lote=4)
+
+    with origem.begin() as conexao:
+        # UPDATE pelo SQLAlchemy: onupdate renova atualizado_em
+        conexao.execute(update(TABELA).where(TABELA.c.id == 3).values(login="alterado"))
+        conexao.execute(delete(TABELA).where(TABELA.c.id.in_([5, 10])))
+    _inserir(origem, [11])
+
+    assert sincronizar(origem, destino, lote=4) == {"gravadas": 2, "removidas": 2}
+    assert verificar(origem, destino, lote=4) == []
+    assert _logins(destino)[3] == "alterado"
+
+
+def test_sincronizar_le_so_as_linhas_alteradas_desde_a_marca(bancos):
+    origem, destino = bancos
+    _inserir(origem, range(1, 5), atualizado_em=datetime.utcnow() - timedelta(hours=2))
+    _inserir(origem, [5], atualizado_em=datetime.utcnow() - timedelta(hours=1))
+    copiar_novos(origem, destino, lote=10)
+
+    with origem.begin() as conexao:
+        # UPDATE fora do SQLAlchemy: atualizado_em não muda, a marca não vê
+        conexao.execute(text("UPDATE usuarios SET login = 'por fora' WHERE id = 2"))
+
+    assert sincronizar(origem, destino, lote=10) == {"gravadas": 0, "removidas": 0}
+    assert verificar(origem, destino, lote=10) == ["checksum: ids 1-5"]
+
+    assert sincronizar(origem, destino, lote=10, completo=True) == {"gravadas": 1, "removidas": 0}
+    assert verificar(origem, destino, lote=10) == []
+
+
+def test_sincronizar_sem_marca_no_destino_compara_tudo(bancos):
+    origem, destino = bancos
+    _inserir(origem, range(1, 4))
+    copiar_novos(origem, destino, lote=10)
+    with destino.begin() as conexao:
+        # Cópia feita antes da coluna atualizado_em existir
+        conexao.execute(update(TABELA).values(atualizado_em=None, login="antigo"))
+
+    assert sincronizar(origem, destino, lote=10) == {"gravadas": 3, "removidas": 0}
+    assert verificar(origem, destino, lote=10) == []
+
+
+def test_main_sincroniza_e_verifica(bancos):
+    origem, destino = bancos
+    _inserir(origem, range(1, 4))
+    argumentos = ["--origem", str(origem.url), "--destino", str(destino.url), "--lote", "2"]
+
+    migrar_postgres.main(argumentos)
+    with origem.begin() as conexao:
+        conexao.execute(update(TABELA).where(TABELA.c.id == 1).values(login="novo"))
+    migrar_postgres.main([*argumentos, "--sincronizar"])
+
+    assert _logins(destino) == _logins(origem)
+    with destino.connect() as conexao:
+        assert conexao.execute(select(func.count()).select_from(TABELA)).scalar() == 3
@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.constants import ORCAMENTO_CONSULTAS
+from app.utils.orcamento_consultas import contar_consultas
+from benchmarks.orcamento_consultas import medir_rotas, verificar
+
+
+@pytest.fixture(scope="module")
+def medidas(client):
+    return medir_rotas()
+
+
+@pytest.mark.parametrize("rota", sorted(ORCAMENTO_CONSULTAS))
+def test_rota_dentro_do_orcamento(medidas, rota):
+    item = medidas[rota]
+    assert item["existe"], f"{rota} não existe na aplicação"
+    assert item["consultas"] is not None, f"{rota} não foi exercitada pelos cenários"
+    assert item["consultas"] <= item["orcamento"], f"{rota}: {item['consultas']} consultas (orçamento {item['orcamento']})"
+
+
+def test_todas_as_rotas_tem_orcamento(medidas):
+    assert verificar(medidas) == []
+
+
+def _autenticar(client, login: str) -> dict:
+    client.post("/cadastro", json={"login": login, "senha": "Senha123@", "email": f"{login}@teste.com"})
+    resposta = client.post("/login", json={"email_ou_login": login, "senha": "Senha123@"})
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+@pytest.mark.parametrize("caminho", ["/me", "/me?fields=login,plan", "/me/progresso"])
+def test_requisicao_condicional_com_etag_desatualizado_faz_uma_consulta(client, engine, caminho):
+    headers = _autenticar(client, "condicional")
+    client.get(caminho, headers=headers)
+
+    with contar_consultas(engine) as contador:
+        resposta = client.get(caminho, headers={**headers, "If-None-Match": 'W/"desatualizado"'})
+    assert resposta.status_code == 200
+    assert contador.total == 1
+
+    with contar_consultas(engine) as contador:
+        resposta = client.get(caminho, headers={**headers, "If-None-Match": resposta.headers["etag"]})
+    assert resposta.status_code == 304
+    assert contador.total == 1
+
+
+@pytest.mark.parametrize(
+    "caminho, fora_da_consulta",
+    [
+        ("/me", ["usuarios.senha", "usuarios.temp_senha"]),
+        ("/me/progresso", ["usuarios.senha", "usuarios.teste_resultados", "usuarios.sentimentos_selecionados"]),
+    ],
+)
+def test_requisicao_condicional_nao_carrega_a_linha_inteira(client, engine, caminho, fora_da_consulta):
+    headers = _autenticar(client, "condicional_colunas")
+    etag = client.get(caminho, headers=headers).headers["etag"]
+
+    with contar_consultas(engine) as contador:
+        resposta = client.get(caminho, headers={**headers, "If-None-Match": etag})
+    assert resposta.status_code == 304
+    (statement,) = contador.statements
+    assert not [coluna for coluna in fora_da_consulta if coluna in statement]
@@ -0,0 +1,38 @@
+from app.middleware.perfil import PerfilMiddleware
+from app.utils.jwt_auth import create_access_token, create_user_token_data
+
+
+def _autenticar(client, login: str, senha: str = "Senha123@") -> dict:
+    client.post("/cadastro", json={"login": login, "senha": senha, "email": f"{login}@teste.com"})
+    resposta = client.post("/login", json={"email_ou_login": login, "senha": senha})
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+def test_x_profile_de_usuario_comum_e_ignorado(client):
+    headers = _autenticar(client, "perfil_comum")
+
+    resposta = client.get("/me", headers={**headers, "X-Profile": "1"})
+    assert resposta.status_code == 200
+    assert "x-profile-id" not in resposta.headers
+
+
+def test_x_profile_de_admin_gera_perfil(client):
+    admin = _autenticar(client, "dieghonm", "Admin123@")
+
+    resposta = client.get("/me", headers={**admin, "X-Profile": "1"})
+    nome = resposta.headers["x-profile-id"]
+    assert nome.endswith(".prof")
+    assert nome in [perfil["nome"] for perfil in client.get("/admin/perfis", headers=admin).json()]
+    assert "x-profile-id" not in client.get("/me", headers=admin).headers
+
+
+def test_token_invalido_ou_sem_bearer_nao_e_admin():
+    admin = create_access_token(create_user_token_data(1, "admin@teste.com", "admin", "admin"))
+    cliente = create_access_token(create_user_token_data(2, "cliente@teste.com", "cliente", "cliente"))
+
+    assert PerfilMiddleware._eh_admin(f"Bearer {admin}".encode()) is True
+    assert PerfilMiddleware._eh_admin(f"Bearer {cliente}".encode()) is False
+    assert PerfilMiddleware._eh_admin(f"Basic {admin}".encode()) is False
+    # Assinatura adulterada
+    assert PerfilMiddleware._eh_admin(f"Bearer {admin[:-2]}xx".encode()) is False
+    assert PerfilMiddleware._eh_admin(b"") is False
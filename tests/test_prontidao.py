@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import main
+from app.database import Base
+from app.services import prontidao as modulo
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.prontidao import VerificadorProntidao
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pronto.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio manual no lugar do time.monotonic do módulo (perf_counter continua real)"""
+    import time
+
+    atual = SimpleNamespace(agora=1000.0)
+    monkeypatch.setattr(modulo, "time", SimpleNamespace(monotonic=lambda: atual.agora, perf_counter=time.perf_counter))
+    return atual
+
+
+def test_sem_verificacao_ainda_nao_esta_pronto(engine):
+    estado = VerificadorProntidao(engine, CircuitBreaker("brevo")).estado()
+    assert estado == {"pronto": False, "motivo": "verificações ainda não executadas"}
+
+
+def test_pronto_com_banco_e_schema_ok(engine):
+    verificador = VerificadorProntidao(engine, CircuitBreaker("brevo"))
+    verificador.verificar()
+
+    estado = verificador.estado()
+    assert estado["pronto"] is True
+    assert estado["verificacoes"]["banco"]["ok"] and estado["verificacoes"]["schema"]["colunas_ausentes"] == []
+    assert estado["verificacoes"]["email"] == {"ok": True, "circuito": "fechado", "degradado": False}
+
+
+def test_banco_indisponivel_nao_esta_pronto(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'nao_existe' / 'banco.db'}")
+    verificador = VerificadorProntidao(engine, CircuitBreaker("brevo"))
+    verificador.verificar()
+
+    estado = verificador.estado()
+    assert estado["pronto"] is False
+    assert estado["verificacoes"]["banco"]["ok"] is False
+    assert estado["verificacoes"]["schema"] == {"ok": False, "erro": "banco indisponível"}
+
+
+def test_circuito_aberto_e_degradado_mas_pronto(engine):
+    circuito = CircuitBreaker("brevo", min_chamadas=1)
+    circuito.registrar(False, 0.1, circuito.permitir())
+
+    verificador = VerificadorProntidao(engine, circuito)
+    verificador.verificar()
+
+    estado = verificador.estado()
+    assert estado["pronto"] is True
+    assert estado["verificacoes"]["email"]["degradado"] is True
+
+
+def test_resultado_velho_deixa_de_estar_pronto(engine, relogio):
+    verificador = VerificadorProntidao(engine, CircuitBreaker("brevo"), intervalo=5)
+    verificador.verificar()
+
+    relogio.agora += 15
+    assert verificador.estado()["pronto"] is True
+    relogio.agora += 0.1
+    estado = verificador.estado()
+    assert estado["pronto"] is False
+    assert "atrasadas" in estado["motivo"]
+    assert estado["idade_segundos"] == 15.1
+
+
+def test_parar_encerra_a_thread(engine):
+    verificador = VerificadorProntidao(engine, CircuitBreaker("brevo"), intervalo=60)
+    verificador.iniciar()
+    thread = verificador._thread
+    assert thread.is_alive()
+
+    verificador.parar()
+
+    assert not thread.is_alive()
+    # Pode ser reiniciado depois de parado
+    verificador.iniciar()
+    assert verificador._thread.is_alive()
+    verificador.parar()
+
+
+def test_rota_ready_responde_503_quando_nao_esta_pronto(client, monkeypatch):
+    assert client.get("/health/ready").status_code == 200
+
+    monkeypatch.setattr(main.prontidao, "estado", lambda: {"pronto": False, "motivo": "teste"})
+    resposta = client.get("/health/ready")
+    assert resposta.status_code == 503
+    assert resposta.json() == {"pronto": False, "motivo": "teste"}
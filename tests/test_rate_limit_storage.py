@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app.utils import rate_limit_storage
+from app.utils.rate_limit_storage import SQLiteStorage
+from benchmarks.bench_rate_limit_storage import verificar_workers
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio manual no lugar do time.time do módulo"""
+    atual = SimpleNamespace(agora=1_000_000.0)
+    monkeypatch.setattr(rate_limit_storage, "time", SimpleNamespace(time=lambda: atual.agora))
+    return atual
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteStorage(f"sqlite:///{tmp_path / 'limites.db'}")
+
+
+def _linhas(storage) -> int:
+    with sqlite3.connect(storage.caminho) as conexao:
+        return conexao.execute("SELECT COUNT(*) FROM limites").fetchone()[0]
+
+
+def test_uri_sqlite_registrada_no_limits(tmp_path):
+    storage = storage_from_string(f"sqlite:///{tmp_path / 'limites.db'}")
+    assert isinstance(storage, SQLiteStorage)
+    assert storage.check()
+
+
+def test_caminho_relativo_e_absoluto():
+    assert SQLiteStorage._caminho_da_uri("sqlite:///./ratelimit.db") == "./ratelimit.db"
+    assert SQLiteStorage._caminho_da_uri("sqlite:////var/run/rl.db") == "/var/run/rl.db"
+
+
+def test_incr_soma_e_retorna_o_contador(storage, relogio):
+    assert storage.incr("chave", 60) == 1
+    assert storage.incr("chave", 60, amount=3) == 4
+    assert storage.get("chave") == 4
+    assert storage.get("outra") == 0
+
+
+def test_janela_expirada_reinicia_o_contador(storage, relogio):
+    storage.incr("chave", 60, amount=5)
+    assert storage.get_expiry("chave") == relogio.agora + 60
+
+    relogio.agora += 30
+    # Dentro da janela o incremento não adia a expiração
+    assert storage.incr("chave", 60) == 6
+    assert storage.get_expiry("chave") == relogio.agora + 30
+
+    relogio.agora += 30
+    assert storage.get("chave") == 0
+    assert storage.get_expiry("chave") == relogio.agora
+    assert storage.incr("chave", 60) == 1
+    assert storage.get_expiry("chave") == relogio.agora + 60
+
+
+def test_clear_e_reset(storage):
+    for chave in ("a", "b", "c"):
+        storage.incr(chave, 60)
+
+    storage.clear("a")
+    assert storage.get("a") == 0 and storage.get("b") == 1
+
+    assert storage.reset() == 2
+    assert _linhas(storage) == 0
+
+
+def test_limpeza_ocasional_remove_janelas_expiradas(storage, relogio, monkeypatch):
+    storage.incr("velha", 10)
+    relogio.agora += 20
+
+    storage.incr("nova", 60)
+    assert _linhas(storage) == 2
+
+    # Sorteio da limpeza (1 em LIMPEZA_A_CADA) forçado
+    monkeypatch.setattr(rate_limit_storage.random, "randrange", lambda n: 0)
+    storage.incr("nova", 60)
+    assert _linhas(storage) == 1
+    assert storage.get("nova") == 2
+
+
+def test_uma_conexao_por_thread_e_por_processo(storage):
+    principal = storage._conexao()
+    assert storage._conexao() is principal
+
+    outras = []
+    thread = threading.Thread(target=lambda: outras.append(storage._conexao()))
+    thread.start()
+    thread.join()
+    assert outras[0] is not principal
+
+    # Depois de um fork o pid muda: a conexão herdada não é reaproveitada
+    storage._local.pid = -1
+    assert storage._conexao() is not principal
+
+
+def test_limiter_do_limits_sobre_o_storage(storage):
+    limiter = FixedWindowRateLimiter(storage)
+    limite = parse("3/minute")
+    assert [limiter.hit(limite, "ip") for _ in range(4)] == [True, True, True, False]
+    assert limiter.get_window_stats(limite, "ip").remaining == 0
+
+
+def test_contador_compartilhado_entre_processos():
+    resultado = verificar_workers(workers=2, hits=200)
+    assert resultado["hits_aceitos"] == 400
+    assert resultado["contador_final"] == 400
@@ -0,0 +1,16 @@
+import pytest
+
+from benchmarks import semear
+
+
+def test_recusa_banco_que_nao_e_o_dos_benchmarks(monkeypatch, tmp_path):
+    chamadas = []
+    monkeypatch.setattr(semear, "semear", lambda *args: chamadas.append(args) or 1)
+    outro = f"sqlite:///{tmp_path / 'producao.db'}"
+
+    with pytest.raises(SystemExit, match="banco dos benchmarks"):
+        semear.main(["--database-url", outro, "--recriar", "--total", "1"])
+    assert chamadas == []
+
+    semear.main(["--database-url", outro, "--sim", "--total", "1"])
+    assert chamadas[0][0] == outro
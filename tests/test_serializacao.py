@@ -0,0 +1,25 @@
+import json
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app import main
+
+
+def test_orjson_e_o_serializador_padrao(client):
+    assert main.ClasseRespostaPadrao is ORJSONResponse
+    assert client.get("/health").headers["content-type"] == "application/json"
+
+
+def test_orjson_gera_o_mesmo_json_que_a_stdlib():
+    conteudo = {
+        "login": "ação_çã 🌿",
+        "plan": None,
+        "dias": 30,
+        "fracao": 0.5,
+        "sentimentos_selecionados": [1, 4, 7],
+        "teste_resultados": {"a": 3, "b": {"c": True}},
+    }
+
+    assert json.loads(ORJSONResponse(conteudo).body) == json.loads(JSONResponse(conteudo).body)
+    # Sem escapes \uXXXX: UTF-8 direto, como o JSONResponse do Starlette
+    assert "ação".encode() in ORJSONResponse(conteudo).body
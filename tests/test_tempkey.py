@@ -0,0 +1,38 @@
+def _cadastrar(client, login: str) -> str:
+    email = f"{login}@teste.com"
+    client.post("/cadastro", json={"login": login, "senha": "Senha123@", "email": email})
+    return email
+
+
+def _pedir_codigo(client, login: str, chave: str) -> dict:
+    resposta = client.post("/tempkey", json={"email_ou_login": login}, headers={"Idempotency-Key": chave})
+    assert resposta.status_code == 200
+    return resposta.json()
+
+
+def test_idempotency_key_repete_a_resposta_enquanto_o_codigo_vale(client, brevo):
+    email = _cadastrar(client, "idempotente_ativo")
+    # Email recusado: o código volta na resposta (fallback) e dá para compará-lo
+    brevo.recusados.add(email)
+
+    primeira = _pedir_codigo(client, "idempotente_ativo", "chave-1")
+    assert primeira["tempkey"]
+    assert _pedir_codigo(client, "idempotente_ativo", "chave-1") == primeira
+
+
+def test_idempotency_key_nao_repete_codigo_ja_usado(client, brevo):
+    email = _cadastrar(client, "idempotente_usado")
+    brevo.recusados.add(email)
+
+    primeira = _pedir_codigo(client, "idempotente_usado", "chave-1")
+    troca = client.post(
+        "/tempkey",
+        json={"email_ou_login": "idempotente_usado", "tempKey": primeira["tempkey"], "new_password": "Nova123@senha"},
+    )
+    assert troca.status_code == 200
+
+    # Mesma chave depois do estágio 3: um código novo, que de fato vale
+    segunda = _pedir_codigo(client, "idempotente_usado", "chave-1")
+    assert segunda["tempkey"] and segunda["tempkey"] != primeira["tempkey"]
+    validacao = client.post("/tempkey", json={"email_ou_login": "idempotente_usado", "tempKey": segunda["tempkey"]})
+    assert validacao.status_code == 200
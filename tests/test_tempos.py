@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.utils.tempos import ouvir_statements
+
+
+def test_um_hook_por_engine_e_pilha_limpa_apos_erro():
+    engine = create_engine("sqlite://")
+    concluidos_a, concluidos_b = [], []
+    ouvir_statements(engine, lambda conn, statement, *resto: concluidos_a.append((statement, resto[-1])))
+    ouvir_statements(engine, lambda conn, statement, *resto: concluidos_b.append((statement, resto[-1])))
+
+    with engine.connect() as conexao:
+        conexao.execute(text("SELECT 1"))
+        with pytest.raises(OperationalError):
+            conexao.execute(text("SELECT * FROM tabela_inexistente"))
+        assert conexao.connection.info["_statements_em_execucao"] == []
+        conexao.execute(text("SELECT 2"))
+
+    assert concluidos_a == concluidos_b
+    assert [statement for statement, _ in concluidos_a] == ["SELECT 1", "SELECT * FROM tabela_inexistente", "SELECT 2"]
+    assert concluidos_a[0][1] is None and concluidos_a[2][1] is None
+    assert "tabela_inexistente" in str(concluidos_a[1][1])
+    engine.dispose()
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import token_bucket
+from app.utils.token_bucket import LimiteExcedido, TokenBucketLimiter
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio manual no lugar do time.monotonic do módulo"""
+    atual = SimpleNamespace(agora=1000.0)
+    monkeypatch.setattr(token_bucket, "time", SimpleNamespace(monotonic=lambda: atual.agora))
+    return atual
+
+
+def test_rajada_ate_a_capacidade(relogio):
+    limiter = TokenBucketLimiter("5/minute")
+    assert [limiter.consumir("ip")[0] for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_recarga_de_um_token_por_intervalo(relogio):
+    limiter = TokenBucketLimiter("5/minute")  # um token a cada 12s
+    for _ in range(5):
+        limiter.consumir("ip")
+
+    relogio.agora += 11.9
+    assert limiter.consumir("ip")[0] is False
+    relogio.agora += 0.1
+    assert limiter.consumir("ip")[0] is True
+    assert limiter.consumir("ip")[0] is False
+
+    # Ociosa pelo período inteiro: bucket cheio de novo, sem passar da capacidade
+    relogio.agora += 600
+    assert [limiter.consumir("ip")[0] for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_retry_after_e_o_tempo_ate_o_proximo_token(relogio):
+    limiter = TokenBucketLimiter("5/minute")
+    for _ in range(5):
+        limiter.verificar("ip")
+    relogio.agora += 3
+
+    with pytest.raises(LimiteExcedido) as excecao:
+        limiter.verificar("ip")
+    assert excecao.value.limite == "5/minute"
+    assert excecao.value.retry_after == pytest.approx(9.0)
+
+    # Custo 3 precisa de 3 tokens: espera os 3 intervalos
+    with pytest.raises(LimiteExcedido) as excecao:
+        limiter.verificar("ip", custo=3)
+    assert excecao.value.retry_after == pytest.approx(33.0)
+
+
+def test_chaves_alem_de_max_chaves_descartam_a_mais_antiga(relogio):
+    limiter = TokenBucketLimiter("1/minute", max_chaves=3)
+    for chave in ("a", "b", "c"):
+        limiter.verificar(chave)
+    # "a" usada de novo (recusada) passa para o fim da fila LRU
+    assert limiter.consumir("a")[0] is False
+
+    limiter.verificar("d")
+
+    assert len(limiter) == 3
+    # "b" era a menos recente: descartada, volta com o bucket cheio
+    assert limiter.consumir("b")[0] is True
+    assert limiter.consumir("a")[0] is False
+
+
+def test_descarte_leva_junto_chaves_ociosas(relogio):
+    limiter = TokenBucketLimiter("1/minute", max_chaves=3)
+    for chave in ("a", "b", "c"):
+        limiter.verificar(chave)
+    relogio.agora += 120
+
+    limiter.verificar("d")
+
+    # Com os buckets de "b" e "c" cheios de novo, descartá-los não muda nada
+    assert len(limiter) == 1
+
+
+def test_limpar_devolve_o_bucket_cheio(relogio):
+    limiter = TokenBucketLimiter("1/minute")
+    limiter.verificar("ip")
+    limiter.limpar("ip")
+    limiter.verificar("ip")
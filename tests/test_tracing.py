@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.utils.tracing import (
+    Amostragem,
+    Rastreador,
+    Span,
+    Trace,
+    ativar_span,
+    desativar_span,
+    rastrear_engine,
+    rastrear_requests,
+    span,
+)
+
+
+def test_statement_com_erro_fecha_o_span_com_tag_error():
+    engine = create_engine("sqlite://")
+    rastrear_engine(engine)
+    raiz = Span(Trace("0" * 32, True), "GET /teste", tipo="SERVER")
+    token = ativar_span(raiz)
+    try:
+        with engine.connect() as conexao:
+            with pytest.raises(OperationalError):
+                conexao.execute(text("SELECT * FROM tabela_inexistente"))
+            assert conexao.connection.info["_statements_em_execucao"] == []
+            conexao.execute(text("SELECT 1"))
+    finally:
+        desativar_span(token)
+        engine.dispose()
+
+    com_erro, ok = raiz.trace.spans
+    assert com_erro.nome == "db SELECT" and com_erro.parent_id == raiz.span_id
+    assert com_erro.tags["error"] == "OperationalError"
+    assert com_erro.tags["db.statement"] == "SELECT * FROM tabela_inexistente"
+    assert com_erro.duracao is not None
+    assert "error" not in ok.tags
+
+
+class _Exportador:
+    def __init__(self):
+        self.traces = []
+
+    def exportar(self, spans):
+        self.traces.append(spans)
+
+
+def test_sem_amostragem_na_entrada_nao_monta_os_spans_filhos():
+    exportador = _Exportador()
+    rastreador = Rastreador(exportador, Amostragem(taxa=0, lento_ms=0, taxa_cauda=0))
+    raiz = rastreador.iniciar_requisicao("GET /me")
+    token = ativar_span(raiz)
+    try:
+        with span("bcrypt") as filho:
+            assert filho is None
+    finally:
+        desativar_span(token)
+
+    # Lenta (lento_ms=0): exportada mesmo assim, só com o span raiz
+    rastreador.finalizar_requisicao(raiz, 200)
+    (trace,) = exportador.traces
+    assert [item["name"] for item in trace] == ["GET /me"]
+    assert trace[0]["tags"]["spans_filhos"] == "nao_gravados"
+
+
+def test_amostrada_na_entrada_monta_os_spans_mesmo_sem_cauda():
+    exportador = _Exportador()
+    rastreador = Rastreador(exportador, Amostragem(taxa=0, taxa_cauda=0))
+    raiz = rastreador.iniciar_requisicao("GET /me", "00-" + "a" * 32 + "-" + "b" * 16 + "-01")
+    token = ativar_span(raiz)
+    try:
+        with span("bcrypt") as filho:
+            assert filho is not None
+    finally:
+        desativar_span(token)
+
+    rastreador.finalizar_requisicao(raiz, 200)
+    assert [item["name"] for item in exportador.traces[0]] == ["bcrypt", "GET /me"]
+
+
+def test_traceparent_so_vai_para_os_hosts_internos(monkeypatch):
+    enviados = {}
+
+    def enviar(sessao, requisicao, **kwargs):
+        enviados[requisicao.url] = requisicao.headers.get("traceparent")
+        return SimpleNamespace(status_code=200)
+
+    monkeypatch.setattr(requests.Session, "send", enviar)
+    rastrear_requests(["interno.local"])
+
+    raiz = Span(Trace("0" * 32, True), "POST /tempkey", tipo="SERVER")
+    token = ativar_span(raiz)
+    try:
+        sessao = requests.Session()
+        for url in ("https://api.brevo.com/v3/smtp/email", "http://interno.local/fila"):
+            sessao.send(requests.Request("POST", url).prepare())
+    finally:
+        desativar_span(token)
+
+    assert enviados["https://api.brevo.com/v3/smtp/email"] is None
+    assert enviados["http://interno.local/fila"].startswith("00-" + "0" * 32 + "-")
+    assert [filho.tags["http.url"] for filho in raiz.trace.spans] == [
+        "https://api.brevo.com/v3/smtp/email",
+        "http://interno.local/fila",
+    ]